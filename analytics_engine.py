@@ -0,0 +1,215 @@
+import threading
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Target range used by the Analytics "Time in Range" metric (mg/dL, inclusive)
+TARGET_LOW = 80
+TARGET_HIGH = 130
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+_EPOCH = date(1970, 1, 1)
+
+Summary = namedtuple("Summary", ["count", "mean", "std", "below", "in_range", "above"])
+
+
+class _Bucket:
+    """Running count/mean/M2 (Welford) plus target-range counters for one group of readings."""
+
+    __slots__ = ("count", "mean", "m2", "below", "in_range", "above")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, below=0, in_range=0, above=0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.below = below
+        self.in_range = in_range
+        self.above = above
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self._count_range(value, 1)
+
+    def remove(self, value):
+        """Retract a value previously passed to ``add``."""
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        else:
+            self.count -= 1
+            previous_mean = self.mean - (value - self.mean) / self.count
+            self.m2 = max(self.m2 - (value - previous_mean) * (value - self.mean), 0.0)
+            self.mean = previous_mean
+        self._count_range(value, -1)
+
+    def _count_range(self, value, step):
+        if value < TARGET_LOW:
+            self.below += step
+        elif value > TARGET_HIGH:
+            self.above += step
+        else:
+            self.in_range += step
+
+    def merge(self, other):
+        """Fold another bucket in (Chan et al. parallel variance)."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.below += other.below
+        self.in_range += other.in_range
+        self.above += other.above
+
+    def summary(self):
+        std = float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+        mean = self.mean if self.count else float("nan")
+        return Summary(self.count, mean, std, self.below, self.in_range, self.above)
+
+
+def day_number(timestamp_ns):
+    """Days since the epoch for a naive epoch-ns timestamp."""
+    return int(timestamp_ns) // _NS_PER_DAY
+
+
+def iso_week(day):
+    year, week, _ = (_EPOCH + timedelta(days=int(day))).isocalendar()
+    return year, week
+
+
+class GlucoseStats:
+    """Incrementally maintained Analytics page metrics.
+
+    Keeps an overall bucket plus one bucket per calendar day and per ISO week,
+    so logging, deleting or editing a reading is O(1) and the page never
+    rescans history. ``summary(since_day)`` merges day buckets, which makes a
+    windowed summary O(days in window) regardless of how many readings there
+    are. Standard deviation uses ``ddof=1`` like ``pandas.Series.std``.
+    """
+
+    def __init__(self):
+        self._total = _Bucket()
+        self._days = {}
+        self._weeks = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    @classmethod
+    def from_arrays(cls, timestamps, values, days=None):
+        """Build the aggregates for existing history in one vectorized pass.
+
+        ``days`` (days since the epoch) may be passed in from ``ReadingsStore.derived``.
+        """
+        stats = cls()
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return stats
+        if days is None:
+            days = np.asarray(timestamps, dtype=np.int64) // _NS_PER_DAY
+        frame = pd.DataFrame({
+            "day": days,
+            "value": values,
+            "below": values < TARGET_LOW,
+            "above": values > TARGET_HIGH,
+        })
+        grouped = frame.groupby("day", sort=True)
+        per_day = grouped.agg(
+            count=("value", "size"), mean=("value", "mean"), var=("value", "var"),
+            below=("below", "sum"), above=("above", "sum"),
+        )
+        per_day["m2"] = per_day["var"].fillna(0.0) * (per_day["count"] - 1)
+        per_day["in_range"] = per_day["count"] - per_day["below"] - per_day["above"]
+        for day, row in zip(per_day.index.tolist(), per_day.itertuples(index=False)):
+            bucket = _Bucket(int(row.count), float(row.mean), float(row.m2),
+                             int(row.below), int(row.in_range), int(row.above))
+            stats._days[day] = bucket
+            stats._weeks.setdefault(iso_week(day), _Bucket()).merge(bucket)
+            stats._total.merge(bucket)
+        stats.version = 1
+        return stats
+
+    def add(self, timestamp_ns, value):
+        value = float(value)
+        day = day_number(timestamp_ns)
+        with self._lock:
+            self._total.add(value)
+            self._days.setdefault(day, _Bucket()).add(value)
+            self._weeks.setdefault(iso_week(day), _Bucket()).add(value)
+            self.version += 1
+
+    def extend(self, timestamps, values):
+        """Add a batch of readings (e.g. an imported chunk) in one vectorized pass."""
+        self.merge(GlucoseStats.from_arrays(timestamps, values))
+
+    def merge(self, other):
+        """Fold another GlucoseStats into this one."""
+        with self._lock:
+            self._total.merge(other._total)
+            for day, bucket in other._days.items():
+                self._days.setdefault(day, _Bucket()).merge(bucket)
+            for week, bucket in other._weeks.items():
+                self._weeks.setdefault(week, _Bucket()).merge(bucket)
+            self.version += 1
+
+    def remove(self, timestamp_ns, value):
+        """Retract a deleted reading."""
+        value = float(value)
+        day = day_number(timestamp_ns)
+        with self._lock:
+            self._total.remove(value)
+            for buckets, key in ((self._days, day), (self._weeks, iso_week(day))):
+                bucket = buckets[key]
+                bucket.remove(value)
+                if not bucket.count:
+                    del buckets[key]
+            self.version += 1
+
+    def replace(self, old_timestamp_ns, old_value, new_timestamp_ns, new_value):
+        """Apply an edited reading as a retraction followed by an insert."""
+        self.remove(old_timestamp_ns, old_value)
+        self.add(new_timestamp_ns, new_value)
+
+    def summary(self, since_day=None):
+        """Summary over all readings, or over days ``>= since_day`` if given."""
+        with self._lock:
+            if since_day is None:
+                return self._total.summary()
+            merged = _Bucket()
+            for day, bucket in self._days.items():
+                if day >= since_day:
+                    merged.merge(bucket)
+            return merged.summary()
+
+    def weekly_means(self, since_day=None):
+        """Mean glucose per ISO week as a Series indexed by ``(year, week)``."""
+        with self._lock:
+            if since_day is None:
+                items = [(key, bucket.mean) for key, bucket in self._weeks.items()]
+            else:
+                weeks = {}
+                for day, bucket in self._days.items():
+                    if day >= since_day:
+                        weeks.setdefault(iso_week(day), _Bucket()).merge(bucket)
+                items = [(key, bucket.mean) for key, bucket in weeks.items()]
+        items.sort()
+        index = pd.MultiIndex.from_arrays(
+            [[year for (year, _), _ in items], [week for (_, week), _ in items]],
+            names=["year", "week"],
+        )
+        return pd.Series([mean for _, mean in items], index=index, dtype=float)
+
+    def daily_means(self, since_day=None):
+        """Mean glucose per calendar day as a Series indexed by date."""
+        with self._lock:
+            items = sorted(
+                (day, bucket.mean) for day, bucket in self._days.items()
+                if since_day is None or day >= since_day
+            )
+        index = pd.Index([_EPOCH + timedelta(days=day) for day, _ in items], name="date")
+        return pd.Series([mean for _, mean in items], index=index, dtype=float)
@@ -0,0 +1,55 @@
+"""Time for each CGM metric on a year of 5-minute readings, with the AGP checked against np.percentile.
+
+    python benchmarks/cgm_metrics.py [--years 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.meal_response import synthetic_cgm  # noqa: E402
+from cgm_metrics import (  # noqa: E402
+    AGP_BIN_MINUTES, AGP_PERCENTILES, agp_percentiles, cgm_metrics, mage, risk_indices, time_in_ranges,
+)
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def timed(label, fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    print(f"{label:>16}: {min(timings) * 1000:7.2f} ms")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=1)
+    args = parser.parse_args(argv)
+
+    timestamps, values = synthetic_cgm(args.years)
+    print(f"{values.shape[0]:,} readings")
+    timed("time in ranges", lambda: time_in_ranges(timestamps, values))
+    timed("MAGE", lambda: mage(values))
+    timed("LBGI/HBGI", lambda: risk_indices(values))
+    _, bands = timed("AGP", lambda: agp_percentiles(timestamps, values, smooth_bins=1))
+    timed("all metrics", lambda: cgm_metrics(timestamps, values))
+
+    bin_of = (timestamps // _NS_PER_MINUTE % 1440) // AGP_BIN_MINUTES
+    worst = max(
+        np.nanmax(np.abs(bands[p] - [np.percentile(values[bin_of == b], p) for b in range(bands[p].shape[0])]))
+        for p in AGP_PERCENTILES
+    )
+    print(f"AGP vs np.percentile: max difference {worst:.2e} mg/dL")
+    return 0 if worst < 1e-6 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Cohort metrics for a clinic: one grouped pass vs. a loop over patients, plus incremental refresh.
+
+Computes 14 days of metrics for ``--patients`` synthetic patients both
+ways and checks they agree, then seeds ``--stored`` patients into a real
+store and times a cold ``CohortEngine.refresh`` against a refresh after one
+patient logs a reading.
+
+    python benchmarks/cohort.py [--patients 1000] [--stored 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.multi_user import seed_user  # noqa: E402
+from cgm_metrics import cgm_metrics  # noqa: E402
+from cohort import COHORT_DAYS, CohortEngine, cohort_metrics  # noqa: E402
+from events import episode_starts  # noqa: E402
+from readings_store import to_epoch_ns  # noqa: E402
+from storage import Storage  # noqa: E402
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def synthetic_cohort(patients, days=COHORT_DAYS, seed=0):
+    """5-minute readings per patient, each with their own mean, swing and sensor dropouts."""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(0, days * 1440, 5)
+    groups, timestamps, values = [], [], []
+    for patient in range(patients):
+        kept = minutes[rng.random(minutes.shape[0]) > rng.uniform(0, 0.3)]
+        level, swing = rng.uniform(100, 190), rng.uniform(20, 70)
+        series = level + swing * np.sin(kept / 1440 * 2 * np.pi + rng.uniform(0, 6)) + rng.normal(0, 12, kept.shape[0])
+        groups.append(np.full(kept.shape[0], patient))
+        timestamps.append(kept.astype(np.int64) * _NS_PER_MINUTE)
+        values.append(np.clip(series, 40, 400))
+    return np.concatenate(groups), np.concatenate(timestamps), np.concatenate(values)
+
+
+def per_patient(groups, timestamps, values, patients):
+    bounds = np.searchsorted(groups, np.arange(patients + 1))
+    rows = []
+    for patient in range(patients):
+        ts, vs = timestamps[bounds[patient]:bounds[patient + 1]], values[bounds[patient]:bounds[patient + 1]]
+        metrics = cgm_metrics(ts, vs)
+        rows.append((metrics.mean, metrics.cv, metrics.ranges["in_range"], episode_starts(ts, vs).shape[0]))
+    return np.array(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--stored", type=int, default=200, help="patients seeded into storage for the refresh test")
+    args = parser.parse_args(argv)
+
+    groups, timestamps, values = synthetic_cohort(args.patients)
+    print(f"{args.patients:,} patients, {values.shape[0]:,} readings")
+    start = time.perf_counter()
+    grouped = cohort_metrics(groups, timestamps, values, args.patients)
+    grouped_s = time.perf_counter() - start
+    start = time.perf_counter()
+    looped = per_patient(groups, timestamps, values, args.patients)
+    looped_s = time.perf_counter() - start
+    print(f"grouped pass: {grouped_s * 1000:8.0f} ms")
+    print(f"per patient:  {looped_s * 1000:8.0f} ms ({looped_s / grouped_s:.1f}x)")
+    got = np.column_stack([grouped["mean"], grouped["cv"], grouped["tir"], grouped["hypos"]])
+    ok = np.allclose(got, looped, rtol=1e-9, equal_nan=True)
+    print(f"grouped vs per patient: {'match' if ok else 'MISMATCH'}")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = Storage(data_dir)
+        users = [seed_user(storage, f"patient-{i}", COHORT_DAYS, i) for i in range(args.stored)]
+        engine = CohortEngine(storage)
+        start = time.perf_counter()
+        _, recomputed = engine.refresh()
+        print(f"cold refresh, {recomputed} patients: {(time.perf_counter() - start) * 1000:.0f} ms")
+        users[0].add_reading(to_epoch_ns(np.datetime64("now").astype(object)), 65.0, 0)
+        start = time.perf_counter()
+        _, recomputed = engine.refresh()
+        print(f"refresh after one write, {recomputed} patient: {(time.perf_counter() - start) * 1000:.0f} ms")
+        ok = ok and recomputed == 1
+        storage.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Live vs. batch event detection on synthetic CGM: both must find the same episodes and alerts.
+
+    python benchmarks/events.py [--years 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.meal_response import synthetic_cgm  # noqa: E402
+from events import EventDetector, detect_events  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--split", type=float, default=0.5, help="fraction replayed before resuming live")
+    args = parser.parse_args(argv)
+
+    timestamps, values = synthetic_cgm(args.years)
+    # Wider swings than the default rhythm, so every kind of event shows up
+    values = np.clip((values - 130) * 2.5 + 130, 40, 400)
+    n = values.shape[0]
+    print(f"{n:,} readings")
+
+    start = time.perf_counter()
+    batch_events, batch_alerts = detect_events(timestamps, values)
+    batch_time = time.perf_counter() - start
+
+    detector = EventDetector()
+    live_alerts = []
+    start = time.perf_counter()
+    for ts, value in zip(timestamps.tolist(), values.tolist()):
+        live_alerts.extend(detector.push(ts, value))
+    live_time = time.perf_counter() - start
+    print(f"batch: {batch_time * 1000:8.1f} ms")
+    print(f" live: {live_time * 1000:8.1f} ms ({live_time / n * 1e6:.2f} us/reading)")
+
+    # Resume live detection from a replayed prefix
+    split = int(n * args.split)
+    resumed = EventDetector.from_history(timestamps[:split], values[:split])
+    for ts, value in zip(timestamps[split:].tolist(), values[split:].tolist()):
+        resumed.push(ts, value)
+
+    kinds = {}
+    for event in batch_events:
+        kinds[event.kind] = kinds.get(event.kind, 0) + 1
+    print("events: " + ", ".join(f"{kind} {count:,}" for kind, count in sorted(kinds.items())))
+    ok = list(detector.events) == batch_events and live_alerts == batch_alerts
+    ok = ok and list(resumed.events) == batch_events
+    print(f"live vs batch: {'match' if ok else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Streaming export of a long history: time and peak memory against loading it all, plus the visit report.
+
+Seeds ``--years`` of 5-minute readings (older months compacted into the
+Parquet archive, as in production), exports them to CSV and Parquet and
+checks the CSV imports back unchanged.
+
+    python benchmarks/export.py [--years 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import EXPORT_FORMATS, clinician_report, export_table  # noqa: E402
+from importer import import_csv  # noqa: E402
+from readings_store import to_epoch_ns  # noqa: E402
+from storage import Storage  # noqa: E402
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def measured(fn, *args, **kwargs):
+    """``(result, seconds, peak MB)``: one timed call, then one traced for memory (tracing slows it down)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = Storage(data_dir)
+        user = storage.user(storage.add_user("patient"))
+        first = datetime.now().replace(second=0, microsecond=0) - timedelta(days=365 * args.years)
+        timestamps = to_epoch_ns(first) + np.arange(0, 365 * args.years * 1440, 5, dtype=np.int64) * _NS_PER_MINUTE
+        values = np.clip(130 + 50 * np.sin(np.arange(timestamps.shape[0]) / 30)
+                         + rng.normal(0, 15, timestamps.shape[0]), 40, 400).round()
+        user.add_readings(timestamps, values, rng.integers(0, 5, timestamps.shape[0]).astype(np.int8))
+        user.compact()
+        print(f"{args.years} years, {timestamps.shape[0]:,} readings")
+
+        _, elapsed, peak = measured(user.load_readings)
+        print(f"load_readings (everything at once): {elapsed:5.2f} s, peak {peak:6.1f} MB")
+        for fmt in EXPORT_FORMATS:
+            path = os.path.join(data_dir, f"readings.{fmt}")
+            rows, elapsed, peak = measured(export_table, user, "readings", path, fmt)
+            print(f"export {fmt:<8} {rows:,} rows: {elapsed:5.2f} s, peak {peak:6.1f} MB, "
+                  f"{os.path.getsize(path) / 1e6:.1f} MB file")
+
+        copy = storage.user(storage.add_user("copy"))
+        import_csv(os.path.join(data_dir, "readings.csv"), copy)
+        original, imported = user.load_readings(), copy.load_readings()
+        same = (np.array_equal(original.timestamps, imported.timestamps)
+                and np.array_equal(original.values, imported.values))
+        print(f"CSV round trip: {'identical' if same else 'DIFFERS'}")
+
+        start = time.perf_counter()
+        report = clinician_report(user)
+        elapsed = time.perf_counter() - start
+        print(f"clinician report: {elapsed:5.2f} s, {len(report) / 1e6:.1f} MB HTML")
+        storage.close()
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Build and reopen cost of the memory-mapped food database, and the private memory it costs each process.
+
+    python benchmarks/food_db.py [--foods 500000] [--processes 4]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.food_search import synthetic_names  # noqa: E402
+from foods import open_food_db  # noqa: E402
+
+# Run in each worker process: open the shared cache, search it, report private vs shared memory
+_WORKER = """
+import sys
+sys.path.insert(0, {root!r})
+import pandas  # noqa: F401 -- imported up front so only the food data is measured
+from foods import open_food_db
+def rollup():
+    fields = {{}}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0].endswith(":") and len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return fields
+start = rollup()
+table, index = open_food_db({csv!r}, {cache!r})
+for query in ("apple", "brwn rice", "greek yog", "salmon grilled 3oz"):
+    rows, _ = index.search(query)
+    table.frame(rows)
+end = rollup()
+private = sum(end[k] - start[k] for k in ("Private_Clean", "Private_Dirty"))
+shared = sum(end[k] - start[k] for k in ("Shared_Clean", "Shared_Dirty"))
+print(private, shared)
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=500_000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, "foods.csv")
+        cache = os.path.join(tmp, "foods")
+        rng = np.random.default_rng(0)
+        pd.DataFrame({
+            "name": synthetic_names(args.foods),
+            "carbs": rng.uniform(0, 80, args.foods).round(1),
+            "protein": rng.uniform(0, 40, args.foods).round(1),
+            "fat": rng.uniform(0, 30, args.foods).round(1),
+            "calories": rng.uniform(10, 600, args.foods).round(0),
+            "glycemic_index": rng.integers(0, 100, args.foods),
+        }).to_csv(csv, index=False)
+
+        start = time.perf_counter()
+        open_food_db(csv, cache)
+        print(f"cold build: {args.foods:,} foods in {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        table, _ = open_food_db(csv, cache)
+        print(f"warm open:  {(time.perf_counter() - start) * 1000:.1f} ms")
+        on_disk = sum(os.path.getsize(os.path.join(cache, name)) for name in os.listdir(cache))
+        print(f"cache size: {on_disk / 2**20:.1f} MiB")
+
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            print("per-process memory: skipped (needs Linux /proc)")
+            return 0
+        code = _WORKER.format(root=ROOT, csv=csv, cache=cache)
+        workers = [subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True)
+                   for _ in range(args.processes)]
+        for i, worker in enumerate(workers):
+            private, shared = map(int, worker.communicate()[0].split())
+            print(f"process {i}: {private / 1024:.1f} MiB private, {shared / 1024:.1f} MiB shared")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Food search index build time and query latency on a synthetic nutrition database.
+
+    python benchmarks/food_search.py [--foods 500000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from food_index import FoodIndex  # noqa: E402
+
+_WORDS = ("apple banana bread rice brown white chicken breast salmon broccoli sweet potato almonds oat milk "
+          "yogurt greek cheese cheddar egg scrambled boiled lentil chickpea hummus spinach kale tomato "
+          "olive oil pasta wholewheat quinoa beef turkey tuna avocado berries strawberry blueberry orange "
+          "cereal granola peanut butter walnut tofu tempeh beans black kidney corn tortilla").split()
+_PREPARATIONS = ("raw", "cooked", "grilled", "baked", "fried", "steamed", "roasted", "canned", "frozen", "dried")
+_SERVINGS = ("1 cup", "1/2 cup", "100g", "1 oz", "3oz", "1 slice", "1 medium", "1 tbsp")
+
+QUERIES = ["apple", "aple", "brwn rice", "chick", "greek yog", "salmon grilled 3oz", "brocoli steamed",
+           "peanut", "whole", "zzzz"]
+
+
+def synthetic_names(count, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array(_WORDS)
+    names = []
+    for i in range(count):
+        picked = words[rng.integers(0, len(words), rng.integers(1, 4))]
+        prep = _PREPARATIONS[rng.integers(len(_PREPARATIONS))]
+        serving = _SERVINGS[rng.integers(len(_SERVINGS))]
+        # A brand/variant code keeps the vocabulary growing with the database, like real data
+        names.append(f"{' '.join(picked).title()}, {prep}, brand{i % 20000} ({serving})")
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    names = synthetic_names(args.foods)
+    start = time.perf_counter()
+    index = FoodIndex.build(names)
+    print(f"build: {args.foods:,} foods, {index.vocab.shape[0]:,} tokens in {time.perf_counter() - start:.2f} s")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rows, _ = index.search(query, k=20)
+            timings.append(time.perf_counter() - start)
+        best = names[rows[0]] if rows.shape[0] else "-"
+        print(f"{query!r:>22}: {np.median(timings) * 1000:6.2f} ms median  top: {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
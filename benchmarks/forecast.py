@@ -0,0 +1,103 @@
+"""Glucose forecaster: fit over a simulated year of CGM, prediction latency, backtest and incremental fit.
+
+Simulates ``--days`` of 5-minute CGM readings for a patient whose true
+insulin sensitivity and carb ratio differ from their profile's, with three
+bolused meals a day, sensor noise and dropouts. Times the full fit, one
+prediction, a backtest of every 30 and 60 minute forecast against the
+naive "stays where it is" forecast, and checks that feeding the last day
+in one reading at a time gives the same fit as fitting it in one go.
+
+    python benchmarks/forecast.py [--days 365]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast import HORIZONS, GlucoseForecaster, carb_curve  # noqa: E402
+from iob import INSULIN_TYPES, iob_curve, on_board  # noqa: E402
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+# The patient's real ratios, and what their profile says
+TRUE_ISF, TRUE_ICR = 45.0, 12.0
+PROFILE_ISF, PROFILE_ICR = 50.0, 10.0
+
+
+def simulate(days, seed=0):
+    """``(reading ts, values), (dose ts, units, type codes), (meal ts, carbs)`` for a simulated patient."""
+    rng = np.random.default_rng(seed)
+    meal_minutes = (np.arange(days)[:, None] * 1440 + np.array([450, 750, 1140])
+                    + rng.integers(-40, 40, (days, 3))).ravel()
+    carbs = rng.uniform(20, 90, meal_minutes.shape[0]).round()
+    units = (carbs / TRUE_ICR * rng.uniform(0.8, 1.2, carbs.shape[0])).round(1)
+    minutes = np.arange(0, days * 1440, 5)
+    rapid = iob_curve("Rapid-acting")
+    insulin = on_board(meal_minutes, units, rapid, 0, minutes[-1])[::5]
+    carbs_left = on_board(meal_minutes, carbs, carb_curve(), 0, minutes[-1])[::5]
+    effect = TRUE_ISF * (np.diff(insulin, prepend=insulin[0]) - np.diff(carbs_left, prepend=carbs_left[0]) / TRUE_ICR)
+    noise = rng.normal(0, 2.0, minutes.shape[0])
+    bg = np.empty(minutes.shape[0])
+    bg[0], drift = 120.0, 0.0
+    for i in range(1, minutes.shape[0]):
+        drift = 0.8 * drift + noise[i]
+        bg[i] = bg[i - 1] + effect[i] + drift + 0.01 * (120 - bg[i - 1])
+    kept = rng.random(minutes.shape[0]) > 0.05
+    values = np.clip(bg + rng.normal(0, 3, bg.shape[0]), 40, 400)[kept]
+    start = np.datetime64("2025-01-01", "ns").astype(np.int64)
+    readings = (start + minutes[kept] * _NS_PER_MINUTE, values)
+    doses = (start + meal_minutes * _NS_PER_MINUTE, units, np.full(units.shape[0], INSULIN_TYPES.index("Rapid-acting")))
+    meals = (start + meal_minutes * _NS_PER_MINUTE, carbs)
+    return readings, doses, meals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    (timestamps, values), doses, meals = simulate(args.days)
+    print(f"{args.days} days, {timestamps.shape[0]:,} readings, {meals[0].shape[0]:,} meals")
+    start = time.perf_counter()
+    forecaster = GlucoseForecaster.from_history(timestamps, values, doses, *meals)
+    print(f"fit: {(time.perf_counter() - start) * 1000:.0f} ms over {forecaster.steps:,} steps")
+    weights = forecaster.weights(PROFILE_ISF, PROFILE_ICR)
+    print(f"  ISF {-weights[-2]:.1f} mg/dL/U (profile {PROFILE_ISF:.0f}, true {TRUE_ISF:.0f}), "
+          f"carbs {weights[-1]:.2f} mg/dL/g (profile {PROFILE_ISF / PROFILE_ICR:.2f}, "
+          f"true {TRUE_ISF / TRUE_ICR:.2f})")
+
+    timings = []
+    for _ in range(200):
+        start = time.perf_counter()
+        forecaster.predict(PROFILE_ISF, PROFILE_ICR)
+        timings.append(time.perf_counter() - start)
+    predict_ms = statistics.median(timings) * 1000
+    print(f"predict {max(HORIZONS)} min: {predict_ms:.2f} ms")
+
+    ok = predict_ms < 10
+    for horizon in HORIZONS:
+        start = time.perf_counter()
+        result = forecaster.backtest(timestamps, values, PROFILE_ISF, PROFILE_ICR, horizon)
+        elapsed = time.perf_counter() - start
+        print(f"backtest {horizon} min: {result.forecasts:,} forecasts in {elapsed * 1000:.0f} ms, "
+              f"MAE {result.mae:.1f} mg/dL (naive {result.naive_mae:.1f}), RMSE {result.rmse:.1f}")
+        ok = ok and result.mae < result.naive_mae
+
+    # The last day one reading at a time must fit exactly like the batch
+    split = np.searchsorted(timestamps, timestamps[-1] - 1440 * _NS_PER_MINUTE)
+    incremental = GlucoseForecaster.from_history(timestamps[:split], values[:split], doses, *meals)
+    start = time.perf_counter()
+    for ts, value in zip(timestamps[split:].tolist(), values[split:].tolist()):
+        incremental.add_reading(ts, value)
+    per_reading = (time.perf_counter() - start) / max(timestamps.shape[0] - split, 1) * 1000
+    same = np.allclose(incremental.weights(PROFILE_ISF, PROFILE_ICR), weights, rtol=1e-9)
+    print(f"incremental: {per_reading:.2f} ms per reading, {'matches' if same else 'DIFFERS FROM'} batch fit")
+    return 0 if ok and same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Paging through filtered reading history: indexed page fetch vs. filtering the whole frame.
+
+Both must return the same rows for every page, including deep ones.
+
+    python benchmarks/history.py [--years 5] [--page-size 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.meal_response import synthetic_cgm  # noqa: E402
+from readings_store import READING_TYPES, ReadingsStore  # noqa: E402
+
+# (label, types, notes); dates cover the middle of the history
+_FILTERS = (
+    ("all types", None, ""),
+    ("two types", ["Fasting", "Bedtime"], ""),
+    ("notes search", ["After Meal"], "walk"),
+)
+
+
+def full_scan(store, start, end, types, notes, offset, limit):
+    """The old way: a boolean mask over every row, then the page."""
+    frame = store.frame()
+    mask = (frame["datetime"] >= np.datetime64(start, "ns")) & (frame["datetime"] < np.datetime64(end, "ns"))
+    if types is not None:
+        mask &= frame["type"].isin(types)
+    if notes:
+        mask &= np.array([notes in text.lower() for text in store.notes_for(frame["id"])])
+    positions = np.flatnonzero(mask.to_numpy())[::-1]
+    return positions[offset:offset + limit], positions.shape[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    timestamps, values = synthetic_cgm(args.years)
+    n = timestamps.shape[0]
+    rng = np.random.default_rng(0)
+    store = ReadingsStore(n)
+    ids = store.extend(timestamps, values, rng.integers(0, len(READING_TYPES), n).astype(np.int8))
+    # About one reading in a hundred has notes
+    noted = rng.choice(n, n // 100, replace=False)
+    store.set_notes({int(ids[i]): rng.choice(["after a walk", "feeling sick", "Walked to work"]) for i in noted})
+    print(f"{n:,} readings, {len(noted):,} with notes")
+
+    store.frame()  # built once per version in the app too, so neither side pays for it
+    start, end = int(timestamps[n // 10]), int(timestamps[n * 9 // 10])
+    ok = True
+    for label, types, notes in _FILTERS:
+        total = store.index.page(start, end, types, notes, limit=0)[1]
+        for page in (0, total // args.page_size // 2):
+            offset = page * args.page_size
+            begin = time.perf_counter()
+            for _ in range(args.repeat):
+                rows, _ = store.index.page(start, end, types, notes, offset, args.page_size)
+            indexed = (time.perf_counter() - begin) / args.repeat
+            begin = time.perf_counter()
+            expected, expected_total = full_scan(store, start, end, types, notes, offset, args.page_size)
+            scanned = time.perf_counter() - begin
+            ok = ok and np.array_equal(rows, expected) and total == expected_total
+            print(f"{label:<13} page {page + 1:>6,} of {total:>9,}: index {indexed * 1000:7.3f} ms, "
+                  f"full scan {scanned * 1000:8.1f} ms")
+    print(f"index vs scan: {'match' if ok else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
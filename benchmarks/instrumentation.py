@@ -0,0 +1,58 @@
+"""Cost of a timing span with profiling off and on, over a bare ``with`` block.
+
+    python benchmarks/instrumentation.py [--spans 1000000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import Profiler  # noqa: E402
+
+# Extra cost of a span over a bare ``with`` while nothing is profiled; wrapped stages take milliseconds
+MAX_DISABLED_NS = 500
+
+
+class _Nothing:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def per_span_ns(enter, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        with enter("stage"):
+            pass
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spans", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    profiler = Profiler(enabled=False, log_path=None, metrics_path=None)
+    nothing = _Nothing()
+    bare_ns = per_span_ns(lambda name: nothing, args.spans)
+    disabled_ns = per_span_ns(profiler.span, args.spans) - bare_ns
+    with profiler.render("page", enabled=True):
+        enabled_ns = per_span_ns(profiler.span, args.spans) - bare_ns
+    render, = profiler.last_renders()
+    print(f"span, profiling off: {disabled_ns:7.1f} ns")
+    print(f"span, profiling on:  {enabled_ns:7.1f} ns")
+
+    exported = json.loads(profiler.to_json())
+    ok = (disabled_ns < MAX_DISABLED_NS and len(render.spans) == args.spans
+          and exported["spans"]["stage"]["count"] == args.spans)
+    print(f"checks: {'ok' if ok else 'FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Throughput of the vectorized bolus calculator and its agreement with the UI's scalar path.
+
+    python benchmarks/insulin.py [--size 5000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insulin import bolus, bolus_batch  # noqa: E402
+
+
+def random_inputs(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(
+        current_bg=rng.uniform(40, 600, size),
+        carbs=rng.uniform(0, 200, size),
+        carb_ratio=rng.choice(np.arange(5.0, 50.5, 0.5), size),
+        correction_factor=rng.choice(np.arange(10.0, 101.0), size),
+        target_bg=rng.choice(np.arange(80.0, 151.0), size),
+        exercise=rng.random(size) < 0.3,
+        illness=rng.random(size) < 0.2,
+    )
+
+
+def check_agreement(samples=20_000):
+    """Compare every field of the batch result against the scalar path; returns mismatches."""
+    inputs = random_inputs(samples, seed=1)
+    batch = bolus_batch(**inputs)
+    mismatches = 0
+    for i in range(samples):
+        scalar = bolus(**{name: values[i].item() for name, values in inputs.items()})
+        mismatches += any(float(field[i]) != value for field, value in zip(batch, scalar))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    inputs = random_inputs(args.size)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        bolus_batch(**inputs)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"bolus_batch: {args.size:,} evaluations in {best * 1000:.1f} ms "
+          f"({args.size / best / 1e6:.1f} M/s)")
+
+    mismatches = check_agreement()
+    print(f"scalar agreement: {'exact' if not mismatches else f'{mismatches} mismatches'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
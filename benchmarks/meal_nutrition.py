@@ -0,0 +1,70 @@
+"""Time to join a meal log against the food database and total its nutrition per day and week.
+
+    python benchmarks/meal_nutrition.py [--meals 100000] [--foods 100000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.meal_planner import synthetic_table  # noqa: E402
+from food_index import FoodIndex  # noqa: E402
+from meal_nutrition import nutrition_frame, nutrition_totals  # noqa: E402
+
+# What people type: partial names, typos and assorted portion styles
+_TYPED_FOODS = ["apple", "aple", "brown rice", "greek yogurt", "salmon grilled", "brocoli", "peanut butter",
+                "oat milk", "chickpea hummus", "tofu", "sweet potato baked", "lentil", "pizza", "quinoa"]
+_PORTIONS = ["", "1", "2 servings", "1/2", "1 1/2 cups", "150g", "3 oz", "half", "1 large", "2 slices", "1 tbsp"]
+
+
+def synthetic_meals(count, distinct_foods=300, seed=0):
+    rng = np.random.default_rng(seed)
+    foods = [f"{_TYPED_FOODS[i % len(_TYPED_FOODS)]} {i // len(_TYPED_FOODS) or ''}".strip()
+             for i in range(distinct_foods)]
+    start = datetime(2025, 1, 1)
+    minutes = np.sort(rng.integers(0, 365 * 1440, count))
+    return [
+        {
+            "datetime": start + timedelta(minutes=int(minute)),
+            "date": (start + timedelta(minutes=int(minute))).date(),
+            "meal": "Lunch",
+            "food": foods[rng.integers(distinct_foods)],
+            "portion": _PORTIONS[rng.integers(len(_PORTIONS))],
+            "carbs": 0.0 if rng.random() < 0.7 else float(rng.integers(5, 90)),
+        }
+        for minute in minutes
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100_000)
+    parser.add_argument("--foods", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    import pandas  # noqa: F401 -- loaded lazily by the app; keep the import out of the timings
+
+    table = synthetic_table(args.foods)
+    index = FoodIndex.build(table.names)
+    meals = synthetic_meals(args.meals)
+
+    start = time.perf_counter()
+    joined = nutrition_frame(meals, table, index)
+    joined_s = time.perf_counter() - start
+    matched = joined["matched_food"].notna().mean()
+    print(f"join: {args.meals:,} meals against {args.foods:,} foods in {joined_s * 1000:.0f} ms "
+          f"({matched:.0%} matched)")
+    for period in ("D", "W"):
+        start = time.perf_counter()
+        totals = nutrition_totals(joined, period)
+        print(f"totals per {period}: {len(totals):,} periods in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Time to generate a week of meal plans, on the sample foods and on a large synthetic database.
+
+    python benchmarks/meal_planner.py [--foods 500000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.food_search import synthetic_names  # noqa: E402
+from food_index import FoodIndex  # noqa: E402
+from foods import FoodTable, load_food_table  # noqa: E402
+from meal_planner import PREFERENCES, MealPlanner  # noqa: E402
+
+CALORIE_TARGETS = (1200, 1800, 2500)
+
+
+def synthetic_table(count, seed=0):
+    rng = np.random.default_rng(seed)
+    carbs = rng.uniform(0, 60, count)
+    protein = rng.uniform(0, 35, count)
+    fat = rng.uniform(0, 25, count)
+    return FoodTable(synthetic_names(count, seed), {
+        "carbs": carbs,
+        "protein": protein,
+        "fat": fat,
+        "calories": 4 * carbs + 4 * protein + 9 * fat,
+        "glycemic_index": np.where(carbs > 5, rng.integers(15, 95, count), 0),
+    })
+
+
+def run(label, table):
+    planner = MealPlanner(table, FoodIndex.build(table.names))
+    print(f"{label}: {len(table):,} foods")
+    for preference in PREFERENCES:
+        timings, misses = [], []
+        for target in CALORIE_TARGETS:
+            start = time.perf_counter()
+            week = planner.plan_week(target, preference, weight_kg=70)
+            timings.append(time.perf_counter() - start)
+            misses.extend(abs(sum(m.totals["calories"] for m in day.values()) - target) / target for day in week)
+        print(f"  {preference:>13}: week in {max(timings) * 1000:6.1f} ms worst, "
+              f"{np.mean(misses) * 100:4.1f}% mean calorie miss")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=500_000)
+    args = parser.parse_args(argv)
+
+    run("sample database", load_food_table(None))
+    run("synthetic database", synthetic_table(args.foods))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Load test: concurrent dashboard sessions against a shared multi-user store.
+
+Seeds ``--users`` patients with two months of 5-minute readings each, checks
+that one user's dashboard query costs the same with one user or all of them
+stored, then runs ``--sessions`` threads that each load a random user's
+dashboard (readings, meals and doses for 30 days) and log a reading every
+``--write-every`` requests.
+
+    python benchmarks/multi_user.py [--users 100] [--sessions 32] [--seconds 10]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from readings_store import to_epoch_ns  # noqa: E402
+from storage import Storage, window_bounds  # noqa: E402
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+DASHBOARD_DAYS = 30
+
+
+def seed_user(storage, name, days, seed):
+    rng = np.random.default_rng(seed)
+    user = storage.user(storage.add_user(name))
+    start = to_epoch_ns(datetime.now() - timedelta(days=days))
+    timestamps = start + np.arange(0, days * 1440, 5, dtype=np.int64) * _NS_PER_MINUTE
+    values = np.clip(130 + rng.normal(0, 35, timestamps.shape[0]), 40, 400)
+    user.add_readings(timestamps, values, rng.integers(0, 5, timestamps.shape[0]).astype(np.int8))
+    for day in range(days):
+        when = datetime.now() - timedelta(days=day, hours=5)
+        user.add_meal({"date": when.date(), "meal": "Lunch", "food": "Apple", "portion": "1", "carbs": 25.0,
+                       "datetime": when, "timestamp": when})
+        user.add_dose(to_epoch_ns(when), 4.0, 1)
+    return user
+
+
+def dashboard(user):
+    start, end = window_bounds(DASHBOARD_DAYS)
+    user.data_version()
+    readings = user.load_readings(start, end)
+    user.load_meals(start, end)
+    user.load_doses(start, end)
+    return len(readings)
+
+
+def query_ms(user, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dashboard(user)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def percentiles(samples):
+    samples = np.array(samples) * 1000
+    return " ".join(f"p{p} {np.percentile(samples, p):6.1f} ms" for p in (50, 95, 99))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=int, default=60, help="days of history per user")
+    parser.add_argument("--sessions", type=int, default=32, help="concurrent session threads")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-every", type=int, default=10, help="requests per logged reading")
+    parser.add_argument("--pool-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        kwargs = {} if args.pool_size is None else {"pool_size": args.pool_size}
+        storage = Storage(data_dir, **kwargs)
+        start = time.perf_counter()
+        users = [seed_user(storage, "patient-0", args.days, 0)]
+        alone = query_ms(users[0])
+        users += [seed_user(storage, f"patient-{i}", args.days, i) for i in range(1, args.users)]
+        print(f"seeded {args.users} users x {args.days} days in {time.perf_counter() - start:.1f} s")
+        shared = query_ms(users[0])
+        print(f"one user's dashboard: {alone:.1f} ms alone, {shared:.1f} ms with {args.users} users stored")
+
+        reads, writes, errors = [], [], []
+        deadline = time.perf_counter() + args.seconds
+
+        def session(seed):
+            rng = random.Random(seed)
+            requests = 0
+            try:
+                while time.perf_counter() < deadline:
+                    user = rng.choice(users)
+                    started = time.perf_counter()
+                    dashboard(user)
+                    reads.append(time.perf_counter() - started)
+                    requests += 1
+                    if requests % args.write_every == 0:
+                        started = time.perf_counter()
+                        user.add_reading(to_epoch_ns(datetime.now()), rng.uniform(60, 250), 0)
+                        writes.append(time.perf_counter() - started)
+            except Exception as exc:  # reported below; one failing session shouldn't hide the others
+                errors.append(exc)
+
+        threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        storage.close()
+
+    print(f"{args.sessions} sessions for {args.seconds:.0f} s: {len(reads) / args.seconds:.0f} dashboards/s, "
+          f"{len(writes) / args.seconds:.0f} writes/s")
+    if reads:
+        print(f"  dashboard {percentiles(reads)}")
+    if writes:
+        print(f"  write     {percentiles(writes)}")
+    if errors:
+        print(f"{len(errors)} sessions failed: {errors[0]!r}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Cold-start benchmark: time to first render of each page in a fresh interpreter.
+
+Every measurement runs in a new Python process, as on a freshly scheduled
+pod, and opens the page directly through its ``?page=`` deep link. The
+reported time covers importing Streamlit, the app and the page's
+dependencies, plus the first script run.
+
+    python benchmarks/startup.py [--repeat 3] [--page "📈 Analytics"]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.query_params["page"] = sys.argv[2]
+at.run()
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("pandas", "plotly.express", "pyarrow") if m in sys.modules]
+print(json.dumps({"seconds": elapsed, "errors": [e.value for e in at.exception], "heavy_imports": heavy}))
+"""
+
+
+def measure(page, data_dir):
+    env = dict(os.environ, DIABETCARE_DATA_DIR=data_dir)
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, os.path.join(ROOT, "app.py"), page],
+        capture_output=True, text=True, env=env, cwd=ROOT, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    sys.path.insert(0, ROOT)
+    from views import PAGES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--page", action="append", choices=list(PAGES), help="page to measure (default: all)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for page in args.page or PAGES:
+            runs = [measure(page, data_dir) for _ in range(args.repeat)]
+            errors = runs[-1]["errors"]
+            results[page] = {
+                "median_s": statistics.median(r["seconds"] for r in runs),
+                "min_s": min(r["seconds"] for r in runs),
+                "heavy_imports": runs[-1]["heavy_imports"],
+            }
+            status = "ERROR " + errors[0][:60] if errors else ", ".join(runs[-1]["heavy_imports"]) or "-"
+            print(f"{page:28s} median {results[page]['median_s'] * 1000:7.0f} ms   "
+                  f"min {results[page]['min_s'] * 1000:7.0f} ms   heavy imports: {status}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""Benchmark suite: every page and the main calculations on synthetic patients of 1k, 100k and 10M readings.
+
+Each size runs in its own process against a fresh data directory seeded with
+a synthetic CGM trace ending now (daily rhythm, meal excursions, noise and
+sensor gaps), three logged meals a day with their boluses, a profile and a
+food database. Calculations run on the full history; pages are driven
+headlessly through Streamlit's AppTest, cold (empty caches) and warm (a
+rerun of the same session). Every stage records its best latency over a few
+runs and its peak traced memory; a separate, traced run supplies the memory
+figure so tracing doesn't distort the timing. Each timed run is preceded by
+a fixed calibration workload, and a stage keeps the calibration time of its
+best run alongside its own.
+
+The 10m size takes tens of minutes and several GB of memory, so it only
+runs when asked for with ``--sizes``.
+
+Results are compared against a stored baseline (``--baseline``, written by
+``--write-baseline`` on the machine that checks it) and any stage slower or
+hungrier than ``--tolerance`` beyond it fails the run. So does a stage the
+baseline has no figure for, unless the run is writing the baseline. Baseline
+times are scaled by the ratio of the two calibration times, so a shared
+machine getting slower or busier, even partway through a run, doesn't fail
+the stages it happened to slow down.
+
+    python benchmarks/suite.py [--sizes 1k 100k 10m] [--write-baseline] [--tolerance 0.5]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Size label -> (readings, minutes between readings, timed runs per stage); 10M readings is 19 years
+# of a 1-minute sensor. The fastest run relative to its calibration counts.
+SIZES = {"1k": (1_000, 5, 5), "100k": (100_000, 5, 5), "10m": (10_000_000, 1, 1)}
+# Sizes run when --sizes isn't given; the 10m one needs several GB
+DEFAULT_SIZES = ["1k", "100k"]
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+# Allowed slowdown or growth over the baseline: repeat runs of unchanged code on a shared
+# single-CPU machine spread by up to about 40% even after calibration
+TOLERANCE = 0.5
+# Slowdowns smaller than these are noise however large the ratio
+MIN_SECONDS = 0.005
+MIN_MB = 1.0
+PAGE_TIMEOUT = 1800
+SEARCHES = ["apple", "aple", "brwn rice", "chick", "greek yog", "salmon grilled 3oz", "brocoli steamed",
+            "peanut", "whole", "zzzz"] * 2
+BOLUS_CALLS = 1000
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_DAY = 1440 * _NS_PER_MINUTE
+# Pages whose history window is also benchmarked at "All time": page -> window selectbox key
+_ALL_TIME = {"📊 Blood Sugar Tracker": "history_window", "📈 Analytics": "analytics_window"}
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def calibration():
+    """A fixed NumPy and pure-Python workload: how fast this machine is running right now."""
+    values = np.random.default_rng(0).random(1_000_000)
+    np.sort(values)
+    return sum(i * i for i in range(300_000))
+
+
+def timed(fn, repeats=1):
+    """``(result, seconds, calibration seconds)`` of the run of ``fn`` that was fastest relative to
+    the calibration workload timed just before it."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        calibration()
+        calibrated = time.perf_counter() - start
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed / calibrated < best[1] / best[2]:
+            best = (result, elapsed, calibrated)
+    return best
+
+
+def measured(fn, repeats=1):
+    """``(result, seconds, calibration seconds, peak MB)``: ``timed``, then one call traced for memory."""
+    result, elapsed, calibrated = timed(fn, repeats)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, calibrated, peak
+
+
+def synthetic_patient(readings, cadence_minutes, seed=0):
+    """A CGM trace of ``readings`` readings ending now, plus three meals a day over the same span.
+
+    Returns ``(timestamps_ns, values, type_codes, meals)`` with meals as ``(ts_ns, carbs)`` pairs.
+    """
+    from readings_store import READING_TYPES, to_epoch_ns
+
+    rng = np.random.default_rng(seed)
+    now = to_epoch_ns(datetime.now().replace(second=0, microsecond=0))
+    # About 5% of the sensor's slots are gaps
+    slots = int(readings * 1.1) + 10
+    minutes = np.arange(-slots * cadence_minutes, 0, cadence_minutes, dtype=np.int64)
+    minutes = minutes[rng.random(slots) > 0.05][-readings:]
+    timestamps = now + minutes * _NS_PER_MINUTE
+    clock = (timestamps // _NS_PER_MINUTE) % 1440
+
+    # Dawn phenomenon and an evening dip, slow drift and sensor noise
+    values = 125 + 20 * np.sin((clock / 1440 - 0.2) * 2 * np.pi)
+    values += np.convolve(rng.normal(0, 4, readings), np.hanning(24), mode="same") + rng.normal(0, 4, readings)
+
+    # Breakfast, lunch and dinner every day, each raising glucose for about three hours
+    days = np.arange(timestamps[0] // _NS_PER_DAY, timestamps[-1] // _NS_PER_DAY + 1, dtype=np.int64)
+    meal_minutes = days[:, None] * 1440 + np.array([450, 750, 1140]) + rng.integers(-40, 40, (days.shape[0], 3))
+    meal_ts = meal_minutes.ravel() * _NS_PER_MINUTE
+    meal_ts = meal_ts[(meal_ts >= timestamps[0]) & (meal_ts <= timestamps[-1])]
+    carbs = rng.integers(20, 90, meal_ts.shape[0]).astype(float)
+    lo = np.searchsorted(timestamps, meal_ts)
+    hi = np.searchsorted(timestamps, meal_ts + 180 * _NS_PER_MINUTE)
+    for start, stop, meal, grams in zip(lo.tolist(), hi.tolist(), meal_ts.tolist(), carbs.tolist()):
+        after = (timestamps[start:stop] - meal) / _NS_PER_MINUTE
+        values[start:stop] += grams * 1.2 * (after / 60) * np.exp(1 - after / 60)
+    values = np.clip(values, 40, 400).round()
+    type_codes = rng.integers(0, len(READING_TYPES), readings).astype(np.int8)
+    return timestamps, values, type_codes, list(zip(meal_ts.tolist(), carbs.tolist()))
+
+
+def seed_data(readings, cadence_minutes):
+    """Fill the data directory the app will open (DIABETCARE_DATA_DIR) with one synthetic patient."""
+    from benchmarks.food_search import synthetic_names
+    from foods import DEFAULT_FOOD_DB, NUTRIENTS
+    from iob import INSULIN_TYPES
+    from storage import Storage
+
+    timestamps, values, type_codes, meals = synthetic_patient(readings, cadence_minutes)
+    storage = Storage()
+    user = storage.user(storage.default_user_id())
+    rng = np.random.default_rng(1)
+    noted = rng.choice(readings, max(readings // 100, 1), replace=False)
+    notes = dict.fromkeys(noted.tolist(), "after a walk")
+    user.add_readings(timestamps, values, type_codes, notes)
+    bolus = INSULIN_TYPES.index("Rapid-acting")
+    for ts, carbs in meals:
+        when = np.datetime64(ts, "ns").astype("datetime64[us]").item()
+        user.add_meal({"date": when.date(), "meal": ("Breakfast", "Lunch", "Dinner")[min(when.hour // 9, 2)],
+                       "food": "Brown Rice", "portion": "1 cup", "carbs": carbs, "datetime": when,
+                       "timestamp": when})
+        user.add_dose(ts, round(carbs / 10, 1), bolus)
+    user.save_profile({'name': 'Synthetic', 'age': 40, 'weight': 75.0, 'height': 175.0,
+                       'diabetes_type': 'Type 1', 'carb_ratio': 10.0, 'correction_factor': 40.0,
+                       'target_bg': 110.0, 'basal_rate': 1.0})
+    storage.compact()
+    storage.close()
+
+    # The food database grows with the history so every size exercises a proportionate index
+    foods = min(readings, 100_000)
+    with open(DEFAULT_FOOD_DB, "w", encoding="utf-8") as out:
+        out.write("name," + ",".join(NUTRIENTS) + "\n")
+        for name in synthetic_names(foods):
+            out.write(f'"{name}",' + ",".join(f"{v:.1f}" for v in rng.uniform(0, 60, len(NUTRIENTS))) + "\n")
+    return len(meals)
+
+
+def calculation_stages(repeats=1):
+    """``{stage: (seconds, peak MB)}`` for the calculations behind the pages, on the full history."""
+    from cgm_metrics import cgm_metrics
+    from analytics_engine import GlucoseStats
+    from downsample import downsample
+    from events import detect_events
+    from foods import open_food_db
+    from forecast import GlucoseForecaster
+    from insulin import bolus
+    from readings_index import ReadingsIndex
+    from readings_store import to_epoch_ns
+    from storage import Storage, window_bounds
+
+    storage = Storage()
+    user = storage.user(storage.default_user_id())
+    results = {}
+
+    def stage(name, fn):
+        result, seconds, calibrated, peak = measured(fn, repeats)
+        results[name] = (seconds, peak, calibrated)
+        log(f"  {name:<40} {seconds * 1000:10.1f} ms {peak:9.1f} MB")
+        return result
+
+    history = stage("load readings (all)", user.load_readings)
+    stage("load readings (30 days)", lambda: user.load_readings(*window_bounds(30)))
+    timestamps, values = history.timestamps, history.values
+    stage("cgm metrics (all)", lambda: cgm_metrics(timestamps, values))
+    stage("glucose stats (all)", lambda: GlucoseStats.from_arrays(timestamps, values))
+    stage("event detection (all)", lambda: detect_events(timestamps, values))
+    stage("chart downsample (all)", lambda: downsample(timestamps, values))
+    stage("history page (2 types, middle page)", lambda: ReadingsIndex(history).page(
+        types=["Fasting", "Bedtime"], offset=len(history) // 5, limit=50))
+    meals = stage("load meals (all)", user.load_meals)
+    doses = user.load_doses()
+    meal_ts = [to_epoch_ns(meal["datetime"]) for meal in meals]
+    meal_carbs = [meal["carbs"] for meal in meals]
+    forecaster = stage("forecaster fit (all)", lambda: GlucoseForecaster.from_history(
+        timestamps, values, doses, meal_ts, meal_carbs))
+    stage("forecast", lambda: forecaster.predict(40.0, 10.0, 60))
+    # The first open builds the memory-mapped cache, as the app's first start does
+    open_food_db()
+    _, index = stage("food database open", open_food_db)
+    stage(f"food search ({len(SEARCHES)} queries)", lambda: [index.search(query) for query in SEARCHES])
+    stage(f"bolus calculation ({BOLUS_CALLS} calls)", lambda: [
+        bolus(80 + i % 200, i % 90, 10.0, 40.0, 110.0, i % 3 == 0, i % 7 == 0) for i in range(BOLUS_CALLS)])
+    storage.close()
+    return results
+
+
+def page_stages(repeats=1):
+    """``{stage: (seconds, peak MB)}`` for each page, cold and warm, plus the history pages at "All time"."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from views import PAGES, load_page
+
+    app = os.path.join(ROOT, "app.py")
+    results, errors = {}, []
+    # Imports are the startup benchmark's business: load every page's modules before timing any
+    for page in PAGES:
+        load_page(page)
+
+    def visit(page, window_key=None):
+        at = AppTest.from_file(app, default_timeout=PAGE_TIMEOUT)
+        at.query_params["page"] = page
+        at.run()
+        if window_key is not None and not at.exception:
+            at.selectbox(key=window_key).set_value("All time").run()
+        return at
+
+    # One untimed visit warms up the script runner itself
+    visit(next(iter(PAGES)))
+    for page in PAGES:
+        label = page.split(" ", 1)[1]
+        for name, window_key in ((label, None), (f"{label} (all time)", _ALL_TIME.get(page))):
+            if name != label and window_key is None:
+                continue
+
+            def cold_visit():
+                st.cache_resource.clear()
+                return visit(page, window_key)
+
+            at, cold, cold_calibrated = timed(cold_visit, repeats)
+            _, warm, warm_calibrated = timed(at.run, repeats)
+            errors += [f"{name}: {exception.value}" for exception in at.exception]
+            st.cache_resource.clear()
+            tracemalloc.start()
+            visit(page, window_key)
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            results[f"page {name}, cold"] = (cold, peak, cold_calibrated)
+            # A rerun allocates little and is not traced
+            results[f"page {name}, warm"] = (warm, None, warm_calibrated)
+            log(f"  page {name:<35} cold {cold * 1000:8.1f} ms, warm {warm * 1000:8.1f} ms {peak:9.1f} MB")
+    return results, errors
+
+
+def run_size(size):
+    """Seed and measure one size in this process; prints the results as JSON."""
+    readings, cadence, repeats = SIZES[size]
+    log(f"{size}: seeding {readings:,} readings...")
+    start = time.perf_counter()
+    meals = seed_data(readings, cadence)
+    log(f"{size}: {readings:,} readings and {meals:,} meals seeded in {time.perf_counter() - start:.1f} s")
+    results = calculation_stages(repeats)
+    pages, errors = page_stages(repeats)
+    results.update(pages)
+    print(json.dumps({"results": results, "errors": errors}))
+
+
+def compare(results, baseline, tolerance):
+    """Print each stage against the baseline; returns the stages that regressed.
+
+    ``base ms`` is the baseline time scaled to the machine's current speed:
+    multiplied by the stage's calibration time now over its calibration time
+    when the baseline was written.
+    """
+    regressions = []
+    print(f"{'stage':<58} {'ms':>10} {'base ms':>10} {'MB':>8} {'base MB':>8}")
+    for key, (seconds, peak, calibrated) in results.items():
+        base = baseline.get(key)
+        flags = []
+        if base is not None:
+            base_seconds, base_peak, base_calibrated = base
+            base_seconds *= calibrated / base_calibrated
+            base = (base_seconds, base_peak)
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_SECONDS:
+                flags.append("SLOWER")
+            if (peak is not None and base_peak is not None
+                    and peak > base_peak * (1 + tolerance) and peak - base_peak > MIN_MB):
+                flags.append("MORE MEMORY")
+        if flags:
+            regressions.append(key)
+        base_ms = "-" if base is None else f"{base[0] * 1000:.1f}"
+        base_mb = "-" if base is None or base[1] is None else f"{base[1]:.1f}"
+        mb = "-" if peak is None else f"{peak:.1f}"
+        print(f"{key:<58} {seconds * 1000:10.1f} {base_ms:>10} {mb:>8} {base_mb:>8} {' '.join(flags)}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=DEFAULT_SIZES)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--write-baseline", "--save-baseline", action="store_true",
+                        help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown/growth over the baseline")
+    parser.add_argument("--child", choices=list(SIZES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_size(args.child)
+        return 0
+
+    results, errors = {}, []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, DIABETCARE_DATA_DIR=data_dir)
+            env.pop("DIABETCARE_FOOD_DB", None)
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", size],
+                                 stdout=subprocess.PIPE, text=True, env=env, cwd=ROOT, check=True)
+        measured_size = json.loads(out.stdout.strip().splitlines()[-1])
+        results.update({f"{size}/{stage}": value for stage, value in measured_size["results"].items()})
+        errors += [f"{size}/{error}" for error in measured_size["errors"]]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as stored:
+            baseline = json.load(stored)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for error in errors:
+        print(f"page error: {error}")
+
+    missing = [key for key in results if key not in baseline]
+    if args.write_baseline:
+        # Sizes not run this time keep their stored figures
+        with open(args.baseline, "w", encoding="utf-8") as out:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "saved": datetime.now().isoformat(timespec="seconds"),
+                       "results": {**baseline, **results}}, out, indent=1, ensure_ascii=False)
+        print(f"Baseline saved to {args.baseline}")
+    elif missing:
+        print(f"No baseline figures in {args.baseline} for {len(missing)} stage(s); "
+              "run with --write-baseline to record them.")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: " + ", ".join(regressions))
+    # A run that writes the baseline accepts its figures
+    return 1 if errors or ((regressions or missing) and not args.write_baseline) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+from collections import namedtuple
+
+import numpy as np
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_DAY = 1440 * _NS_PER_MINUTE
+
+# International consensus (Battelino et al., 2019) glucose bands in mg/dL: (name, lower bound inclusive)
+RANGE_BANDS = (
+    ("very_low", 0.0),      # < 54, TBR level 2
+    ("low", 54.0),          # 54-69, TBR level 1
+    ("in_range", 70.0),     # 70-180, TIR
+    ("high", 181.0),        # 181-250, TAR level 1
+    ("very_high", 251.0),   # > 250, TAR level 2
+)
+# A reading stands for the time until the next one, but never more than this (sensor gaps count as missing)
+MAX_GAP_MINUTES = 15
+AGP_PERCENTILES = (5, 25, 50, 75, 95)
+AGP_BIN_MINUTES = 15
+
+CGMMetrics = namedtuple("CGMMetrics", [
+    "readings", "hours", "mean", "sd", "cv", "gmi", "mage", "lbgi", "hbgi", "ranges",
+])
+
+
+def format_metric(value, spec, unit=""):
+    """``value`` formatted for display, or an em dash when it is undefined (NaN) for too few readings."""
+    return "—" if np.isnan(value) else f"{value:{spec}}{unit}"
+
+
+def reading_weights(timestamps, max_gap_minutes=MAX_GAP_MINUTES):
+    """Minutes each reading stands for: the gap to the next reading, capped at ``max_gap_minutes``.
+
+    The last reading gets the typical (median) gap, also capped.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if timestamps.shape[0] < 2:
+        return np.full(timestamps.shape[0], float(max_gap_minutes))
+    gaps = np.diff(timestamps) / _NS_PER_MINUTE
+    return np.minimum(np.append(gaps, np.median(gaps)), max_gap_minutes)
+
+
+def time_in_ranges(timestamps, values, max_gap_minutes=MAX_GAP_MINUTES):
+    """Fraction of covered time spent in each of ``RANGE_BANDS``, weighted by ``reading_weights``."""
+    values = np.asarray(values, dtype=np.float64)
+    weights = reading_weights(timestamps, max_gap_minutes)
+    bounds = np.array([lower for _, lower in RANGE_BANDS[1:]])
+    # Readings are whole mg/dL on meters, but CGM exports may carry decimals; 180.4 is still in range
+    band = np.searchsorted(bounds, np.floor(values + 0.5), side="right")
+    per_band = np.bincount(band, weights=weights, minlength=len(RANGE_BANDS))
+    total = per_band.sum()
+    fractions = per_band / total if total else per_band
+    return {name: float(fraction) for (name, _), fraction in zip(RANGE_BANDS, fractions)}
+
+
+def gmi(mean_mg_dl):
+    """Glucose Management Indicator (%), from the mean glucose (Bergenstal et al., 2018)."""
+    return 3.31 + 0.02392 * mean_mg_dl
+
+
+def risk_indices(values):
+    """``(LBGI, HBGI)``: Kovatchev's low and high blood glucose risk indices."""
+    values = np.asarray(values, dtype=np.float64)
+    if not values.shape[0]:
+        return float("nan"), float("nan")
+    f = 1.509 * (np.log(values) ** 1.084 - 5.381)
+    risk = 10 * f * f
+    return float(np.where(f < 0, risk, 0.0).mean()), float(np.where(f > 0, risk, 0.0).mean())
+
+
+def mage(values, sd=None):
+    """Mean Amplitude of Glycemic Excursions: mean size of the swings between confirmed peaks
+    and nadirs, where a swing only counts once it exceeds one SD (Service et al., 1970)."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[0] < 3:
+        return float("nan")
+    sd = float(values.std(ddof=1)) if sd is None else sd
+    # Candidate extremes are the turning points of the series (flat runs take the direction before them)
+    direction = np.sign(np.diff(values))
+    nonzero = np.flatnonzero(direction)
+    if not nonzero.shape[0]:
+        return 0.0
+    last_move = np.maximum.accumulate(np.where(direction != 0, np.arange(direction.shape[0]), nonzero[0]))
+    direction = direction[last_move]
+    turning = np.flatnonzero(direction[1:] != direction[:-1]) + 1
+    points = values[np.concatenate(([0], turning, [values.shape[0] - 1]))].tolist()
+
+    # Zigzag over the turning points: an extreme is confirmed once the series reverses from it by > SD.
+    # First find the opening direction from the running high and low.
+    low = high = points[0]
+    for i, value in enumerate(points):
+        low, high = min(low, value), max(high, value)
+        if high - low > sd:
+            rising = value == high
+            extremes, candidate = [low if rising else high], value
+            break
+    else:
+        return 0.0
+    for value in points[i + 1:]:
+        if (value > candidate) == rising:
+            candidate = value
+        elif abs(candidate - value) > sd:
+            extremes.append(candidate)
+            candidate, rising = value, not rising
+    extremes.append(candidate)
+    swings = np.abs(np.diff(extremes))
+    swings = swings[swings > sd]
+    return float(swings.mean()) if swings.shape[0] else 0.0
+
+
+def agp_percentiles(timestamps, values, bin_minutes=AGP_BIN_MINUTES, percentiles=AGP_PERCENTILES, smooth_bins=3,
+                    minute_of_day=None):
+    """Ambulatory Glucose Profile: ``(bin_start_minutes, {percentile: array})`` by time of day.
+
+    All days are folded onto one 24-hour clock in ``bin_minutes`` bins; the
+    percentiles of every bin are read from one sort of (bin, value) and then
+    smoothed with a circular moving average over ``smooth_bins`` bins.
+    ``minute_of_day`` may be passed in from ``ReadingsStore.derived``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bins = 1440 // bin_minutes
+    if minute_of_day is None:
+        minute_of_day = (np.asarray(timestamps, dtype=np.int64) % _NS_PER_DAY) // _NS_PER_MINUTE
+    bin_of = minute_of_day // bin_minutes
+    order = np.lexsort((values, bin_of))
+    sorted_values = values[order]
+    counts = np.bincount(bin_of, minlength=bins)
+    starts = np.cumsum(counts) - counts
+
+    result = {}
+    for p in percentiles:
+        # Linear interpolation between closest ranks, like np.percentile's default
+        position = starts + (counts - 1).clip(min=0) * (p / 100)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, starts + counts - 1)
+        fraction = position - below
+        if sorted_values.shape[0]:
+            below_v = sorted_values[np.minimum(below, sorted_values.shape[0] - 1)]
+            above_v = sorted_values[np.clip(above, 0, sorted_values.shape[0] - 1)]
+            band = np.where(counts > 0, below_v + (above_v - below_v) * fraction, np.nan)
+        else:
+            band = np.full(bins, np.nan)
+        if smooth_bins > 1:
+            band = _circular_mean(band, smooth_bins)
+        result[p] = band
+    return np.arange(bins) * bin_minutes, result
+
+
+def _circular_mean(series, window):
+    """Centered moving average that wraps midnight and skips empty (NaN) bins."""
+    half = window // 2
+    padded = np.concatenate((series[-half:], series, series[:half])) if half else series
+    valid = ~np.isnan(padded)
+    kernel = np.ones(window)
+    sums = np.convolve(np.where(valid, padded, 0.0), kernel, mode="valid")
+    counts = np.convolve(valid.astype(np.float64), kernel, mode="valid")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def cgm_metrics(timestamps, values, max_gap_minutes=MAX_GAP_MINUTES):
+    """Every summary metric for one period of readings (``timestamps`` sorted, epoch ns)."""
+    values = np.asarray(values, dtype=np.float64)
+    if not values.shape[0]:
+        return CGMMetrics(0, 0.0, *([float("nan")] * 7), {name: 0.0 for name, _ in RANGE_BANDS})
+    mean = float(values.mean())
+    # One reading has no spread to measure; NaN shows as "—" rather than a misleading 0
+    sd = float(values.std(ddof=1)) if values.shape[0] > 1 else float("nan")
+    lbgi, hbgi = risk_indices(values)
+    return CGMMetrics(
+        readings=int(values.shape[0]),
+        hours=float(reading_weights(timestamps, max_gap_minutes).sum() / 60),
+        mean=mean,
+        sd=sd,
+        cv=100 * sd / mean,
+        gmi=gmi(mean),
+        mage=mage(values, sd),
+        lbgi=lbgi,
+        hbgi=hbgi,
+        ranges=time_in_ranges(timestamps, values, max_gap_minutes),
+    )
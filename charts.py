@@ -0,0 +1,40 @@
+"""Plotly figures shared by the app's pages and the clinician report."""
+import plotly.graph_objects as go
+
+from cgm_metrics import RANGE_BANDS, agp_percentiles
+
+# Consensus report colours, lowest band first
+_BAND_COLORS = ("#8b0000", "#e03c31", "#4caf50", "#f4b400", "#e67e22")
+_BAND_LABELS = ("Very low (<54)", "Low (54-69)", "In range (70-180)", "High (181-250)", "Very high (>250)")
+
+
+def agp_figure(readings):
+    """Ambulatory glucose profile of a ReadingsStore: every day folded onto one 24-hour clock."""
+    minutes, bands = agp_percentiles(readings.timestamps, readings.values,
+                                     minute_of_day=readings.derived["minute_of_day"])
+    clock = [f"{m // 60:02d}:{m % 60:02d}" for m in minutes.tolist()]
+    fig = go.Figure()
+    for low, high, name, color in ((5, 95, "5th-95th percentile", "rgba(31, 119, 180, 0.15)"),
+                                   (25, 75, "25th-75th percentile", "rgba(31, 119, 180, 0.35)")):
+        fig.add_trace(go.Scatter(x=clock, y=bands[high], mode="lines", line=dict(width=0),
+                                 showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=clock, y=bands[low], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor=color, name=name))
+    fig.add_trace(go.Scatter(x=clock, y=bands[50], mode="lines", name="Median",
+                             line=dict(color="#1f77b4", width=3)))
+    fig.add_hrect(y0=70, y1=180, fillcolor="green", opacity=0.08, line_width=0)
+    fig.update_layout(title="Glucose by Time of Day")
+    fig.update_xaxes(title="Time of Day", nticks=13)
+    fig.update_yaxes(title="Blood Sugar (mg/dL)")
+    return fig
+
+
+def time_in_ranges_figure(ranges):
+    """One stacked bar of the time spent in each consensus band (``CGMMetrics.ranges``)."""
+    fig = go.Figure()
+    for (name, _), label, color in zip(RANGE_BANDS, _BAND_LABELS, _BAND_COLORS):
+        fig.add_trace(go.Bar(x=["Time in ranges"], y=[ranges[name] * 100], name=label, marker_color=color,
+                             text=[f"{ranges[name] * 100:.1f}%"], textposition="inside"))
+    fig.update_layout(barmode="stack", title="Time in Ranges", height=450, width=380)
+    fig.update_yaxes(title="% of time", range=[0, 100])
+    return fig
@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+
+from cgm_metrics import MAX_GAP_MINUTES, RANGE_BANDS, gmi
+from events import MAX_GAP_MINUTES as EVENT_GAP_MINUTES, episode_starts
+from storage import DEFAULT_TENANT, window_bounds
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+# The clinician view summarizes this many recent days per patient
+COHORT_DAYS = 14
+# Patients computed per grouped pass, bounding the arrays held at once
+PATIENTS_PER_PASS = 500
+
+COHORT_COLUMNS = ("readings", "hours", "mean", "sd", "cv", "gmi", "tir", "tbr", "tar", "hypos")
+
+
+def cohort_metrics(groups, timestamps, values, count, max_gap_minutes=MAX_GAP_MINUTES):
+    """The Analytics page's CGM metrics for ``count`` patients in one grouped pass.
+
+    ``groups`` (0..count-1) labels each reading; readings are sorted by
+    group, then time. Returns ``{column: array}`` for ``COHORT_COLUMNS``,
+    matching ``cgm_metrics`` run on each patient separately: weights are the
+    gaps to the next reading within the patient, the last reading getting
+    the patient's median gap. ``tbr``/``tar`` cover both consensus levels and
+    ``hypos`` counts confirmed hypo episodes, as ``events`` detects them.
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[0]
+    counts = np.bincount(groups, minlength=count)
+    starts = np.cumsum(counts) - counts
+
+    # Reading weights: gap to the next reading of the same patient, capped
+    same = groups[1:] == groups[:-1]
+    gaps = np.diff(timestamps) / _NS_PER_MINUTE
+    weights = np.empty(n)
+    weights[:-1] = np.where(same, np.minimum(gaps, max_gap_minutes), 0.0)
+    # Last reading of each patient: median of that patient's gaps (like np.median: mean of the middle two)
+    gap_groups, gap_values = groups[:-1][same], gaps[same]
+    order = np.lexsort((gap_values, gap_groups))
+    sorted_gaps = gap_values[order]
+    gap_counts = np.bincount(gap_groups, minlength=count)
+    gap_starts = np.cumsum(gap_counts) - gap_counts
+    has_gaps = gap_counts > 0
+    below = gap_starts + np.maximum(gap_counts - 1, 0) // 2
+    above = gap_starts + gap_counts // 2
+    median = np.full(count, float(max_gap_minutes))
+    median[has_gaps] = (sorted_gaps[below[has_gaps]] + sorted_gaps[above[has_gaps]]) / 2
+    present = counts > 0
+    weights[(starts + counts - 1)[present]] = np.minimum(median[present], max_gap_minutes)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(groups, weights=values, minlength=count) / counts
+        centered = values - mean[groups]
+        sd = np.sqrt(np.bincount(groups, weights=centered * centered, minlength=count) / (counts - 1))
+        sd[counts < 2] = np.nan
+
+        bounds = np.array([lower for _, lower in RANGE_BANDS[1:]])
+        band = np.searchsorted(bounds, np.floor(values + 0.5), side="right")
+        per_band = np.bincount(groups * len(RANGE_BANDS) + band, weights=weights,
+                               minlength=count * len(RANGE_BANDS)).reshape(count, len(RANGE_BANDS))
+        fractions = per_band / per_band.sum(axis=1, keepdims=True)
+
+        result = {
+            "readings": counts,
+            "hours": np.bincount(groups, weights=weights, minlength=count) / 60,
+            "mean": mean,
+            "sd": sd,
+            "cv": 100 * sd / mean,
+            "gmi": gmi(mean),
+            "tir": fractions[:, 2],
+            "tbr": fractions[:, 0] + fractions[:, 1],
+            "tar": fractions[:, 3] + fractions[:, 4],
+            "hypos": _hypo_counts(groups, timestamps, values, count, starts),
+        }
+    return result
+
+
+def _hypo_counts(groups, timestamps, values, count, starts):
+    """Confirmed hypo episodes per patient, from one event replay over every patient's readings.
+
+    Each patient's readings are shifted onto their own stretch of the time
+    axis, far enough apart that the boundary is a gap the detector never
+    bridges, so one replay equals one per patient.
+    """
+    if not values.shape[0]:
+        return np.zeros(count, dtype=np.int64)
+    first = timestamps[starts[groups]]
+    span = int((timestamps - first).max()) + (EVENT_GAP_MINUTES + 1) * _NS_PER_MINUTE
+    shifted = timestamps - first + groups * span
+    return np.bincount(episode_starts(shifted, values, "hypo") // span, minlength=count)
+
+
+class CohortEngine:
+    """Per-patient metrics for every patient of a tenant, cached by each patient's data version.
+
+    ``refresh`` recomputes only patients whose data version moved (or all
+    of them once the window rolls over to a new day), in grouped passes
+    of ``PATIENTS_PER_PASS``, and returns the whole cohort. ``snapshot``
+    returns what has been computed so far without touching storage
+    readings, for pages to show while a refresh runs in the background.
+    """
+
+    def __init__(self, storage, tenant=DEFAULT_TENANT, days=COHORT_DAYS):
+        self.storage = storage
+        self.tenant = tenant
+        self.days = days
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        # user_id -> (data version, window start, {column: value})
+        self._rows = {}
+
+    def state_key(self, now=None):
+        """What a refresh would compute from: the window start and every patient's data version."""
+        patients = self.storage.users(self.tenant, role="patient")
+        return window_bounds(self.days, now)[0], tuple((p.id, p.version) for p in patients)
+
+    def refresh(self, now=None, progress=None):
+        """Bring every patient up to date; returns ``(frame, recomputed)``, see ``snapshot``.
+
+        ``progress(fraction, message)`` is called after each grouped pass.
+        """
+        with self._refreshing:
+            patients = self.storage.users(self.tenant, role="patient")
+            start = window_bounds(self.days, now)[0]
+            with self._lock:
+                stale = [p for p in patients if self._rows.get(p.id, (None, None))[:2] != (p.version, start)]
+            for first in range(0, len(stale), PATIENTS_PER_PASS):
+                rows = self._compute(stale[first:first + PATIENTS_PER_PASS], start)
+                with self._lock:
+                    self._rows.update(rows)
+                if progress is not None:
+                    done = min(first + PATIENTS_PER_PASS, len(stale))
+                    progress(done / len(stale), f"Updated {done:,} of {len(stale):,} patients")
+        return self._frame(patients), len(stale)
+
+    def snapshot(self):
+        """Cohort metrics as a DataFrame indexed by patient id with their names, for patients computed so far."""
+        return self._frame(self.storage.users(self.tenant, role="patient"))
+
+    def _frame(self, patients):
+        import pandas as pd
+
+        with self._lock:
+            known = [p for p in patients if p.id in self._rows]
+            rows = [self._rows[p.id][2] for p in known]
+        frame = pd.DataFrame(rows, index=pd.Index([p.id for p in known], name="user_id"),
+                             columns=list(COHORT_COLUMNS))
+        frame.insert(0, "name", [p.name for p in known])
+        return frame
+
+    def _compute(self, patients, start):
+        ids = np.array([p.id for p in patients], dtype=np.int64)
+        owners, timestamps, values = self.storage.load_cohort_readings(ids.tolist(), start)
+        # Owner ids -> 0..len(patients)-1; ids come sorted from storage.users
+        groups = np.searchsorted(ids, owners)
+        metrics = cohort_metrics(groups, timestamps, values, len(patients))
+        return {
+            patient.id: (patient.version, start, {column: metrics[column][i].item() for column in COHORT_COLUMNS})
+            for i, patient in enumerate(patients)
+        }
@@ -0,0 +1,84 @@
+import numpy as np
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_DAY = 1440 * _NS_PER_MINUTE
+
+
+def _calendar_columns(ts):
+    """Calendar fields for naive epoch-ns timestamps, computed with integer arithmetic only."""
+    day = ts // _NS_PER_DAY
+    minute_of_day = (ts % _NS_PER_DAY) // _NS_PER_MINUTE
+    # 1970-01-01 was a Thursday; Monday is 0 like pandas' dayofweek
+    dayofweek = (day + 3) % 7
+    # ISO weeks belong to the year containing their Thursday
+    thursday = day - dayofweek + 3
+    iso_year = thursday.astype("datetime64[D]").astype("datetime64[Y]")
+    jan1 = iso_year.astype("datetime64[D]").astype(np.int64)
+    return {
+        "day": day,
+        "minute_of_day": minute_of_day.astype(np.int16),
+        "hour": (minute_of_day // 60).astype(np.int8),
+        "dayofweek": dayofweek.astype(np.int8),
+        "week": ((thursday - jan1) // 7 + 1).astype(np.int8),
+        "iso_year": (iso_year.astype(np.int64) + 1970).astype(np.int16),
+    }
+
+
+_DTYPES = {name: values.dtype for name, values in _calendar_columns(np.zeros(1, dtype=np.int64)).items()}
+COLUMNS = tuple(_DTYPES)
+
+
+class DerivedColumns:
+    """Calendar columns derived from a ReadingsStore's timestamps, memoized across reruns.
+
+    Columns are extended only for rows appended since the last call, so the
+    cost of keeping them current scales with new readings. A re-sort of the
+    store (a back-dated reading) invalidates them and they are rebuilt once.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._arrays = {}
+        self._rows = 0
+        self._layout_version = None
+        self._frames = {}
+
+    def _refresh(self):
+        store = self._store
+        timestamps = store.timestamps  # sorts the store first if needed
+        n = timestamps.shape[0]
+        if self._layout_version != store.layout_version:
+            self._arrays, self._rows = {}, 0
+            self._layout_version = store.layout_version
+        if n == self._rows:
+            return
+        fresh = _calendar_columns(timestamps[self._rows:n])
+        for name, values in fresh.items():
+            buf = self._arrays.get(name)
+            if buf is None or buf.shape[0] < n:
+                grown = np.empty(max(n, 2 * (0 if buf is None else buf.shape[0]), 1024), dtype=values.dtype)
+                if buf is not None:
+                    grown[:self._rows] = buf[:self._rows]
+                buf = self._arrays[name] = grown
+            buf[self._rows:n] = values
+        self._rows = n
+
+    def __getitem__(self, name):
+        if name not in COLUMNS:
+            raise KeyError(name)
+        self._refresh()
+        if not self._rows:
+            return np.empty(0, dtype=_DTYPES[name])
+        return self._arrays[name][:self._rows]
+
+    def frame(self, *names):
+        """``store.frame()`` plus the requested derived columns, cached per data version."""
+        key = (self._store.version, names)
+        frame = self._frames.get(names)
+        if frame is not None and frame[0] == key:
+            return frame[1]
+        base = self._store.frame()
+        extra = {name: self[name] for name in names}
+        frame = base.assign(**extra) if extra else base
+        self._frames[names] = (key, frame)
+        return frame
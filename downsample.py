@@ -0,0 +1,93 @@
+import numpy as np
+
+# Plotly rarely renders wider than this; two points per pixel column is all a line chart can show
+CHART_WIDTH_PX = 1200
+
+
+def _bucket_extremes(y, starts):
+    """Index of the min and max of ``y`` within each bucket starting at ``starts`` (all non-empty)."""
+    lengths = np.diff(np.append(starts, y.shape[0]))
+    bucket = np.repeat(np.arange(starts.shape[0]), lengths)
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    # First position in each bucket that hits the bucket's min / max
+    min_hits = np.flatnonzero(y == mins[bucket])
+    max_hits = np.flatnonzero(y == maxs[bucket])
+    first_min = min_hits[np.unique(bucket[min_hits], return_index=True)[1]]
+    first_max = max_hits[np.unique(bucket[max_hits], return_index=True)[1]]
+    return first_min, first_max
+
+
+def minmax_indices(x, y, n_buckets):
+    """Indices keeping the lowest and highest point of each equal-width time bucket.
+
+    ``x`` must be sorted. Extremes are never dropped, so every excursion the
+    full series would draw is still visible at the chart's resolution.
+    """
+    n = x.shape[0]
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    edges = np.linspace(x[0], x[-1], n_buckets + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side="left"))
+    starts = starts[starts < n]
+    first_min, first_max = _bucket_extremes(y, starts)
+    return np.unique(np.concatenate(([0, n - 1], first_min, first_max)))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets selection of ``n_out`` indices.
+
+    One NumPy pass per bucket: the triangle areas inside each bucket are
+    computed together, and only the bucket loop itself is Python.
+    """
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Average point of every middle bucket, used as the third triangle vertex
+    lengths = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / lengths
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / lengths
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(x, y, max_points=2 * CHART_WIDTH_PX, method="minmax"):
+    """Indices of roughly ``max_points`` points that represent sorted series ``(x, y)``.
+
+    ``method`` is ``"minmax"`` (per time bucket extremes) or ``"lttb"``. LTTB
+    favours visual shape and can skip a narrow dip, so the lowest and highest
+    point of each time bucket are merged back into its selection. Either way
+    the deepest low and highest high of every bucket survive, so no
+    hypoglycemic excursion disappears from the chart.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = x.shape[0]
+    if n <= max_points:
+        return np.arange(n)
+    xs = x.view(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+
+    if method == "minmax":
+        indices = minmax_indices(xs, y, max_points // 2)
+    elif method == "lttb":
+        indices = lttb_indices(xs, y, max_points)
+        starts = np.unique(np.searchsorted(xs, np.linspace(xs[0], xs[-1], max_points // 4 + 1)[:-1]))
+        indices = np.concatenate((indices, *_bucket_extremes(y, starts[starts < n])))
+        indices = np.unique(indices)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    return indices
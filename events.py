@@ -0,0 +1,317 @@
+from bisect import bisect_left
+from collections import namedtuple
+
+import numpy as np
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+# Episode rules, as on the Emergency Info tab: a low starts below 70 mg/dL and a high above 250.
+# Episodes end only once glucose is back past the exit threshold (hysteresis), and only count
+# once they have lasted MIN_DURATION_MINUTES or, for lows, gone below the urgent threshold.
+# Thresholds are in mg/dL; ``sign`` flips highs so both kinds are detected as "below enter".
+Rule = namedtuple("Rule", ["kind", "sign", "enter", "exit", "urgent"])
+RULES = (
+    Rule("hypo", 1, 70.0, 80.0, 54.0),
+    Rule("hyper", -1, 250.0, 240.0, None),
+)
+MIN_DURATION_MINUTES = 15
+# Readings further apart than this don't continue an episode or a trend
+MAX_GAP_MINUTES = 30
+# Predictive low alert: projected value this far ahead, from the rate between the last two readings
+PREDICT_MINUTES = 20
+PREDICTED_LOW = "predicted_low"
+# After a predictive alert, another is only raised once glucose has been back at or above this
+REARM_ABOVE = 80.0
+
+EVENT_KINDS = tuple(rule.kind for rule in RULES) + (PREDICTED_LOW,)
+
+# ``end`` is None while an episode is ongoing; ``extreme`` is its nadir (hypo) or peak (hyper),
+# or the reading that raised a predicted low. ``confirmed`` is when it was raised.
+Event = namedtuple("Event", ["kind", "start", "end", "extreme", "confirmed"])
+# Raised by the reading at ``ts``; kinds are the event kinds plus "<kind>_end"
+Alert = namedtuple("Alert", ["kind", "ts", "value"])
+
+
+class EventTable:
+    """Detected events in the order they were raised, with a start-time index for range lookups."""
+
+    def __init__(self):
+        self._events = []
+        self._starts = []
+
+    def append(self, event):
+        self._events.append(event)
+        self._starts.append(event.start)
+        return len(self._events) - 1
+
+    def close(self, position, end, extreme):
+        self._events[position] = self._events[position]._replace(end=end, extreme=extreme)
+
+    def update_extreme(self, position, extreme):
+        self._events[position] = self._events[position]._replace(extreme=extreme)
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def __getitem__(self, position):
+        return self._events[position]
+
+    def between(self, start=None, end=None, kinds=None):
+        """Events starting in ``[start, end)`` (epoch ns), optionally only of ``kinds``."""
+        lo = 0 if start is None else bisect_left(self._starts, start)
+        hi = len(self._starts) if end is None else bisect_left(self._starts, end)
+        picked = self._events[lo:hi]
+        return [event for event in picked if event.kind in kinds] if kinds else picked
+
+
+class _Episode:
+    __slots__ = ("start", "last_ts", "extreme", "confirmed", "position")
+
+    def __init__(self, ts, x):
+        self.start = ts
+        self.last_ts = ts
+        self.extreme = x
+        self.confirmed = None
+        self.position = None
+
+
+class EventDetector:
+    """Streaming hypo/hyper and predictive-low detector; ``push`` is O(1) per reading.
+
+    Readings must arrive in time order. ``detect_events`` replays the same
+    rules over a whole history as array operations, and ``from_history``
+    uses it to resume live detection where the history ends, so backfilled
+    and live results are identical.
+    """
+
+    def __init__(self):
+        self.events = EventTable()
+        self._prev_ts = None
+        self._prev_value = None
+        self._episodes = {rule.kind: None for rule in RULES}
+        self._armed = True
+
+    @property
+    def last_ts(self):
+        return self._prev_ts
+
+    def push(self, ts, value):
+        """Feed one reading; returns the alerts it raises."""
+        ts, value = int(ts), float(value)
+        gap = self._prev_ts is None or ts - self._prev_ts > MAX_GAP_MINUTES * _NS_PER_MINUTE
+        alerts = []
+        in_low = False
+        for rule in RULES:
+            x = rule.sign * value
+            episode = self._episodes[rule.kind]
+            if x < rule.sign * rule.enter:
+                active = True
+            elif x >= rule.sign * rule.exit or gap:
+                active = False
+            else:
+                active = episode is not None
+
+            if episode is not None and (gap or not active):
+                # Recovery ends it at this reading; a gap ends it at the last reading seen
+                if episode.confirmed is not None:
+                    end = episode.last_ts if gap else ts
+                    self.events.close(episode.position, end, rule.sign * episode.extreme)
+                    alerts.append(Alert(f"{rule.kind}_end", ts, value))
+                episode = None
+            if active:
+                if episode is None:
+                    episode = _Episode(ts, x)
+                else:
+                    episode.last_ts = ts
+                    if x < episode.extreme:
+                        episode.extreme = x
+                        if episode.position is not None:
+                            self.events.update_extreme(episode.position, rule.sign * x)
+                if episode.confirmed is None and (
+                    ts - episode.start >= MIN_DURATION_MINUTES * _NS_PER_MINUTE
+                    or (rule.urgent is not None and x < rule.sign * rule.urgent)
+                ):
+                    episode.confirmed = ts
+                    episode.position = self.events.append(
+                        Event(rule.kind, episode.start, None, rule.sign * episode.extreme, ts)
+                    )
+                    alerts.append(Alert(rule.kind, ts, value))
+            self._episodes[rule.kind] = episode
+            if rule.kind == "hypo":
+                in_low = active
+
+        # Predictive low from the rate between the last two readings
+        predicted = False
+        if not gap and not in_low and ts > self._prev_ts:
+            rate = (value - self._prev_value) / ((ts - self._prev_ts) / _NS_PER_MINUTE)
+            predicted = value + rate * PREDICT_MINUTES < RULES[0].enter
+        if gap or (not predicted and value >= REARM_ABOVE):
+            self._armed = True
+        if predicted and self._armed:
+            self._armed = False
+            self.events.append(Event(PREDICTED_LOW, ts, ts, value, ts))
+            alerts.append(Alert(PREDICTED_LOW, ts, value))
+
+        self._prev_ts, self._prev_value = ts, value
+        return alerts
+
+    @classmethod
+    def from_history(cls, timestamps, values):
+        """A detector that has seen ``timestamps``/``values`` (sorted), built by vectorized replay."""
+        detector = cls()
+        events, _, state = _replay(timestamps, values)
+        for event in events:
+            detector.events.append(event)
+        if state is not None:
+            detector._prev_ts, detector._prev_value = state["prev"]
+            detector._armed = state["armed"]
+            for kind, open_episode in state["episodes"].items():
+                if open_episode is None:
+                    continue
+                episode = _Episode(open_episode["start"], open_episode["extreme"])
+                episode.last_ts = open_episode["last_ts"]
+                episode.confirmed = open_episode["confirmed"]
+                if episode.confirmed is not None:
+                    # The open event is the latest of its kind
+                    episode.position = next(
+                        i for i in range(len(detector.events) - 1, -1, -1) if detector.events[i].kind == kind
+                    )
+                detector._episodes[kind] = episode
+        return detector
+
+
+def detect_events(timestamps, values):
+    """Vectorized replay of ``EventDetector.push`` over sorted readings: ``(events, alerts)``."""
+    events, alerts, _ = _replay(timestamps, values)
+    return events, alerts
+
+
+def _group_firsts(positions, groups):
+    """For ``positions`` (ascending) labelled by ``groups``, the first position of each group."""
+    if not positions.shape[0]:
+        return groups[:0], positions
+    keep = np.ones(positions.shape[0], dtype=bool)
+    keep[1:] = groups[1:] != groups[:-1]
+    return groups[keep], positions[keep]
+
+
+def episode_starts(timestamps, values, kind="hypo"):
+    """Start times of the confirmed ``kind`` episodes in sorted readings, without building events."""
+    ts = np.asarray(timestamps, dtype=np.int64)
+    if not ts.shape[0]:
+        return ts[:0]
+    rule = next(rule for rule in RULES if rule.kind == kind)
+    runs = _episode_runs(ts, np.asarray(values, dtype=np.float64), _gaps(ts), rule)
+    return ts[runs.first[runs.confirmed >= 0]]
+
+
+def _gaps(ts):
+    gap = np.ones(ts.shape[0], dtype=bool)
+    gap[1:] = np.diff(ts) > MAX_GAP_MINUTES * _NS_PER_MINUTE
+    return gap
+
+
+_Runs = namedtuple("_Runs", ["active", "first", "last", "extreme", "confirmed"])
+
+
+def _episode_runs(ts, values, gap, rule):
+    """One rule's episodes as runs of readings: first/last reading, extreme (signed) and
+    confirming reading (-1 if never confirmed) per run, plus the per-reading state."""
+    x = rule.sign * values
+    enter = x < rule.sign * rule.enter
+    decisive = enter | (x >= rule.sign * rule.exit) | gap
+    # Hysteresis: the state is set by the last reading that was decisive
+    active = enter[np.maximum.accumulate(np.where(decisive, np.arange(ts.shape[0]), 0))]
+    prev_active = np.concatenate(([False], active[:-1]))
+    starts = active & (~prev_active | gap)
+    members = np.flatnonzero(active)
+    if not members.shape[0]:
+        empty = members[:0]
+        return _Runs(active, empty, empty, x[:0], empty)
+    member_runs = (np.cumsum(starts) - 1)[members]
+    run_first = np.flatnonzero(starts)
+    run_bounds = np.searchsorted(member_runs, np.arange(run_first.shape[0] + 1))
+    run_last = members[run_bounds[1:] - 1]
+    extreme = np.minimum.reduceat(x[members], run_bounds[:-1])
+
+    # Confirmation: first member past the minimum duration (or below the urgent threshold)
+    since_start = ts[members] - ts[run_first[member_runs]]
+    confirm = since_start >= MIN_DURATION_MINUTES * _NS_PER_MINUTE
+    if rule.urgent is not None:
+        confirm |= x[members] < rule.sign * rule.urgent
+    confirmed_runs, confirm_at = _group_firsts(members[confirm], member_runs[confirm])
+    confirmed_index = np.full(run_first.shape[0], -1)
+    confirmed_index[confirmed_runs] = confirm_at
+    return _Runs(active, run_first, run_last, extreme, confirmed_index)
+
+
+def _replay(timestamps, values):
+    ts = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    n = ts.shape[0]
+    if not n:
+        return [], [], None
+    gap = _gaps(ts)
+
+    # (reading index, order within a push, event or None, alert)
+    raised = []
+    state = {"episodes": {}}
+    in_low = None
+    for rule_order, rule in enumerate(RULES):
+        runs = _episode_runs(ts, values, gap, rule)
+        if rule.kind == "hypo":
+            in_low = runs.active
+        if not runs.first.shape[0]:
+            state["episodes"][rule.kind] = None
+            continue
+        after = runs.last + 1
+        closed = after < n
+        for run in np.flatnonzero(runs.confirmed >= 0).tolist():
+            confirmed = runs.confirmed[run]
+            event = Event(rule.kind, int(ts[runs.first[run]]), None, float(rule.sign * runs.extreme[run]),
+                          int(ts[confirmed]))
+            if closed[run]:
+                end_index = after[run]
+                end = int(ts[runs.last[run]]) if gap[end_index] else int(ts[end_index])
+                event = event._replace(end=end)
+                raised.append((int(end_index), 2 * rule_order, None,
+                               Alert(f"{rule.kind}_end", int(ts[end_index]), float(values[end_index]))))
+            raised.append((int(confirmed), 2 * rule_order + 1, event,
+                           Alert(rule.kind, int(ts[confirmed]), float(values[confirmed]))))
+
+        last_run = runs.first.shape[0] - 1
+        if closed[last_run]:
+            state["episodes"][rule.kind] = None
+        else:
+            confirmed = runs.confirmed[last_run]
+            state["episodes"][rule.kind] = {
+                "start": int(ts[runs.first[last_run]]),
+                "last_ts": int(ts[runs.last[last_run]]),
+                "extreme": float(runs.extreme[last_run]),
+                "confirmed": int(ts[confirmed]) if confirmed >= 0 else None,
+            }
+
+    # Predictive lows: first projected low after each re-arm
+    elapsed = np.zeros(n, dtype=np.int64)
+    elapsed[1:] = np.diff(ts)
+    trend = ~gap & (elapsed > 0)
+    rate = np.zeros(n)
+    rate[trend] = (values[1:] - values[:-1])[trend[1:]] / (elapsed[trend] / _NS_PER_MINUTE)
+    predicted = trend & ~in_low & (values + rate * PREDICT_MINUTES < RULES[0].enter)
+    rearm = gap | (~predicted & (values >= REARM_ABOVE))
+    segment = np.cumsum(rearm)
+    _, fired = _group_firsts(np.flatnonzero(predicted), segment[predicted])
+    for i in fired.tolist():
+        event = Event(PREDICTED_LOW, int(ts[i]), int(ts[i]), float(values[i]), int(ts[i]))
+        raised.append((i, 2 * len(RULES), event, Alert(PREDICTED_LOW, int(ts[i]), float(values[i]))))
+    armed = not (fired.shape[0] and segment[fired[-1]] == segment[-1])
+
+    raised.sort(key=lambda item: (item[0], item[1]))
+    events = [event for _, _, event, _ in raised if event is not None]
+    alerts = [alert for _, _, _, alert in raised]
+    state["prev"] = (int(ts[-1]), float(values[-1]))
+    state["armed"] = bool(armed)
+    return events, alerts, state
@@ -0,0 +1,241 @@
+"""Exports of one user's logs (CSV or Parquet) and the clinician visit report.
+
+Tables are streamed out of storage a calendar month at a time, so memory
+stays bounded however long the history is. CSV exports split timestamps
+into ``date`` and ``time`` columns; a readings CSV is in the importer's
+generic format and imports back as is.
+
+Command line usage::
+
+    python export.py OUT [--table readings|meals|doses|report] [--user NAME] [--data-dir DIR]
+
+The format follows OUT's extension (.csv, .parquet or, for the report, .html).
+"""
+import argparse
+import html
+import os
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from iob import BOLUS_TYPES, INSULIN_TYPES
+from readings_store import READING_TYPES
+from storage import HAS_PARQUET, ROW_COLUMNS, window_bounds
+
+EXPORT_TABLES = ("readings", "meals", "doses")
+EXPORT_FORMATS = ("csv", "parquet") if HAS_PARQUET else ("csv",)
+# Consensus reports cover the last two weeks
+REPORT_DAYS = 14
+
+_REPORT_CSS = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; color: #222; max-width: 1000px; margin: 2em auto; }
+h1 { color: #1f77b4; margin-bottom: 0; }
+table { border-collapse: collapse; margin: 0.5em 0 1.5em; }
+th, td { border-bottom: 1px solid #ddd; padding: 4px 12px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.meta { color: #666; margin-top: 0.2em; }
+.charts { display: flex; flex-wrap: wrap; align-items: flex-start; }
+@media print { .chart { page-break-inside: avoid; } }
+"""
+
+
+def readable(table, rows):
+    """Stored rows (``ROW_COLUMNS[table]``) as exported: datetimes instead of epoch ns, names instead of codes."""
+    frame = pd.DataFrame({"datetime": rows["ts"].to_numpy(np.int64).view("datetime64[ns]")})
+    if table == "readings":
+        frame["value"] = rows["value"].to_numpy(np.float64).round(1)
+        frame["type"] = np.array(READING_TYPES, dtype=object)[rows["type"].to_numpy(np.int64)]
+        frame["notes"] = rows["notes"].to_numpy(object)
+    elif table == "meals":
+        for column in ("meal", "food", "portion"):
+            frame[column] = rows[column].to_numpy(object)
+        frame["carbs"] = rows["carbs"].to_numpy(np.float64)
+        frame["logged_at"] = rows["logged_at"].to_numpy(np.int64).view("datetime64[ns]")
+    else:
+        frame["units"] = rows["units"].to_numpy(np.float64)
+        frame["insulin_type"] = np.array(INSULIN_TYPES, dtype=object)[rows["type"].to_numpy(np.int64)]
+    return frame
+
+
+def export_table(storage, table, path, fmt="csv", start=None, end=None, progress=None):
+    """Stream ``table`` of a UserStorage with ``start <= ts < end`` to a CSV or Parquet file; returns rows written.
+
+    ``progress(fraction)`` is called after each month is written.
+    """
+    span = storage.span(table)
+    first = span and (span[0] if start is None else max(span[0], start))
+    last = span and (span[1] if end is None else min(span[1], end - 1))
+
+    def chunks():
+        for rows in storage.iter_rows(table, start, end):
+            yield readable(table, rows)
+            if progress is not None:
+                progress((int(rows["ts"].iloc[-1]) - first) / max(last - first, 1))
+
+    empty = readable(table, pd.DataFrame({column: [] for column in ROW_COLUMNS[table]}))
+    write = _write_parquet if fmt == "parquet" else _write_csv
+    return write(chunks(), path, empty)
+
+
+def _csv_layout(frame):
+    seconds = frame["datetime"].to_numpy().astype("datetime64[s]")
+    days = seconds.astype("datetime64[D]")
+    layout = frame.drop(columns="datetime")
+    # Strings are formatted once per distinct day and looked up per second of the day, not per row
+    layout.insert(0, "time", _clock()[(seconds - days).astype(np.int64)])
+    distinct, day_of = np.unique(days, return_inverse=True)
+    layout.insert(0, "date", np.datetime_as_string(distinct).astype(object)[day_of])
+    return layout
+
+
+@lru_cache(maxsize=None)
+def _clock():
+    seconds = np.arange(86400)
+    clock = [f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in zip(seconds // 3600, seconds // 60 % 60, seconds % 60)]
+    return np.array(clock, dtype=object)
+
+
+def _write_csv(chunks, path, empty):
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        for frame in chunks:
+            _csv_layout(frame).to_csv(out, header=not rows, index=False, date_format="%Y-%m-%d %H:%M:%S")
+            rows += len(frame)
+        if not rows:
+            _csv_layout(empty).to_csv(out, index=False)
+    return rows
+
+
+def _write_parquet(chunks, path, empty):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows, writer = 0, None
+    try:
+        for frame in chunks:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                # One row group per month, all cast to the first month's schema
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(frame)
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def clinician_report(storage, days=REPORT_DAYS, now=None, patient=""):
+    """Self-contained HTML report of the last ``days`` days for a clinic visit.
+
+    Consensus CGM metrics, glucose episodes, daily insulin and carbs, meal
+    responses, the ambulatory glucose profile and time in ranges. Plotly is
+    embedded once so the file opens offline; browsers print it to PDF.
+    """
+    from cgm_metrics import cgm_metrics, format_metric
+    from charts import agp_figure, time_in_ranges_figure
+    from events import detect_events
+    from meal_response import aggregate_responses, response_frame
+
+    now = now or datetime.now()
+    start = window_bounds(days, now)[0]
+    readings = storage.load_readings(start)
+    metrics = cgm_metrics(readings.timestamps, readings.values)
+    title = f"Diabetes Report{f' for {patient}' if patient else ''}"
+    period = f"{pd.Timestamp(start):%d %b %Y} - {now:%d %b %Y} ({days} days)"
+    parts = [f"<h1>{html.escape(title)}</h1>",
+             f"<p class='meta'>{period} · generated {now:%d %b %Y %H:%M}</p>"]
+    if not metrics.readings:
+        parts.append("<p>No glucose readings in this period.</p>")
+        return _report_html(title, parts)
+
+    ranges = metrics.ranges
+    summary = [
+        ("Readings", f"{metrics.readings:,}"),
+        ("Sensor data", f"{metrics.hours / (days * 24) * 100:.0f}% of the period"),
+        ("Mean glucose", f"{metrics.mean:.0f} mg/dL"),
+        ("GMI", f"{metrics.gmi:.1f}%"),
+        ("Coefficient of variation", format_metric(metrics.cv, ".1f", "%")),
+        ("Time in range (70-180)", f"{ranges['in_range'] * 100:.1f}%"),
+        ("Time below range (<70)", f"{(ranges['low'] + ranges['very_low']) * 100:.1f}%"),
+        ("Time above range (>180)", f"{(ranges['high'] + ranges['very_high']) * 100:.1f}%"),
+        ("MAGE", format_metric(metrics.mage, ".1f", " mg/dL")),
+        ("LBGI / HBGI", f"{metrics.lbgi:.1f} / {metrics.hbgi:.1f}"),
+    ]
+    events, _ = detect_events(readings.timestamps, readings.values)
+    for kind, label in (("hypo", "Low episodes (<70, 15+ min)"), ("hyper", "High episodes (>250, 15+ min)")):
+        episodes = [event for event in events if event.kind == kind and event.confirmed]
+        minutes = sum((event.end or int(readings.timestamps[-1])) - event.start for event in episodes) / 60e9
+        summary.append((label, f"{len(episodes)} ({minutes / 60:.1f} h)"))
+
+    _, units, codes = storage.load_doses(start)
+    bolus = np.isin(codes, [INSULIN_TYPES.index(name) for name in BOLUS_TYPES])
+    meals = storage.load_meals(start)
+    summary += [
+        ("Daily bolus insulin", f"{units[bolus].sum() / days:.1f} U"),
+        ("Daily basal insulin", f"{units[~bolus].sum() / days:.1f} U"),
+        ("Daily carbs", f"{sum(meal['carbs'] for meal in meals) / days:.0f} g"),
+    ]
+    parts.append("<h2>Summary</h2>")
+    parts.append(pd.DataFrame(summary, columns=["Metric", "Value"]).to_html(index=False, border=0))
+
+    figures = [agp_figure(readings), time_in_ranges_figure(ranges)]
+    parts.append("<h2>Glucose Profile</h2><div class='charts'>")
+    parts += [f"<div class='chart'>{figure.to_html(full_html=False, include_plotlyjs=i == 0)}</div>"
+              for i, figure in enumerate(figures)]
+    parts.append("</div>")
+
+    if meals:
+        by_meal = aggregate_responses(response_frame(meals, readings), "meal").round(1)
+        if not by_meal.empty:
+            parts.append("<h2>Meal Responses (3 h after eating)</h2>")
+            parts.append(by_meal.rename(columns={
+                "meals": "Meals", "mean_iauc": "Mean iAUC (mg/dL·min)", "mean_peak_rise": "Mean peak rise (mg/dL)",
+                "median_time_to_peak": "Median time to peak (min)",
+            }).to_html(border=0))
+    return _report_html(title, parts)
+
+
+def _report_html(title, parts):
+    body = "\n".join(parts)
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"<style>{_REPORT_CSS}</style></head><body>{body}</body></html>")
+
+
+def main(argv=None):
+    from storage import DEFAULT_DATA_DIR, DEFAULT_TENANT, DEFAULT_USER, Storage
+
+    parser = argparse.ArgumentParser(description="Export a DiabetCare user's logs or clinician report.")
+    parser.add_argument("path", help="file to write (.csv, .parquet or .html)")
+    parser.add_argument("--table", choices=EXPORT_TABLES + ("report",), default="readings")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="storage directory")
+    parser.add_argument("--user", default=DEFAULT_USER, help="user to export")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help="tenant (clinic) of the user")
+    parser.add_argument("--days", type=int, default=REPORT_DAYS, help="days the report covers")
+    args = parser.parse_args(argv)
+
+    fmt = os.path.splitext(args.path)[1].lstrip(".").lower()
+    if args.table != "report" and fmt not in EXPORT_FORMATS:
+        parser.error(f"unsupported format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    storage = Storage(args.data_dir)
+    try:
+        user = next((u for u in storage.users(args.tenant) if u.name == args.user), None)
+        if user is None:
+            parser.error(f"no user {args.user!r} in tenant {args.tenant!r}")
+        if args.table == "report":
+            with open(args.path, "w", encoding="utf-8") as out:
+                out.write(clinician_report(storage.user(user.id), args.days, patient=user.name))
+            print(f"Wrote the {args.days}-day report for {user.name} to {args.path}")
+        else:
+            rows = export_table(storage.user(user.id), args.table, args.path, fmt)
+            print(f"Exported {rows} {args.table} to {args.path}")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
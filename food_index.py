@@ -0,0 +1,232 @@
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Match weights per query term, before IDF scaling
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHTS = {1: 0.6, 2: 0.4}
+# Cap on vocabulary tokens one query term may expand to (prefix completions / typo candidates)
+MAX_PREFIX_EXPANSIONS = 64
+MAX_TYPO_CANDIDATES = 64
+# Per-character tie-breaker so shorter, more generic names rank first
+LENGTH_PENALTY = 0.002
+
+
+def tokenize(text):
+    """Lowercase ASCII word tokens, with accents folded (``Jalapeño`` -> ``jalapeno``)."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return _TOKEN.findall(text.lower())
+
+
+def _trigrams(token):
+    # Padded so the first and last characters count as much as the middle ones
+    padded = b"\x01" + token + b"\x02"
+    return {(padded[i] << 16) | (padded[i + 1] << 8) | padded[i + 2] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Optimal-string-alignment distance between ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _csr(keys, values, size):
+    """Group ``values`` by integer ``keys`` in ``range(size)``: ``(offsets, values sorted by key, then value)``."""
+    order = np.lexsort((values, keys))
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets, values[order]
+
+
+class FoodIndex:
+    """Inverted token index over food names with prefix and typo-tolerant lookup.
+
+    The vocabulary is a sorted byte-string array, so exact and prefix lookups
+    are binary searches; postings (token -> food rows) and a trigram index
+    over the vocabulary (trigram -> tokens) are flat CSR arrays. A query only
+    touches the postings of the tokens it matches, so latency depends on how
+    many foods match, not on the size of the database.
+
+    Each query term scores a food by its best matching token (exact, prefix
+    or within edit distance 1-2) weighted by IDF; foods matching more terms
+    rank first, then by total score, then by shorter name.
+    """
+
+    # Everything needed to reopen the index; saved as one .npy file each
+    ARRAYS = ("vocab", "postings_offsets", "postings", "trigrams", "trigram_offsets", "trigram_tokens",
+              "name_lengths")
+
+    def __init__(self, vocab, postings_offsets, postings, trigrams, trigram_offsets, trigram_tokens, name_lengths):
+        self.vocab = vocab
+        self.postings_offsets = postings_offsets
+        self.postings = postings
+        self.trigrams = trigrams
+        self.trigram_offsets = trigram_offsets
+        self.trigram_tokens = trigram_tokens
+        self.name_lengths = name_lengths
+        doc_freq = np.diff(postings_offsets)
+        self._doc_freq = doc_freq
+        self._idf = np.log1p(max(len(name_lengths), 1) / np.maximum(doc_freq, 1))
+        self._token_lengths = np.char.str_len(vocab) if vocab.shape[0] else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def build(cls, names):
+        token_list, row_list = [], []
+        name_lengths = np.empty(len(names), dtype=np.int32)
+        for row, name in enumerate(names):
+            tokens = set(tokenize(name))
+            token_list.extend(tokens)
+            row_list.extend([row] * len(tokens))
+            name_lengths[row] = len(name)
+        if not token_list:
+            vocab = np.empty(0, dtype="S1")
+            empty = np.empty(0, dtype=np.int32)
+            return cls(vocab, np.zeros(1, dtype=np.int64), empty, empty, np.zeros(1, dtype=np.int64), empty,
+                       name_lengths)
+
+        vocab, token_ids = np.unique(np.array(token_list, dtype="S"), return_inverse=True)
+        postings_offsets, postings = _csr(token_ids, np.array(row_list, dtype=np.int32), vocab.shape[0])
+
+        gram_list, gram_token_list = [], []
+        for token_id, token in enumerate(vocab.tolist()):
+            grams = _trigrams(token)
+            gram_list.extend(grams)
+            gram_token_list.extend([token_id] * len(grams))
+        trigrams, gram_ids = np.unique(np.array(gram_list, dtype=np.int32), return_inverse=True)
+        trigram_offsets, trigram_tokens = _csr(gram_ids, np.array(gram_token_list, dtype=np.int32),
+                                               trigrams.shape[0])
+        return cls(vocab, postings_offsets, postings, trigrams, trigram_offsets, trigram_tokens, name_lengths)
+
+    def save(self, directory):
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory):
+        """Reopen a saved index with every array memory-mapped read-only."""
+        return cls(*(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in cls.ARRAYS))
+
+    def __len__(self):
+        return self.name_lengths.shape[0]
+
+    # Term lookup
+
+    def _term_matches(self, term):
+        """``(token_ids, weights)`` a query term matches: exactly, as a prefix, or with a typo."""
+        key = term.encode("ascii")
+        lo = int(np.searchsorted(self.vocab, key, side="left"))
+        hi = int(np.searchsorted(self.vocab, key + b"\xff", side="left"))
+        ids, weights = [], []
+        if lo < hi and self.vocab[lo] == key:
+            ids.append(lo)
+            weights.append(EXACT_WEIGHT)
+            lo += 1
+        if lo < hi:
+            completions = np.arange(lo, hi)
+            if completions.shape[0] > MAX_PREFIX_EXPANSIONS:
+                # Keep the most common completions
+                top = np.argpartition(-self._doc_freq[completions], MAX_PREFIX_EXPANSIONS)[:MAX_PREFIX_EXPANSIONS]
+                completions = completions[top]
+            ids.extend(completions.tolist())
+            weights.extend([PREFIX_WEIGHT] * completions.shape[0])
+        if not ids and len(key) >= 3:
+            ids, weights = self._typo_matches(key)
+        return np.array(ids, dtype=np.int64), np.array(weights)
+
+    def _typo_matches(self, key):
+        max_distance = 1 if len(key) <= 5 else 2
+        if not self.trigrams.shape[0]:
+            return [], []
+        grams = np.fromiter(_trigrams(key), dtype=np.int32)
+        found = np.minimum(np.searchsorted(self.trigrams, grams), self.trigrams.shape[0] - 1)
+        found = found[self.trigrams[found] == grams]
+        if not found.shape[0]:
+            return [], []
+        candidates = np.concatenate([
+            self.trigram_tokens[self.trigram_offsets[g]:self.trigram_offsets[g + 1]] for g in found
+        ])
+        tokens, shared = np.unique(candidates, return_counts=True)
+        # q-gram lemma: each edit destroys at most 3 trigrams
+        keep = (shared >= grams.shape[0] - 3 * max_distance) & (
+            np.abs(self._token_lengths[tokens] - len(key)) <= max_distance
+        )
+        tokens, shared = tokens[keep], shared[keep]
+        if tokens.shape[0] > MAX_TYPO_CANDIDATES:
+            top = np.argpartition(-shared, MAX_TYPO_CANDIDATES)[:MAX_TYPO_CANDIDATES]
+            tokens = tokens[top]
+        ids, weights = [], []
+        for token_id in tokens.tolist():
+            distance = edit_distance(key, self.vocab[token_id], max_distance)
+            if distance <= max_distance:
+                ids.append(token_id)
+                weights.append(TYPO_WEIGHTS[distance])
+        return ids, weights
+
+    # Search
+
+    def rows_with_tokens(self, words):
+        """Sorted rows of foods whose name contains any of ``words`` as a whole token."""
+        if not words or not self.vocab.shape[0]:
+            return np.empty(0, dtype=np.int64)
+        keys = np.array([word.encode("ascii") for word in words], dtype="S")
+        found = np.minimum(np.searchsorted(self.vocab, keys), self.vocab.shape[0] - 1)
+        found = found[self.vocab[found] == keys]
+        parts = [self.postings[self.postings_offsets[t]:self.postings_offsets[t + 1]] for t in found.tolist()]
+        return np.unique(np.concatenate(parts)).astype(np.int64) if parts else np.empty(0, dtype=np.int64)
+
+    def search(self, query, k=20):
+        """Top ``k`` foods for ``query`` as ``(rows, scores)``, best first."""
+        row_parts, score_parts = [], []
+        for term in dict.fromkeys(tokenize(query)):
+            token_ids, weights = self._term_matches(term)
+            if not token_ids.shape[0]:
+                continue
+            starts = self.postings_offsets[token_ids]
+            counts = self.postings_offsets[token_ids + 1] - starts
+            rows = np.concatenate([self.postings[s:s + c] for s, c in zip(starts.tolist(), counts.tolist())])
+            scores = np.repeat(weights * self._idf[token_ids], counts)
+            if token_ids.shape[0] > 1:
+                # A food counts once per term, with its best matching token
+                order = np.lexsort((-scores, rows))
+                rows, scores = rows[order], scores[order]
+                first = np.empty(rows.shape[0], dtype=bool)
+                first[:1] = True
+                np.not_equal(rows[1:], rows[:-1], out=first[1:])
+                rows, scores = rows[first], scores[first]
+            row_parts.append(rows)
+            score_parts.append(scores)
+        if not row_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        if len(row_parts) == 1:
+            rows, scores, matched = row_parts[0], score_parts[0], 1
+        else:
+            rows, inverse = np.unique(np.concatenate(row_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+            matched = np.bincount(inverse)
+        rank = scores - LENGTH_PENALTY * self.name_lengths[rows]
+        # Terms matched dominates everything else; scores stay far below this offset
+        rank = rank + 1e6 * matched
+        if rank.shape[0] > k:
+            top = np.argpartition(-rank, k)[:k]
+            rows, scores, rank = rows[top], scores[top], rank[top]
+        order = np.argsort(-rank, kind="stable")
+        return rows[order].astype(np.int64), scores[order]
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from food_index import FoodIndex
+from storage import DEFAULT_DATA_DIR
+
+# A local nutrition database; falls back to the built-in sample foods when absent
+DEFAULT_FOOD_DB = os.environ.get("DIABETCARE_FOOD_DB", os.path.join(DEFAULT_DATA_DIR, "foods.csv"))
+# Columnar copy of the database and its search index, memory-mapped by every worker
+FOOD_CACHE_DIR = os.path.join(DEFAULT_DATA_DIR, "foods")
+# Bump when the on-disk layout changes so stale caches are rebuilt
+CACHE_FORMAT = 1
+
+# Nutrient columns, per serving, and their Food Database headers
+NUTRIENTS = {
+    "carbs": "Carbs (g)",
+    "protein": "Protein (g)",
+    "fat": "Fat (g)",
+    "calories": "Calories",
+    "glycemic_index": "Glycemic Index",
+}
+
+SAMPLE_FOODS = {
+    "name": ["Apple (medium)", "White Bread (1 slice)", "Brown Rice (1/2 cup)", "Chicken Breast (3oz)",
+             "Salmon (3oz)", "Broccoli (1 cup)", "Sweet Potato (medium)", "Almonds (1 oz)"],
+    "carbs": [25, 15, 22, 0, 0, 6, 27, 6],
+    "protein": [0.5, 3, 2.5, 26, 22, 3, 2, 6],
+    "fat": [0.3, 1, 0.9, 3, 11, 0.4, 0.1, 14],
+    "calories": [95, 80, 110, 140, 175, 25, 112, 164],
+    "glycemic_index": [36, 75, 68, 0, 0, 25, 70, 15],
+}
+
+
+class NameColumn:
+    """Read-only sequence of strings stored as one UTF-8 blob plus ``len + 1`` offsets.
+
+    Both arrays may be memory-mapped; a name is only decoded when accessed.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [text.encode("utf-8") for text in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return self.offsets.shape[0] - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class FoodTable:
+    """Foods as parallel columns: ``names`` plus one float32 array per nutrient."""
+
+    def __init__(self, names, columns):
+        self.names = names
+        self.columns = {name: np.asarray(columns[name], dtype=np.float32) for name in NUTRIENTS}
+
+    def __len__(self):
+        return len(self.names)
+
+    def frame(self, rows=None):
+        """The Food Database table for ``rows`` (positions, in order), or every food."""
+        import pandas as pd
+
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        data = {"Food Item": [self.names[i] for i in rows]}
+        for name, header in NUTRIENTS.items():
+            data[header] = self.columns[name][rows]
+        return pd.DataFrame(data)
+
+    def save(self, directory):
+        names = self.names if isinstance(self.names, NameColumn) else NameColumn.from_strings(self.names)
+        names.blob.tofile(os.path.join(directory, "names.bin"))
+        np.save(os.path.join(directory, "name_offsets.npy"), names.offsets)
+        for name in NUTRIENTS:
+            np.save(os.path.join(directory, f"{name}.npy"), self.columns[name])
+
+    @classmethod
+    def load(cls, directory):
+        """Reopen a saved table with every column memory-mapped read-only."""
+        offsets = np.load(os.path.join(directory, "name_offsets.npy"), mmap_mode="r")
+        blob_path = os.path.join(directory, "names.bin")
+        # An empty file can't be mapped
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else np.empty(0, np.uint8)
+        columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in NUTRIENTS}
+        return cls(NameColumn(blob, offsets), columns)
+
+
+def load_food_table(path=DEFAULT_FOOD_DB):
+    """Read a nutrition CSV with a ``name`` column and the ``NUTRIENTS`` columns (either the
+    short names or the Food Database headers); missing nutrients read as 0."""
+    if not path or not os.path.exists(path):
+        return FoodTable(SAMPLE_FOODS["name"], SAMPLE_FOODS)
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    headers = {header.lower(): name for name, header in NUTRIENTS.items()}
+    headers["food item"] = "name"
+    df = df.rename(columns=lambda col: headers.get(str(col).strip().lower(), str(col).strip().lower()))
+    df = df.dropna(subset=["name"])
+    columns = {
+        name: pd.to_numeric(df[name], errors="coerce").fillna(0).to_numpy() if name in df else np.zeros(len(df))
+        for name in NUTRIENTS
+    }
+    return FoodTable(df["name"].astype(str).tolist(), columns)
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return {"format": CACHE_FORMAT, "source": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def open_food_db(path=DEFAULT_FOOD_DB, cache_dir=FOOD_CACHE_DIR):
+    """The food table and its search index, memory-mapped from ``cache_dir``.
+
+    The columnar cache is (re)built from the CSV at ``path`` when missing or
+    older than it. Every process maps the same read-only files, so the OS
+    page cache holds one copy however many sessions and workers there are.
+    Without a CSV the built-in sample foods are used in memory.
+    """
+    if not path or not os.path.exists(path):
+        table = load_food_table(None)
+        return table, FoodIndex.build(table.names)
+
+    fingerprint = _fingerprint(path)
+    manifest = os.path.join(cache_dir, "manifest.json")
+    try:
+        with open(manifest) as f:
+            fresh = json.load(f) == fingerprint
+    except (OSError, ValueError):
+        fresh = False
+
+    if not fresh:
+        # Build next to the cache and swap it in whole; a concurrent builder that loses the race discards its copy
+        building = f"{cache_dir}.building-{os.getpid()}"
+        shutil.rmtree(building, ignore_errors=True)
+        os.makedirs(building)
+        table = load_food_table(path)
+        table.save(building)
+        FoodIndex.build(table.names).save(building)
+        with open(os.path.join(building, "manifest.json"), "w") as f:
+            json.dump(fingerprint, f)
+        # Move the stale cache aside rather than deleting it first, so there is no window without a cache
+        # directory; processes that mapped the old files keep their mappings after it is removed
+        retired = f"{cache_dir}.old-{os.getpid()}"
+        shutil.rmtree(retired, ignore_errors=True)
+        try:
+            os.rename(cache_dir, retired)
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename(building, cache_dir)
+        except OSError:
+            shutil.rmtree(building, ignore_errors=True)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    return FoodTable.load(cache_dir), FoodIndex.load(cache_dir)
@@ -0,0 +1,228 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from cgm_metrics import MAX_GAP_MINUTES
+from iob import BOLUS_TYPES, IOBEngine, on_board
+from readings_store import MAX_MG_DL, MIN_MG_DL
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+# Model grid, in minutes; readings are interpolated onto it
+STEP_MINUTES = 5
+# How far ahead pages forecast, in minutes
+HORIZONS = (30, 60)
+# Recent 5-minute changes the trend term looks back over
+AR_ORDER = 3
+# Carbs start acting after a short delay and are absorbed evenly over 3 hours (Loop's medium absorption)
+CARB_DELAY_MINUTES = 10
+CARB_ABSORPTION_MINUTES = 180
+# Weight of the profile's ratios against the fit, in 5-minute steps of data (one day of CGM)
+PRIOR_STEPS = 288
+
+# Model inputs per step: the last AR_ORDER changes, then insulin units and carb grams absorbed during the step
+_FEATURES = AR_ORDER + 2
+
+Backtest = namedtuple("Backtest", ["forecasts", "mae", "rmse", "naive_mae"])
+
+
+@lru_cache(maxsize=None)
+def carb_curve():
+    """Fraction of a meal's carbs not yet absorbed, one entry per minute since eating."""
+    absorbed = np.arange(CARB_ABSORPTION_MINUTES + 1, dtype=np.float64) / CARB_ABSORPTION_MINUTES
+    curve = np.concatenate((np.ones(CARB_DELAY_MINUTES), 1.0 - absorbed))
+    curve.setflags(write=False)
+    return curve
+
+
+def prior_weights(correction_factor, carb_ratio):
+    """Model weights straight from the profile: no trend, ISF mg/dL per unit, ISF/ICR mg/dL per gram."""
+    weights = np.zeros(_FEATURES)
+    weights[AR_ORDER] = -correction_factor
+    weights[AR_ORDER + 1] = correction_factor / carb_ratio
+    return weights
+
+
+def _grid_start(minute):
+    # First grid point at or after a reading
+    return -(-int(np.ceil(minute)) // STEP_MINUTES) * STEP_MINUTES
+
+
+def _resample(minutes, values, first):
+    """Readings interpolated onto the grid from minute ``first`` to the last reading; NaN across gaps."""
+    grid = np.arange(first, int(minutes[-1]) // STEP_MINUTES * STEP_MINUTES + 1, STEP_MINUTES, dtype=np.int64)
+    after = np.searchsorted(minutes, grid, side="right")
+    before = minutes[after - 1]
+    bracketed = (before == grid) | (minutes[np.minimum(after, minutes.shape[0] - 1)] - before <= MAX_GAP_MINUTES)
+    return grid, np.where(bracketed, np.interp(grid, minutes, values), np.nan)
+
+
+class GlucoseForecaster:
+    """Glucose forecasts from the recent trend, carbs on board and insulin on board.
+
+    Each 5-minute change in glucose is modelled as a linear mix of the last
+    ``AR_ORDER`` changes, the rapid/short-acting insulin absorbed during the
+    step and the carbs absorbed during it (an ARX model). The fit keeps only
+    its normal equations, so new readings, doses and meals are folded in
+    incrementally; the profile's correction factor and carb ratio act as a
+    ridge prior, which is all a new user's forecast rests on. Readings,
+    doses or meals back-dated before the fitted range need a rebuild: the
+    ``add_*`` methods return False for those.
+    """
+
+    def __init__(self):
+        self._iob = IOBEngine()
+        self._meal_minutes = np.empty(0, dtype=np.int64)
+        self._meal_carbs = np.empty(0, dtype=np.float64)
+        self._xtx = np.zeros((_FEATURES, _FEATURES))
+        self._xty = np.zeros(_FEATURES)
+        self.steps = 0
+        # Latest reading (minute, mg/dL) and the last AR_ORDER + 1 grid points before it
+        self._last = None
+        self._tail_minutes = np.empty(0, dtype=np.int64)
+        self._tail_values = np.empty(0)
+
+    @classmethod
+    def from_history(cls, timestamps, values, doses=None, meal_timestamps=(), meal_carbs=()):
+        """Fit over a history: readings, ``(timestamps, units, type_codes)`` doses and meals (epoch ns, grams)."""
+        forecaster = cls()
+        if doses is not None:
+            forecaster._iob.extend(*doses)
+        meal_minutes = np.asarray(meal_timestamps, dtype=np.int64) // _NS_PER_MINUTE
+        order = np.argsort(meal_minutes, kind="stable")
+        forecaster._meal_minutes = meal_minutes[order]
+        forecaster._meal_carbs = np.asarray(meal_carbs, dtype=np.float64)[order]
+        forecaster._extend(timestamps, values)
+        return forecaster
+
+    @property
+    def last_ts(self):
+        return None if self._last is None else round(self._last[0] * _NS_PER_MINUTE)
+
+    def add_reading(self, timestamp_ns, value):
+        if self._last is not None and timestamp_ns / _NS_PER_MINUTE < self._last[0]:
+            return False
+        self._extend([timestamp_ns], [value])
+
+    def add_dose(self, timestamp_ns, units, insulin_type):
+        if insulin_type not in BOLUS_TYPES:
+            return None
+        if self._fitted_past(timestamp_ns):
+            return False
+        self._iob.add(timestamp_ns, units, insulin_type)
+
+    def add_meal(self, timestamp_ns, carbs):
+        if self._fitted_past(timestamp_ns):
+            return False
+        minute = int(timestamp_ns) // _NS_PER_MINUTE
+        at = np.searchsorted(self._meal_minutes, minute, side="right")
+        self._meal_minutes = np.insert(self._meal_minutes, at, minute)
+        self._meal_carbs = np.insert(self._meal_carbs, at, float(carbs))
+
+    def _fitted_past(self, timestamp_ns):
+        # Steps already fitted would have seen this dose or meal
+        return self._tail_minutes.shape[0] > 0 and timestamp_ns // _NS_PER_MINUTE < self._tail_minutes[-1]
+
+    def weights(self, correction_factor, carb_ratio):
+        """Fitted weights, pulled towards ``prior_weights`` as if it had ``PRIOR_STEPS`` steps of support."""
+        prior = prior_weights(correction_factor, carb_ratio)
+        # Per-feature strength, scaled by that feature's typical size so units don't matter
+        strength = PRIOR_STEPS * np.diag(self._xtx) / max(self.steps, 1) + 1e-9
+        return np.linalg.solve(self._xtx + np.diag(strength), self._xty + strength * prior)
+
+    def predict(self, correction_factor, carb_ratio, horizon_minutes=max(HORIZONS)):
+        """``(timestamps_ns, mg/dL)`` every 5 minutes from the latest reading to ``horizon_minutes`` after it."""
+        if self._last is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        start, level = int(self._last[0]), self._last[1]
+        steps = horizon_minutes // STEP_MINUTES
+        grid = start + STEP_MINUTES * np.arange(steps + 1, dtype=np.int64)
+        insulin, carbs = self._absorbed(grid)
+        # Recent changes, newest first; none across a gap in the readings
+        recent = np.nan_to_num(np.diff(self._tail_values)[::-1][:AR_ORDER])
+        recent = np.concatenate((recent, np.zeros(AR_ORDER - recent.shape[0])))
+        weights = self.weights(correction_factor, carb_ratio)
+        levels = np.empty(steps + 1)
+        levels[0] = level
+        for step in range(steps):
+            change = weights[:AR_ORDER] @ recent + weights[AR_ORDER] * insulin[step] + weights[-1] * carbs[step]
+            levels[step + 1] = levels[step] + change
+            recent = np.roll(recent, 1)
+            recent[0] = change
+        return grid * _NS_PER_MINUTE, np.clip(levels, MIN_MG_DL, MAX_MG_DL)
+
+    def backtest(self, timestamps, values, correction_factor, carb_ratio, horizon_minutes=max(HORIZONS)):
+        """Forecast ``horizon_minutes`` ahead from every grid point of a history and score against what happened.
+
+        Uses the current fit and dose/meal history. ``naive_mae`` is the error
+        of assuming glucose stays where it is, for comparison.
+        """
+        minutes = np.asarray(timestamps, dtype=np.int64) / _NS_PER_MINUTE
+        steps = horizon_minutes // STEP_MINUTES
+        if not minutes.shape[0]:
+            return Backtest(0, np.nan, np.nan, np.nan)
+        grid, levels = _resample(minutes, np.asarray(values, dtype=np.float64), _grid_start(minutes[0]))
+        anchors = np.arange(AR_ORDER, grid.shape[0] - steps)
+        if not anchors.shape[0]:
+            return Backtest(0, np.nan, np.nan, np.nan)
+        insulin, carbs = self._absorbed(grid)
+        changes = np.diff(levels)
+        recent = np.column_stack([changes[anchors - lag] for lag in range(1, AR_ORDER + 1)])
+        usable = np.isfinite(recent).all(axis=1) & np.isfinite(levels[anchors + steps])
+        anchors, recent = anchors[usable], recent[usable]
+        if not anchors.shape[0]:
+            return Backtest(0, np.nan, np.nan, np.nan)
+        weights = self.weights(correction_factor, carb_ratio)
+        predicted = levels[anchors].copy()
+        for step in range(steps):
+            change = recent @ weights[:AR_ORDER] + weights[AR_ORDER] * insulin[anchors + step] \
+                + weights[-1] * carbs[anchors + step]
+            predicted += change
+            recent = np.column_stack((change, recent[:, :-1]))
+        actual = levels[anchors + steps]
+        errors = np.clip(predicted, MIN_MG_DL, MAX_MG_DL) - actual
+        return Backtest(anchors.shape[0], np.abs(errors).mean(), np.sqrt((errors ** 2).mean()),
+                        np.abs(levels[anchors] - actual).mean())
+
+    def _absorbed(self, grid):
+        """Insulin units and carb grams absorbed over each step of a contiguous grid."""
+        start, end = int(grid[0]), int(grid[-1])
+        insulin = self._iob.iob_series(start * _NS_PER_MINUTE, end * _NS_PER_MINUTE, STEP_MINUTES, BOLUS_TYPES)[1]
+        carbs = on_board(self._meal_minutes, self._meal_carbs, carb_curve(), start, end)[::STEP_MINUTES]
+        return insulin[:-1] - insulin[1:], carbs[:-1] - carbs[1:]
+
+    def _extend(self, timestamps, values):
+        minutes = np.asarray(timestamps, dtype=np.int64) / _NS_PER_MINUTE
+        values = np.asarray(values, dtype=np.float64)
+        if not minutes.shape[0]:
+            return
+        if self._last is not None:
+            minutes = np.concatenate(([self._last[0]], minutes))
+            values = np.concatenate(([self._last[1]], values))
+        self._last = (float(minutes[-1]), float(values[-1]))
+        if self._tail_minutes.shape[0]:
+            first = int(self._tail_minutes[-1]) + STEP_MINUTES
+        else:
+            first = _grid_start(minutes[0])
+        new_grid, new_levels = _resample(minutes, values, first)
+        if not new_grid.shape[0]:
+            return
+        grid = np.concatenate((self._tail_minutes, new_grid))
+        levels = np.concatenate((self._tail_values, new_levels))
+        self._tail_minutes, self._tail_values = grid[-(AR_ORDER + 1):], levels[-(AR_ORDER + 1):]
+        if grid.shape[0] < AR_ORDER + 2:
+            return
+
+        # One row per step ending at a new grid point with AR_ORDER changes before it
+        changes = np.diff(levels)
+        insulin, carbs = self._absorbed(grid)
+        targets = np.arange(max(grid.shape[0] - new_grid.shape[0] - 1, AR_ORDER), changes.shape[0])
+        rows = np.column_stack([changes[targets - lag] for lag in range(1, AR_ORDER + 1)]
+                               + [insulin[targets], carbs[targets]])
+        outcomes = changes[targets]
+        usable = np.isfinite(rows).all(axis=1) & np.isfinite(outcomes)
+        rows, outcomes = rows[usable], outcomes[usable]
+        self._xtx += rows.T @ rows
+        self._xty += rows.T @ outcomes
+        self.steps += rows.shape[0]
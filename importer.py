@@ -0,0 +1,158 @@
+"""Bulk import of CGM and meter CSV exports.
+
+Files are streamed in chunks so memory stays bounded however long the export
+is. Each chunk is mapped onto the reading schema (timestamp, value, type,
+notes), validated against the same 40-600 mg/dL bounds as the Log Reading
+form, and appended to storage in one transaction.
+
+Command line usage::
+
+    python importer.py export.csv [--format dexcom|libre|generic] [--data-dir DIR]
+"""
+import argparse
+import csv
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from readings_store import READING_TYPES, MIN_MG_DL, MAX_MG_DL
+
+DEFAULT_CHUNKSIZE = 200_000
+
+# How each supported export names its columns. ``time`` is only set when the
+# export splits date and time; ``timestamp_format`` is passed to to_datetime.
+VendorFormat = namedtuple(
+    "VendorFormat",
+    ["date", "time", "value", "type", "notes", "timestamp_format", "skiprows", "default_type"],
+)
+
+VENDOR_FORMATS = {
+    "dexcom": VendorFormat(
+        date="Timestamp (YYYY-MM-DDThh:mm:ss)", time=None, value="Glucose Value (mg/dL)",
+        type=None, notes=None, timestamp_format="%Y-%m-%dT%H:%M:%S", skiprows=0,
+        default_type="Random",
+    ),
+    "libre": VendorFormat(
+        date="Device Timestamp", time=None, value="Historic Glucose mg/dL",
+        type=None, notes="Notes", timestamp_format="%m-%d-%Y %I:%M %p", skiprows=1,
+        default_type="Random",
+    ),
+    "generic": VendorFormat(
+        date="date", time="time", value="value", type="type", notes="notes",
+        timestamp_format="ISO8601", skiprows=0, default_type="Random",
+    ),
+}
+
+ImportResult = namedtuple("ImportResult", ["imported", "rejected"])
+
+_TYPE_CODES = {name.lower(): code for code, name in enumerate(READING_TYPES)}
+
+
+def detect_format(source):
+    """Guess the vendor format from the first lines of a CSV file."""
+    head = _peek(source, 4)
+    for name, fmt in VENDOR_FORMATS.items():
+        for line in head[fmt.skiprows:fmt.skiprows + 1]:
+            columns = next(csv.reader([line]), [])
+            if fmt.date in columns and fmt.value in columns:
+                return name
+    raise ValueError("Unrecognized CSV export: expected a Dexcom, Libre or date/time/value header")
+
+
+def _peek(source, lines):
+    if hasattr(source, "read"):
+        position = source.tell()
+        text = source.read(64 * 1024)
+        source.seek(position)
+        if isinstance(text, bytes):
+            text = text.decode("utf-8-sig", errors="replace")
+    else:
+        with open(source, encoding="utf-8-sig", errors="replace") as handle:
+            text = handle.read(64 * 1024)
+    return text.lstrip("\ufeff").splitlines()[:lines]
+
+
+def iter_chunks(source, vendor=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield ``(timestamps_ns, values, type_codes, notes, rejected)`` per chunk of ``source``.
+
+    ``notes`` maps positions within the chunk to text. Rows with an unparseable
+    timestamp or a value outside 40-600 mg/dL (including vendor "Low"/"High"
+    markers) are dropped and counted in ``rejected``.
+    """
+    vendor = vendor or detect_format(source)
+    fmt = VENDOR_FORMATS[vendor]
+    columns = [c for c in (fmt.date, fmt.time, fmt.value, fmt.type, fmt.notes) if c]
+    reader = pd.read_csv(
+        source, skiprows=fmt.skiprows, chunksize=chunksize, dtype=str, encoding="utf-8-sig",
+        usecols=lambda column: column in columns, keep_default_na=False,
+    )
+    for chunk in reader:
+        when = chunk[fmt.date] if fmt.time is None else chunk[fmt.date] + " " + chunk[fmt.time]
+        timestamps = pd.to_datetime(when, format=fmt.timestamp_format, errors="coerce")
+        values = pd.to_numeric(chunk[fmt.value], errors="coerce").to_numpy(dtype=np.float64)
+        valid = (~timestamps.isna().to_numpy()) & (values >= MIN_MG_DL) & (values <= MAX_MG_DL)
+
+        if fmt.type and fmt.type in chunk:
+            default_code = _TYPE_CODES[fmt.default_type.lower()]
+            codes = chunk[fmt.type].str.strip().str.lower().map(_TYPE_CODES).fillna(default_code)
+            codes = codes.to_numpy(dtype=np.int8)[valid]
+        else:
+            codes = np.full(int(valid.sum()), READING_TYPES.index(fmt.default_type), dtype=np.int8)
+
+        notes = {}
+        if fmt.notes and fmt.notes in chunk:
+            kept_notes = chunk[fmt.notes].to_numpy()[valid]
+            notes = {i: text for i, text in enumerate(kept_notes) if text}
+
+        yield (
+            timestamps.to_numpy(dtype="datetime64[ns]")[valid].view(np.int64),
+            values[valid].astype(np.float32),
+            codes,
+            notes,
+            int((~valid).sum()),
+        )
+
+
+def import_csv(source, storage, vendor=None, chunksize=DEFAULT_CHUNKSIZE, stats=None, progress=None):
+    """Stream ``source`` into ``storage`` (one user's ``UserStorage``) chunk by chunk.
+
+    ``stats`` (a GlucoseStats) is kept current if given; ``progress`` is
+    called with the running ImportResult after each chunk.
+    """
+    imported = rejected = 0
+    for timestamps, values, codes, notes, dropped in iter_chunks(source, vendor, chunksize):
+        rejected += dropped
+        if len(timestamps):
+            storage.add_readings(timestamps, values, codes, notes)
+            if stats is not None:
+                stats.extend(timestamps, values)
+            imported += len(timestamps)
+        if progress is not None:
+            progress(ImportResult(imported, rejected))
+    return ImportResult(imported, rejected)
+
+
+def main(argv=None):
+    from storage import DEFAULT_DATA_DIR, DEFAULT_TENANT, DEFAULT_USER, Storage
+
+    parser = argparse.ArgumentParser(description="Import a CGM/meter CSV export into DiabetCare.")
+    parser.add_argument("path", help="CSV file to import")
+    parser.add_argument("--format", choices=sorted(VENDOR_FORMATS), help="export format (default: detect)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="storage directory")
+    parser.add_argument("--user", default=DEFAULT_USER, help="user to import for (created if new)")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help="tenant (clinic) of the user")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    storage = Storage(args.data_dir)
+    try:
+        user = storage.user(storage.add_user(args.user, tenant=args.tenant))
+        result = import_csv(args.path, user, args.format, args.chunksize)
+    finally:
+        storage.close()
+    print(f"Imported {result.imported} readings ({result.rejected} rejected)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Timing spans for app reruns: where a render spends its time, per page and per stage.
+
+Spans are recorded only while a render is being profiled on the current
+thread (``DIABETCARE_PROFILE=1`` for every session, ``?profile=1`` for one);
+while no render is, a span is one attribute check returning a shared no-op.
+Span totals are exported in the Prometheus text format and the last renders
+as JSON. Set ``DIABETCARE_PROFILE_LOG`` to append every profiled render to a
+JSON-lines file and ``DIABETCARE_METRICS_FILE`` to keep a Prometheus
+textfile (for the node exporter's textfile collector) up to date.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PROFILE_ENABLED = os.environ.get("DIABETCARE_PROFILE", "").lower() not in ("", "0", "false", "no")
+PROFILE_LOG = os.environ.get("DIABETCARE_PROFILE_LOG")
+METRICS_FILE = os.environ.get("DIABETCARE_METRICS_FILE")
+# Renders kept for the debug panel
+RENDER_HISTORY = 50
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_render", "_entry", "_start")
+
+    def __init__(self, render, name):
+        self._render = render
+        self._entry = [name, render.depth, 0.0]
+
+    def __enter__(self):
+        render = self._render
+        render.spans.append(self._entry)
+        render.depth += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._entry[2] = time.perf_counter() - self._start
+        self._render.depth -= 1
+        return False
+
+
+class Render:
+    """One profiled rerun: its page, wall time and ``[name, depth, seconds]`` spans in start order."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self.seconds = 0.0
+        self.spans = []
+        self.depth = 0
+        self.error = None
+
+    @property
+    def untracked(self):
+        """Seconds outside any top-level span: widget calls, layout and serialization not wrapped in one."""
+        return max(self.seconds - sum(seconds for _, depth, seconds in self.spans if depth == 0), 0.0)
+
+    def to_dict(self):
+        return {
+            "page": self.page,
+            "started": self.started,
+            "seconds": round(self.seconds, 6),
+            "untracked": round(self.untracked, 6),
+            "error": self.error,
+            "spans": [{"name": name, "depth": depth, "seconds": round(seconds, 6)}
+                      for name, depth, seconds in self.spans],
+        }
+
+
+class Profiler:
+    """Collects profiled renders and per-span totals for one worker process.
+
+    ``render(page)`` wraps a script run; ``span(name)`` wraps a stage inside
+    it and is a shared no-op outside a profiled render, so instrumented code
+    needs no checks of its own. Collectors added with ``add_collector`` feed
+    extra counters (cache hits, ...) into the Prometheus export.
+    """
+
+    def __init__(self, enabled=PROFILE_ENABLED, history=RENDER_HISTORY, log_path=PROFILE_LOG,
+                 metrics_path=METRICS_FILE):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.metrics_path = metrics_path
+        self.renders = deque(maxlen=history)
+        self._spans = {}  # name -> [count, seconds, max seconds]
+        self._pages = {}  # page -> [renders, seconds, errors]
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Renders in progress on any thread; spans skip the thread-local lookup while there are none
+        self._active = 0
+
+    def span(self, name):
+        """Context manager timing ``name`` within the current thread's render, if it's being profiled."""
+        if not self._active:
+            return _NULL_SPAN
+        render = getattr(self._local, "render", None)
+        if render is None:
+            return _NULL_SPAN
+        return _Span(render, name)
+
+    @contextmanager
+    def render(self, page, enabled=None):
+        """Profile one script run of ``page``; ``enabled`` overrides the process-wide switch."""
+        if not (self.enabled if enabled is None else enabled):
+            yield None
+            return
+        render = Render(page)
+        self._local.render = render
+        with self._lock:
+            self._active += 1
+        start = time.perf_counter()
+        try:
+            yield render
+        except Exception as exc:
+            render.error = type(exc).__name__
+            raise
+        finally:
+            # Streamlit's stop and rerun are BaseExceptions and end the render normally
+            render.seconds = time.perf_counter() - start
+            render.depth = 0
+            self._local.render = None
+            with self._lock:
+                self._active -= 1
+            self._finish(render)
+
+    def _finish(self, render):
+        with self._lock:
+            self.renders.append(render)
+            page = self._pages.setdefault(render.page, [0, 0.0, 0])
+            page[0] += 1
+            page[1] += render.seconds
+            page[2] += render.error is not None
+            for name, _, seconds in render.spans:
+                totals = self._spans.setdefault(name, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += seconds
+                totals[2] = max(totals[2], seconds)
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(render.to_dict()) + "\n")
+        if self.metrics_path:
+            # Written aside and renamed, so a scrape never reads half a file
+            partial = f"{self.metrics_path}.{os.getpid()}.tmp"
+            with open(partial, "w", encoding="utf-8") as out:
+                out.write(self.prometheus())
+            os.replace(partial, self.metrics_path)
+
+    def add_collector(self, collect):
+        """Register ``collect()`` returning ``{metric_name: value}`` counters for the Prometheus export."""
+        with self._lock:
+            if collect not in self._collectors:
+                self._collectors.append(collect)
+
+    def span_totals(self):
+        """``{span: (count, total seconds, max seconds)}`` over every profiled render so far."""
+        with self._lock:
+            return {name: tuple(totals) for name, totals in self._spans.items()}
+
+    def last_renders(self, n=None):
+        """The most recent profiled renders, newest first."""
+        with self._lock:
+            renders = list(self.renders)
+        return renders[::-1][:n]
+
+    def to_json(self):
+        """Span totals and the retained renders as a JSON document."""
+        with self._lock:
+            spans = {name: {"count": count, "seconds": round(seconds, 6), "max_seconds": round(peak, 6)}
+                     for name, (count, seconds, peak) in self._spans.items()}
+            renders = [render.to_dict() for render in self.renders]
+        return json.dumps({"spans": spans, "renders": renders}, indent=2)
+
+    def prometheus(self):
+        """Counters in the Prometheus text exposition format."""
+        with self._lock:
+            pages = {page: tuple(totals) for page, totals in self._pages.items()}
+            spans = {name: tuple(totals) for name, totals in self._spans.items()}
+            collectors = list(self._collectors)
+        lines = [
+            "# HELP diabetcare_render_seconds Wall time of profiled script runs by page.",
+            "# TYPE diabetcare_render_seconds summary",
+        ]
+        for page, (count, seconds, _) in sorted(pages.items()):
+            lines.append(f'diabetcare_render_seconds_count{{page="{_label(page)}"}} {count}')
+            lines.append(f'diabetcare_render_seconds_sum{{page="{_label(page)}"}} {seconds:.6f}')
+        lines += [
+            "# HELP diabetcare_render_errors_total Profiled script runs that raised, by page.",
+            "# TYPE diabetcare_render_errors_total counter",
+        ]
+        lines += [f'diabetcare_render_errors_total{{page="{_label(page)}"}} {errors}'
+                  for page, (_, _, errors) in sorted(pages.items())]
+        lines += [
+            "# HELP diabetcare_span_seconds Time spent in instrumented stages.",
+            "# TYPE diabetcare_span_seconds summary",
+        ]
+        for name, (count, seconds, _) in sorted(spans.items()):
+            lines.append(f'diabetcare_span_seconds_count{{span="{_label(name)}"}} {count}')
+            lines.append(f'diabetcare_span_seconds_sum{{span="{_label(name)}"}} {seconds:.6f}')
+        lines += [
+            "# HELP diabetcare_span_max_seconds Slowest single run of each instrumented stage.",
+            "# TYPE diabetcare_span_max_seconds gauge",
+        ]
+        lines += [f'diabetcare_span_max_seconds{{span="{_label(name)}"}} {peak:.6f}'
+                  for name, (_, _, peak) in sorted(spans.items())]
+        for collect in collectors:
+            for metric, value in sorted(collect().items()):
+                lines.append(f"# TYPE diabetcare_{metric} {'counter' if metric.endswith('_total') else 'gauge'}")
+                lines.append(f"diabetcare_{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# One profiler per worker process, shared by every session like the render cache
+profiler = Profiler()
+span = profiler.span
@@ -0,0 +1,50 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Dose multipliers applied by the Insulin Calculator's "Additional Factors"
+EXERCISE_FACTOR = 0.8  # reduce by 20% when exercise is planned within 2 hours
+ILLNESS_FACTOR = 1.2  # increase by 20% when ill or stressed
+
+Bolus = namedtuple("Bolus", ["carb_bolus", "correction", "adjustment", "total"])
+
+
+def bolus(current_bg, carbs, carb_ratio, correction_factor, target_bg, exercise=False, illness=False,
+          insulin_on_board=0.0):
+    """Recommended bolus for a single meal, in units, as shown on the Insulin Calculator page.
+
+    ``insulin_on_board`` (units still active from earlier boluses) is netted
+    out of the correction dose, never out of the carb coverage.
+    """
+    carb_bolus = carbs / carb_ratio
+    correction = max(0, (current_bg - target_bg) / correction_factor - insulin_on_board)
+
+    adjustment = 1.0
+    if exercise:
+        adjustment *= EXERCISE_FACTOR
+    if illness:
+        adjustment *= ILLNESS_FACTOR
+
+    total = (carb_bolus + correction) * adjustment
+    return Bolus(carb_bolus, correction, adjustment, total)
+
+
+def bolus_batch(current_bg, carbs, carb_ratio, correction_factor, target_bg, exercise=False, illness=False,
+                insulin_on_board=0.0):
+    """Vectorized ``bolus``: every argument may be a scalar or an array, broadcast together.
+
+    Applies the same operations in the same order as the scalar path, so
+    results agree bit for bit. Use it for retrospective dose review over a
+    whole history or for what-if grids (e.g. BG x carbs).
+    """
+    current_bg = np.asarray(current_bg, dtype=np.float64)
+    carbs = np.asarray(carbs, dtype=np.float64)
+
+    carb_bolus = carbs / carb_ratio
+    correction = np.maximum((current_bg - target_bg) / correction_factor - insulin_on_board, 0.0)
+
+    adjustment = np.where(exercise, 1.0 * EXERCISE_FACTOR, 1.0)
+    adjustment = np.where(illness, adjustment * ILLNESS_FACTOR, adjustment)
+
+    total = (carb_bolus + correction) * adjustment
+    return Bolus(carb_bolus, correction, adjustment, total)
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Background threads per worker process. Jobs spend their time in SQLite,
+# Parquet and NumPy, which release the GIL, so pages stay responsive.
+MAX_WORKERS = 2
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """One background computation; the function it runs gets the job to ``report`` progress on."""
+
+    def __init__(self, key, label=""):
+        self.key = key
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+    def report(self, fraction=None, message=None):
+        """Update progress (``fraction`` of 0-1) and/or the status message shown on the page."""
+        if fraction is not None:
+            self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+
+class JobQueue:
+    """Local queue of slow work (imports, reports, full-history rebuilds) run on a thread pool.
+
+    A job's ``key`` describes its inputs, so identical work is never done
+    twice: submitting a key that is queued or running returns that job, and
+    finished results are kept in ``cache`` (a RenderCache) under
+    ``("job", key)`` so resubmitting returns a completed job at once.
+    Failed jobs aren't cached; submitting them again retries.
+    """
+
+    def __init__(self, cache=None, max_workers=MAX_WORKERS):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="diabetcare-job")
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, label="", **kwargs):
+        """Run ``fn(job, *args, **kwargs)`` in the background unless the same ``key`` already is or was."""
+        with self._lock:
+            job = self._active.get(key) or self._finished(key)
+            if job is not None:
+                return job
+            job = self._active[key] = Job(key, label)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, key):
+        """The queued, running or finished job for ``key``, or None."""
+        with self._lock:
+            return self._active.get(key) or self._finished(key)
+
+    def _finished(self, key):
+        if self.cache is None:
+            return None
+        # Polling jobs on every rerun would otherwise swamp the render cache's hit rate
+        found, result = self.cache.peek(("job", key))
+        if not found:
+            return None
+        job = Job(key)
+        job.status, job.progress, job.result = DONE, 1.0, result
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as exc:
+            logger.exception("Background job %r failed", job.key)
+            job.error = str(exc) or type(exc).__name__
+            job.status = FAILED
+        else:
+            job.result, job.progress = result, 1.0
+            if self.cache is not None:
+                self.cache.put(("job", job.key), result)
+            job.status = DONE
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._active.pop(job.key, None)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
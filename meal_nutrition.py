@@ -0,0 +1,159 @@
+import re
+
+import numpy as np
+
+# Units a portion can be written in: (dimension, size in that dimension's base unit of g / ml / items)
+UNITS = {
+    "g": ("mass", 1.0), "gram": ("mass", 1.0), "grams": ("mass", 1.0), "kg": ("mass", 1000.0),
+    "oz": ("mass", 28.35), "ounce": ("mass", 28.35), "ounces": ("mass", 28.35),
+    "lb": ("mass", 453.6), "lbs": ("mass", 453.6),
+    "ml": ("volume", 1.0), "l": ("volume", 1000.0),
+    "cup": ("volume", 240.0), "cups": ("volume", 240.0),
+    "tbsp": ("volume", 15.0), "tablespoon": ("volume", 15.0), "tablespoons": ("volume", 15.0),
+    "tsp": ("volume", 5.0), "teaspoon": ("volume", 5.0), "teaspoons": ("volume", 5.0),
+    "slice": ("count", 1.0), "slices": ("count", 1.0), "piece": ("count", 1.0), "pieces": ("count", 1.0),
+    "small": ("count", 0.75), "medium": ("count", 1.0), "large": ("count", 1.25),
+}
+# Counted in servings of the matched food rather than in a physical unit
+SERVING_WORDS = {"serving", "servings", "portion", "portions", "x", "each"}
+_WORD_AMOUNTS = {"a": 1.0, "an": 1.0, "one": 1.0, "two": 2.0, "three": 3.0, "half": 0.5, "quarter": 0.25}
+
+# Word amounts only match whole words, longest first so "an" isn't read as "a"; an article may
+# follow any amount ("half a cup")
+_QUANTITY = re.compile(
+    r"\s*(?:(?P<amount>\d+\s+\d+/\d+|\d+/\d+|\d*\.\d+|\d+|\b(?:"
+    + "|".join(sorted(_WORD_AMOUNTS, key=len, reverse=True)) + r")\b)(?:\s+an?\b)?)?"
+    r"\s*(?P<unit>[a-z]+)?"
+)
+# The serving a food database name carries, e.g. "Brown Rice (1/2 cup)"
+_SERVING = re.compile(r"\(([^()]*)\)\s*$")
+
+NUTRITION_COLUMNS = ("carbs", "calories", "protein", "fat", "glycemic_index")
+
+
+def _amount(text):
+    """The number ``text`` spells, or None for a fraction over zero."""
+    if text in _WORD_AMOUNTS:
+        return _WORD_AMOUNTS[text]
+    whole, _, fraction = text.rpartition(" ")
+    if "/" in fraction:
+        numerator, denominator = fraction.split("/")
+        if not float(denominator):
+            return None
+        return (float(whole) if whole else 0.0) + float(numerator) / float(denominator)
+    return float(text)
+
+
+def parse_quantity(text):
+    """``(amount, unit)`` from free text like ``"1 1/2 cups"``, ``"150g"`` or ``"half"``.
+
+    ``unit`` is a key of ``UNITS``, ``"serving"`` for plain counts, or None
+    when there is no unit; ``amount`` is None when nothing parses, or the
+    amount is a fraction over zero like ``"1/0 cup"``.
+    """
+    text = str(text or "").strip().lower()
+    for match in _QUANTITY.finditer(text):
+        amount, unit = match.group("amount"), match.group("unit")
+        if amount is None and unit not in UNITS:
+            continue
+        if unit in SERVING_WORDS:
+            unit = "serving"
+        elif unit not in UNITS:
+            unit = None
+        amount = _amount(amount.strip()) if amount else 1.0
+        return (None, None) if amount is None else (amount, unit)
+    return None, None
+
+
+def servings(portion, food_name):
+    """How many of ``food_name``'s servings a logged ``portion`` is.
+
+    Portions in the same dimension as the serving in the food's name are
+    converted (``"1 cup"`` of ``"Brown Rice (1/2 cup)"`` is 2); a bare
+    number counts servings; anything unparseable is one serving.
+    """
+    amount, unit = parse_quantity(portion)
+    if amount is None:
+        return 1.0
+    if unit is None or unit == "serving":
+        return amount
+    serving = _SERVING.search(food_name)
+    serving_amount, serving_unit = parse_quantity(serving.group(1)) if serving else (None, None)
+    if serving_amount and serving_unit in UNITS and UNITS[serving_unit][0] == UNITS[unit][0]:
+        return amount * UNITS[unit][1] / (serving_amount * UNITS[serving_unit][1])
+    return amount
+
+
+def match_food(index, text):
+    """Row of the best food database match for free-text ``text``, or -1."""
+    rows, _ = index.search(text, k=1)
+    return int(rows[0]) if rows.shape[0] else -1
+
+
+def nutrition_frame(meals, table, index):
+    """The meal log joined with the food database, one row per meal.
+
+    Every distinct food text is matched once and every distinct
+    (food, portion) pair parsed once; the per-meal nutrients are then one
+    gather from the table's columns scaled by servings. ``carbs`` keeps a
+    hand-entered value and falls back to the estimate when none was given
+    (logged as 0); ``logged_carbs`` is the raw entry. Unmatched foods have
+    NaN nutrients.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame(meals, columns=["datetime", "date", "meal", "food", "portion", "carbs"])
+    frame = frame.rename(columns={"carbs": "logged_carbs"})
+    foods = frame["food"].fillna("").astype(str).str.strip().str.lower()
+    portions = frame["portion"].fillna("").astype(str).str.strip().str.lower()
+
+    food_codes, unique_foods = pd.factorize(foods)
+    unique_rows = np.array([match_food(index, food) if food else -1 for food in unique_foods], dtype=np.int64)
+    unique_names = np.array([table.names[row] if row >= 0 else None for row in unique_rows], dtype=object)
+    pair_codes, unique_pairs = pd.MultiIndex.from_arrays([food_codes, portions]).factorize()
+    pair_servings = np.array([
+        servings(portion, unique_names[code]) if unique_rows[code] >= 0 else np.nan
+        for code, portion in unique_pairs
+    ], dtype=np.float64)
+
+    rows = unique_rows[food_codes]
+    matched = rows >= 0
+    safe_rows = np.where(matched, rows, 0)
+    scale = pair_servings[pair_codes]
+    frame["matched_food"] = unique_names[food_codes]
+    frame["servings"] = scale
+    for name in NUTRITION_COLUMNS:
+        values = table.columns[name][safe_rows].astype(np.float64)
+        if name != "glycemic_index":
+            values = values * scale
+        frame[name] = np.where(matched, values, np.nan)
+    frame["estimated_carbs"] = frame["carbs"]
+    logged = frame["logged_carbs"].to_numpy(dtype=np.float64)
+    frame["carbs"] = np.where(logged > 0, logged, frame["estimated_carbs"])
+    return frame
+
+
+def nutrition_totals(frame, period="D"):
+    """Carbs, calories, protein and fat summed per day (``"D"``) or ISO week (``"W"``).
+
+    Also counts meals and gives the carb-weighted glycemic index. Periods
+    are labelled by their first day.
+    """
+    import pandas as pd
+
+    when = pd.to_datetime(frame["datetime"])
+    start = when.dt.floor("D") if period == "D" else when.dt.to_period("W").dt.start_time
+    carbs = frame["carbs"].fillna(0)
+    known_gi = frame["glycemic_index"].notna()
+    grouped = pd.DataFrame({
+        "carbs": carbs,
+        "calories": frame["calories"].fillna(0),
+        "protein": frame["protein"].fillna(0),
+        "fat": frame["fat"].fillna(0),
+        "gi_load": frame["glycemic_index"].fillna(0) * carbs,
+        "gi_carbs": carbs.where(known_gi, 0),
+        "meals": 1,
+    }).groupby(start.rename("period")).sum()
+    # Carbs from unmatched foods have no GI, so they don't dilute the average
+    grouped["glycemic_index"] = grouped["gi_load"] / grouped["gi_carbs"].where(grouped["gi_carbs"] > 0)
+    return grouped.drop(columns=["gi_load", "gi_carbs"])
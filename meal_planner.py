@@ -0,0 +1,190 @@
+from collections import namedtuple
+from zlib import crc32
+
+import numpy as np
+
+# Share of the daily calories per meal, and how many foods each meal combines
+MEALS = {"Breakfast": 0.25, "Lunch": 0.30, "Dinner": 0.30, "Snack": 0.15}
+ITEMS_PER_MEAL = {"Breakfast": 3, "Lunch": 3, "Dinner": 3, "Snack": 2}
+# Servings a food may be planned in
+PORTIONS = np.array([0.5, 1.0, 1.5, 2.0])
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+_KCAL_PER_GRAM = {"carbs": 4.0, "protein": 4.0, "fat": 9.0}
+# Minimum daily protein per kg of body weight, when the profile has a weight
+PROTEIN_G_PER_KG = 0.8
+
+_MEAT = ("beef", "pork", "bacon", "ham", "sausage", "sausages", "steak", "lamb", "veal", "chicken", "turkey",
+         "duck", "salmon", "tuna", "cod", "fish", "shrimp", "prawns", "anchovies", "sardines", "meat", "meatballs")
+
+# Macro split (fractions of calories), glycemic-index ceiling for the carbs in a meal,
+# foods excluded outright, and foods sampled more often
+Preference = namedtuple("Preference", ["carbs", "protein", "fat", "max_gi", "exclude", "favor"])
+PREFERENCES = {
+    "Balanced": Preference(0.45, 0.20, 0.35, 55, (), ()),
+    "Low Carb": Preference(0.20, 0.30, 0.50, 55, (), ()),
+    "Mediterranean": Preference(
+        0.40, 0.20, 0.40, 55,
+        ("beef", "pork", "bacon", "ham", "sausage", "sausages", "steak", "veal"),
+        ("olive", "salmon", "tuna", "sardines", "fish", "chickpea", "chickpeas", "lentil", "lentils", "hummus",
+         "tomato", "spinach", "yogurt", "almonds", "walnut", "walnuts", "quinoa", "broccoli", "beans", "feta"),
+    ),
+    "Vegetarian": Preference(0.50, 0.18, 0.32, 55, _MEAT, ()),
+}
+
+# Random combinations tried per meal, and coordinate-descent passes over them
+SEARCH_SAMPLES = 2048
+REFINE_PASSES = 2
+# Candidate foods drawn per meal; half from the preference's favoured foods when it has any
+POOL_SIZE = 256
+# Relative weights of each miss in the plan loss
+_LOSS_WEIGHTS = {"calories": 4.0, "carbs": 2.0, "protein": 1.0, "fat": 1.0, "glycemic_index": 2.0}
+
+PlannedMeal = namedtuple("PlannedMeal", ["rows", "portions", "totals"])
+
+_CALORIES, _CARBS, _PROTEIN, _FAT, _GI_LOAD = range(5)
+
+
+class MealPlanner:
+    """Builds daily meal plans from the food database to meet a calorie target and macro split.
+
+    Each meal is a small combinatorial search: a few thousand random
+    food/portion combinations are scored at once as arrays, then the best
+    is refined one slot at a time against every candidate food and portion.
+    Foods are drawn from a per-meal pool that respects the preference's
+    exclusions and favours its typical foods. Plans are deterministic for a
+    given target, preference, weight and day.
+    """
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+        self._eligible = {}
+
+    def _candidates(self, preference):
+        """``(eligible rows, favoured rows)`` for a preference, computed once per planner."""
+        cached = self._eligible.get(preference)
+        if cached is None:
+            prefs = PREFERENCES[preference]
+            # High-GI foods stay eligible; the meal's carb-weighted GI is what the search limits
+            keep = self.table.columns["calories"] > 0
+            keep[self.index.rows_with_tokens(prefs.exclude)] = False
+            eligible = np.flatnonzero(keep)
+            favoured = np.intersect1d(eligible, self.index.rows_with_tokens(prefs.favor), assume_unique=True)
+            cached = self._eligible[preference] = (eligible, favoured)
+        return cached
+
+    def _pool(self, rng, preference):
+        eligible, favoured = self._candidates(preference)
+        if eligible.shape[0] <= POOL_SIZE:
+            return eligible
+        draws = [eligible[rng.integers(0, eligible.shape[0], POOL_SIZE // 2 if favoured.shape[0] else POOL_SIZE)]]
+        if favoured.shape[0]:
+            draws.append(favoured[rng.integers(0, favoured.shape[0], POOL_SIZE // 2)])
+        return np.unique(np.concatenate(draws))
+
+    def _nutrients(self, rows):
+        """Per-serving ``(calories, carbs, protein, fat, GI x carbs)`` matrix for ``rows``."""
+        columns = self.table.columns
+        matrix = np.empty((rows.shape[0], 5))
+        for i, name in enumerate(("calories", "carbs", "protein", "fat")):
+            matrix[:, i] = columns[name][rows]
+        matrix[:, _GI_LOAD] = columns["glycemic_index"][rows] * matrix[:, _CARBS]
+        return matrix
+
+    def plan_day(self, calorie_target, preference, weight_kg=None, day=0):
+        """``{meal: PlannedMeal}`` for one day of the plan."""
+        prefs = PREFERENCES[preference]
+        daily = {
+            "calories": float(calorie_target),
+            "carbs": calorie_target * prefs.carbs / _KCAL_PER_GRAM["carbs"],
+            "protein": calorie_target * prefs.protein / _KCAL_PER_GRAM["protein"],
+            "fat": calorie_target * prefs.fat / _KCAL_PER_GRAM["fat"],
+        }
+        if weight_kg:
+            daily["protein"] = max(daily["protein"], PROTEIN_G_PER_KG * weight_kg)
+
+        plan = {}
+        for meal_index, (meal, share) in enumerate(MEALS.items()):
+            seed = [int(calorie_target), crc32(preference.encode()), int(weight_kg or 0), day, meal_index]
+            rng = np.random.default_rng(seed)
+            pool = self._pool(rng, preference)
+            if not pool.shape[0]:
+                plan[meal] = PlannedMeal(np.empty(0, dtype=np.int64), np.empty(0), _totals(np.zeros(5)))
+                continue
+            target = np.array([daily["calories"], daily["carbs"], daily["protein"], daily["fat"]]) * share
+            slots, portions = _search(rng, self._nutrients(pool), target, prefs.max_gi,
+                                      min(ITEMS_PER_MEAL[meal], pool.shape[0]))
+            rows = pool[slots]
+            plan[meal] = PlannedMeal(rows, PORTIONS[portions], _totals(
+                (self._nutrients(rows) * PORTIONS[portions][:, None]).sum(axis=0)
+            ))
+        return plan
+
+    def plan_week(self, calorie_target, preference, weight_kg=None):
+        return [self.plan_day(calorie_target, preference, weight_kg, day) for day in range(len(DAYS))]
+
+
+def _totals(summed):
+    carbs = summed[_CARBS]
+    return {
+        "calories": float(summed[_CALORIES]),
+        "carbs": float(carbs),
+        "protein": float(summed[_PROTEIN]),
+        "fat": float(summed[_FAT]),
+        # Carb-weighted, so the GI describes the meal's carbohydrate as a whole
+        "glycemic_index": float(summed[_GI_LOAD] / carbs) if carbs > 0 else 0.0,
+    }
+
+
+def _loss(totals, target, max_gi):
+    """Plan loss for ``totals`` (``(..., 5)``) against a meal's ``(calories, carbs, protein, fat)`` target."""
+    loss = 0.0
+    for i, name in enumerate(("calories", "carbs", "protein", "fat")):
+        if target[i] > 0:
+            loss = loss + _LOSS_WEIGHTS[name] * ((totals[..., i] - target[i]) / target[i]) ** 2
+    gi = totals[..., _GI_LOAD] / np.maximum(totals[..., _CARBS], 1e-9)
+    return loss + _LOSS_WEIGHTS["glycemic_index"] * (np.maximum(gi - max_gi, 0.0) / max_gi) ** 2
+
+
+def _search(rng, nutrients, target, max_gi, items):
+    """Best ``(pool positions, portion indices)`` for one meal of ``items`` distinct foods."""
+    pool_size = nutrients.shape[0]
+    portion_values = PORTIONS[:, None]
+
+    # Random restarts, all scored in one pass; repeated foods are pushed out by a large penalty
+    slots = rng.integers(0, pool_size, (SEARCH_SAMPLES, items))
+    portions = rng.integers(0, PORTIONS.shape[0], (SEARCH_SAMPLES, items))
+    totals = (nutrients[slots] * PORTIONS[portions][..., None]).sum(axis=1)
+    ordered = np.sort(slots, axis=1)
+    repeats = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+    best = int(np.argmin(_loss(totals, target, max_gi) + 1e6 * repeats))
+    slots, portions = slots[best].copy(), portions[best].copy()
+
+    # Coordinate descent: swap one slot at a time for the best food and portion in the pool
+    for _ in range(REFINE_PASSES):
+        improved = False
+        for j in range(items):
+            rest = np.delete(np.arange(items), j)
+            others = (nutrients[slots[rest]] * PORTIONS[portions[rest]][:, None]).sum(axis=0)
+            trial = others + nutrients[:, None, :] * portion_values[None, :, :]  # (pool, portions, 5)
+            loss = _loss(trial, target, max_gi)
+            loss[slots[rest], :] = np.inf
+            food, portion = np.unravel_index(int(np.argmin(loss)), loss.shape)
+            if (food, portion) != (slots[j], portions[j]):
+                slots[j], portions[j] = food, portion
+                improved = True
+        if not improved:
+            break
+    return slots, portions
+
+
+def describe(table, planned):
+    """Display lines for a PlannedMeal: ``portion x name (carbs, kcal)``."""
+    lines = []
+    for row, portion in zip(planned.rows.tolist(), planned.portions.tolist()):
+        carbs = table.columns["carbs"][row] * portion
+        calories = table.columns["calories"][row] * portion
+        lines.append(f"{portion:g} × {table.names[row]} ({carbs:.0f}g carbs, {calories:.0f} kcal)")
+    return lines
+
@@ -0,0 +1,118 @@
+import numpy as np
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+# Postprandial window after each meal, and how far back a pre-meal baseline reading may be
+WINDOW_MINUTES = 180
+BASELINE_MINUTES = 30
+# Meals with fewer readings in their window are reported but left out of aggregates
+MIN_READINGS = 3
+
+RESPONSE_COLUMNS = ("baseline", "readings", "iauc", "peak_rise", "time_to_peak")
+
+
+def meal_responses(reading_ts, reading_values, meal_ts, window_minutes=WINDOW_MINUTES,
+                   baseline_minutes=BASELINE_MINUTES):
+    """Glucose response to each meal, as ``{column: array}`` aligned with ``meal_ts``.
+
+    ``reading_ts`` must be sorted (epoch ns, like ``ReadingsStore.timestamps``).
+    The baseline is an as-of join: the last reading at or up to
+    ``baseline_minutes`` before the meal. The window is an interval join:
+    readings in ``(meal, meal + window_minutes]``, found by binary search and
+    expanded into one flat array, so every meal is processed together.
+
+    - ``iauc``: incremental area above baseline (mg/dL x min), trapezoidal from the meal time
+    - ``peak_rise``: highest reading minus baseline (mg/dL)
+    - ``time_to_peak``: minutes from the meal to that reading
+
+    Meals without a baseline or without readings get NaN metrics.
+    """
+    reading_ts = np.asarray(reading_ts, dtype=np.int64)
+    reading_values = np.asarray(reading_values, dtype=np.float64)
+    meal_ts = np.asarray(meal_ts, dtype=np.int64)
+    meals = meal_ts.shape[0]
+    if not reading_ts.shape[0]:
+        missing = np.full(meals, np.nan)
+        return {"baseline": missing, "readings": np.zeros(meals, dtype=np.int64), "iauc": missing,
+                "peak_rise": missing, "time_to_peak": missing}
+
+    # As-of baseline
+    before = np.maximum(np.searchsorted(reading_ts, meal_ts, side="right") - 1, 0)
+    has_baseline = (reading_ts[before] <= meal_ts) & (meal_ts - reading_ts[before] <= baseline_minutes * _NS_PER_MINUTE)
+    baseline = np.where(has_baseline, reading_values[before], np.nan)
+
+    # Interval join: flat (meal, reading) pairs
+    lo = np.searchsorted(reading_ts, meal_ts, side="right")
+    hi = np.searchsorted(reading_ts, meal_ts + window_minutes * _NS_PER_MINUTE, side="right")
+    counts = np.where(has_baseline, hi - lo, 0)
+    meal_of = np.repeat(np.arange(meals), counts)
+    group_start = np.cumsum(counts) - counts
+    reading_of = lo[meal_of] + np.arange(meal_of.shape[0]) - group_start[meal_of]
+
+    minutes = (reading_ts[reading_of] - meal_ts[meal_of]) / _NS_PER_MINUTE
+    rise = reading_values[reading_of] - baseline[meal_of]
+
+    # Trapezoids between consecutive readings, the first one starting from (0, baseline)
+    first = np.zeros(meal_of.shape[0], dtype=bool)
+    first[group_start[counts > 0]] = True
+    prev_minutes = np.where(first, 0.0, np.roll(minutes, 1))
+    prev_rise = np.where(first, 0.0, np.roll(rise, 1))
+    positive = np.maximum(rise, 0.0)
+    area = (positive + np.maximum(prev_rise, 0.0)) / 2 * (minutes - prev_minutes)
+    iauc = np.bincount(meal_of, weights=area, minlength=meals)
+
+    # Peak: first reading of the highest rise within each meal
+    order = np.lexsort((minutes, -rise, meal_of))
+    firsts = order[_group_firsts(meal_of[order])]
+    peak_rise = np.full(meals, np.nan)
+    time_to_peak = np.full(meals, np.nan)
+    peak_rise[meal_of[firsts]] = rise[firsts]
+    time_to_peak[meal_of[firsts]] = minutes[firsts]
+
+    has_readings = counts > 0
+    return {
+        "baseline": baseline,
+        "readings": counts,
+        "iauc": np.where(has_readings, iauc, np.nan),
+        "peak_rise": peak_rise,
+        "time_to_peak": time_to_peak,
+    }
+
+
+def _group_firsts(sorted_groups):
+    """Positions where a new group starts in an array sorted by group."""
+    starts = np.ones(sorted_groups.shape[0], dtype=bool)
+    starts[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    return starts
+
+
+def response_frame(meals, readings):
+    """Meal log rows (dicts or a frame with a ``datetime`` column) with their response columns added.
+
+    ``readings`` is a ReadingsStore covering the meals' windows.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame(meals).reset_index(drop=True)
+    if frame.empty:
+        return frame.reindex(columns=[*frame.columns, *RESPONSE_COLUMNS])
+    meal_ts = pd.to_datetime(frame["datetime"]).to_numpy().astype("datetime64[ns]").astype(np.int64)
+    for name, values in meal_responses(readings.timestamps, readings.values, meal_ts).items():
+        frame[name] = values
+    return frame
+
+
+def aggregate_responses(frame, by, min_readings=MIN_READINGS):
+    """Mean iAUC and peak rise, and median time-to-peak, per value of column ``by``.
+
+    Only meals with at least ``min_readings`` readings in their window count;
+    the most frequent groups come first.
+    """
+    usable = frame[frame["readings"] >= min_readings]
+    grouped = usable.groupby(by).agg(
+        meals=("iauc", "size"),
+        mean_iauc=("iauc", "mean"),
+        mean_peak_rise=("peak_rise", "mean"),
+        median_time_to_peak=("time_to_peak", "median"),
+    )
+    return grouped.sort_values(["meals", "mean_peak_rise"], ascending=[False, False])
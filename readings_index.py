@@ -0,0 +1,112 @@
+import numpy as np
+
+from readings_store import READING_TYPES, type_code
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class ReadingsIndex:
+    """Secondary indexes over a ReadingsStore for paging through filtered history.
+
+    Rows are kept in timestamp order, so a date range is two binary searches.
+    The type index holds each reading type's row positions in time order and
+    the notes index the positions of rows that have notes. A page of rows
+    matching a date range, a set of types and a notes search is located with
+    binary searches over those position lists and only its own rows are
+    gathered: O(log n + page) instead of filtering the whole frame.
+
+    Positions are extended only for rows appended since the last query; a
+    re-sort of the store (a back-dated reading) rebuilds them once.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._by_type = [_EMPTY] * len(READING_TYPES)
+        self._rows = 0
+        self._layout_version = None
+        self._notes_version = None
+        self._noted = _EMPTY
+        self._noted_text = []
+
+    def _refresh(self):
+        store = self._store
+        codes = store.type_codes  # sorts the store first if needed
+        n = codes.shape[0]
+        if self._layout_version != store.layout_version:
+            self._by_type, self._rows = [_EMPTY] * len(READING_TYPES), 0
+            self._layout_version = store.layout_version
+        if n == self._rows:
+            return
+        fresh = codes[self._rows:n]
+        # Stable sort groups the new positions by type, each group still in time order
+        order = np.argsort(fresh, kind="stable") + self._rows
+        bounds = np.cumsum(np.bincount(fresh, minlength=len(READING_TYPES)))[:-1]
+        self._by_type = [np.concatenate((old, new)) for old, new in zip(self._by_type, np.split(order, bounds))]
+        self._rows = n
+
+    def _notes(self):
+        store = self._store
+        if self._notes_version != (store.version, store.layout_version):
+            noted = np.flatnonzero(np.isin(store.ids, store.noted_ids()))
+            self._noted = noted
+            self._noted_text = [text.lower() for text in store.notes_for(store.ids[noted])]
+            self._notes_version = (store.version, store.layout_version)
+        return self._noted, self._noted_text
+
+    def page(self, start=None, end=None, types=None, notes="", offset=0, limit=50):
+        """Positions of one page of matching readings, newest first, and the total: ``(positions, total)``.
+
+        ``start``/``end`` are epoch ns (``start <= ts < end``), ``types`` a list
+        of reading type names (None for all) and ``notes`` a case-insensitive
+        substring of the notes. Rows ``offset`` to ``offset + limit`` counted
+        from the newest match are returned; use them with ``frame().iloc``.
+        """
+        self._refresh()
+        timestamps = self._store.timestamps
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = timestamps.shape[0] if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        hi = max(hi, lo)
+        codes = None if types is None else sorted({type_code(name) for name in types})
+        if notes:
+            noted, texts = self._notes()
+            query = notes.lower()
+            postings = [noted[np.array([query in text for text in texts], dtype=bool)]]
+            if codes is not None and len(codes) < len(READING_TYPES):
+                postings[0] = postings[0][np.isin(self._store.type_codes[postings[0]], codes)]
+        elif codes is None or len(codes) == len(READING_TYPES):
+            # Every row in the range matches: the page is a slice
+            total = hi - lo
+            stop = hi - min(offset, total)
+            return np.arange(stop - 1, max(stop - limit, lo) - 1, -1, dtype=np.int64), total
+        else:
+            postings = [self._by_type[code] for code in codes]
+        return _union_page(postings, lo, hi, offset, limit)
+
+
+def _union_page(postings, lo, hi, offset, limit):
+    # Each posting list is sorted and the lists are disjoint (a row has one type),
+    # so the k-th match overall is found by binary search on the position
+    firsts = [int(np.searchsorted(p, lo)) for p in postings]
+
+    def below(x):  # matches at positions lo <= pos < x
+        return sum(int(np.searchsorted(p, x)) - first for p, first in zip(postings, firsts))
+
+    def boundary(rank):  # smallest position with ``rank`` matches before it
+        a, b = lo, hi
+        while a < b:
+            mid = (a + b) // 2
+            if below(mid) >= rank:
+                b = mid
+            else:
+                a = mid + 1
+        return a
+
+    total = below(hi)
+    end_rank = total - min(offset, total)
+    start_rank = max(end_rank - limit, 0)
+    if end_rank == start_rank:
+        return _EMPTY, total
+    x0, x1 = boundary(start_rank), boundary(end_rank)
+    rows = np.concatenate([p[np.searchsorted(p, x0):np.searchsorted(p, x1)] for p in postings])
+    rows.sort()
+    return rows[::-1], total
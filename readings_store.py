@@ -0,0 +1,246 @@
+import numpy as np
+from datetime import datetime
+
+from instrumentation import span
+
+# pandas is imported inside the methods that build frames, so pages that only
+# log readings don't pay for it at startup
+
+# Reading types offered by the "Log Reading" form; the store keeps the index into this list
+READING_TYPES = ["Fasting", "Before Meal", "After Meal", "Bedtime", "Random"]
+
+# Bounds enforced by the blood sugar inputs and by bulk import (mg/dL)
+MIN_MG_DL = 40.0
+MAX_MG_DL = 600.0
+
+
+def to_epoch_ns(value):
+    """Convert a naive datetime to int64 epoch nanoseconds."""
+    return int(np.datetime64(value, "ns").astype("int64"))
+
+
+def combine_epoch_ns(reading_date, reading_time):
+    """Epoch nanoseconds for a reading logged as separate date and time widgets."""
+    return to_epoch_ns(datetime.combine(reading_date, reading_time))
+
+
+def type_code(reading_type):
+    try:
+        return READING_TYPES.index(reading_type)
+    except ValueError:
+        raise ValueError(f"Unknown reading type: {reading_type!r}") from None
+
+
+class ReadingsStore:
+    """Columnar blood sugar log backed by preallocated NumPy buffers.
+
+    Timestamps are naive wall-clock epoch nanoseconds (int64), values are float32
+    mg/dL and reading types are int8 codes into ``READING_TYPES``. Notes are rare
+    and variable length, so they live in a side table keyed by reading id rather
+    than in an object column.
+
+    Buffers grow geometrically, so ``append`` is amortized O(1). Rows are kept in
+    timestamp order; a back-dated reading marks the store unsorted and the next
+    read re-sorts the buffers once in place.
+    """
+
+    def __init__(self, capacity=1024):
+        capacity = max(int(capacity), 16)
+        self._id = np.empty(capacity, dtype=np.int64)
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._value = np.empty(capacity, dtype=np.float32)
+        self._type = np.empty(capacity, dtype=np.int8)
+        self._notes = {}
+        self._size = 0
+        self._next_id = 0
+        self._sorted = True
+        self.version = 0
+        # Bumped whenever existing rows move, which invalidates positional caches
+        self.layout_version = 0
+        self._derived = None
+        self._index = None
+        self._frame = None
+        self._frame_version = -1
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def capacity(self):
+        return self._ts.shape[0]
+
+    def _reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        for name in ("_id", "_ts", "_value", "_type"):
+            old = getattr(self, name)
+            grown = np.empty(new_capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+    def _touch(self):
+        self.version += 1
+
+    def append(self, timestamp, value, reading_type, notes="", reading_id=None):
+        """Append a single reading and return its id.
+
+        ``timestamp`` may be a datetime or epoch nanoseconds.
+        """
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = to_epoch_ns(timestamp)
+        if reading_id is None:
+            reading_id = self._next_id
+        self._next_id = max(self._next_id, int(reading_id) + 1)
+
+        self._reserve(self._size + 1)
+        i = self._size
+        if i and timestamp < self._ts[i - 1]:
+            self._sorted = False
+        self._id[i] = reading_id
+        self._ts[i] = timestamp
+        self._value[i] = value
+        self._type[i] = type_code(reading_type) if isinstance(reading_type, str) else reading_type
+        if notes:
+            self._notes[int(reading_id)] = notes
+        self._size += 1
+        self._touch()
+        return int(reading_id)
+
+    def extend(self, timestamps, values, type_codes, notes=None, ids=None):
+        """Append many readings from arrays in one copy.
+
+        ``timestamps`` are epoch nanoseconds, ``type_codes`` are indices into
+        ``READING_TYPES``; ``notes`` is an optional ``{position: text}`` mapping
+        relative to the incoming batch. Returns the assigned ids.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        n = timestamps.shape[0]
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        else:
+            ids = np.asarray(ids, dtype=np.int64)
+        self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+        self._reserve(self._size + n)
+        start, stop = self._size, self._size + n
+        self._id[start:stop] = ids
+        self._ts[start:stop] = timestamps
+        self._value[start:stop] = values
+        self._type[start:stop] = type_codes
+        if self._sorted:
+            prev = self._ts[start - 1:stop] if start else timestamps
+            self._sorted = bool(np.all(prev[1:] >= prev[:-1]))
+        if notes:
+            for pos, text in notes.items():
+                if text:
+                    self._notes[int(ids[pos])] = text
+        self._size = stop
+        self._touch()
+        return ids
+
+    def _ensure_sorted(self):
+        if self._sorted:
+            return
+        n = self._size
+        order = np.argsort(self._ts[:n], kind="stable")
+        for name in ("_id", "_ts", "_value", "_type"):
+            buf = getattr(self, name)
+            buf[:n] = buf[:n][order]
+        self._sorted = True
+        self.layout_version += 1
+
+    # Zero-copy column views; only valid until the next append.
+    @property
+    def ids(self):
+        self._ensure_sorted()
+        return self._id[:self._size]
+
+    @property
+    def timestamps(self):
+        self._ensure_sorted()
+        return self._ts[:self._size]
+
+    @property
+    def values(self):
+        self._ensure_sorted()
+        return self._value[:self._size]
+
+    @property
+    def type_codes(self):
+        self._ensure_sorted()
+        return self._type[:self._size]
+
+    def set_notes(self, notes):
+        """Merge a ``{reading_id: text}`` mapping into the notes side table."""
+        self._notes.update((int(i), text) for i, text in notes.items() if text)
+        self._touch()
+
+    @property
+    def derived(self):
+        """Memoized calendar columns (day, week, hour, ...) aligned with ``frame()``."""
+        if self._derived is None:
+            from derived import DerivedColumns
+            self._derived = DerivedColumns(self)
+        return self._derived
+
+    @property
+    def index(self):
+        """Memoized type and notes indexes for paging through filtered history."""
+        if self._index is None:
+            from readings_index import ReadingsIndex
+            self._index = ReadingsIndex(self)
+        return self._index
+
+    def note(self, reading_id):
+        return self._notes.get(int(reading_id), "")
+
+    def notes_for(self, ids):
+        return [self._notes.get(int(i), "") for i in ids]
+
+    def noted_ids(self):
+        """Ids of the readings that have notes."""
+        return np.fromiter(self._notes, dtype=np.int64, count=len(self._notes))
+
+    def frame(self):
+        """DataFrame over the live buffers, rebuilt only when the data version changes.
+
+        ``datetime`` and ``value`` share memory with the store; ``type`` is a
+        categorical over the stored codes. Notes are not included: use
+        ``with_details`` on the handful of rows that are actually displayed.
+        """
+        if self._frame is not None and self._frame_version == self.version:
+            return self._frame
+        import pandas as pd
+        self._ensure_sorted()
+        n = self._size
+        with span("readings frame"):
+            frame = pd.DataFrame({
+                "id": self._id[:n],
+                "datetime": self._ts[:n].view("datetime64[ns]"),
+                "value": self._value[:n],
+                "type": pd.Categorical.from_codes(self._type[:n], categories=READING_TYPES),
+            }, copy=False)
+        self._frame = frame
+        self._frame_version = self.version
+        return frame
+
+    def with_details(self, rows):
+        """Expand a slice of ``frame()`` into the date/time/value/type/notes layout shown in tables."""
+        import pandas as pd
+        return pd.DataFrame({
+            "date": rows["datetime"].dt.date,
+            "time": rows["datetime"].dt.time,
+            "value": rows["value"].astype(float),
+            "type": rows["type"].astype(str),
+            "notes": self.notes_for(rows["id"]),
+        }, index=rows.index)
+
+    def to_records(self):
+        """Readings as the list-of-dicts layout the app used before the columnar store."""
+        return self.with_details(self.frame()).to_dict("records")
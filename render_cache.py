@@ -0,0 +1,121 @@
+import sys
+import threading
+from collections import OrderedDict
+
+from instrumentation import span
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 512
+
+
+def estimate_size(value):
+    """Rough in-memory size of a cached figure, table or other value, in bytes."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        # DataFrames
+        return int(memory_usage(index=True, deep=True).sum())
+    if hasattr(value, "layout") and isinstance(getattr(value, "data", None), tuple):
+        # Plotly figures: the trace arrays dominate, and are sized without serializing the figure
+        return sum(_property_size(trace.to_plotly_json()) for trace in value.data)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _property_size(value):
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(value, dict):
+        return sum(_property_size(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_property_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class RenderCache:
+    """LRU cache of built figures and prepared tables shared by all sessions of a worker.
+
+    Keys should include everything the output depends on, typically
+    ``(view, user, data_version, *view_params)``, so entries never need
+    explicit invalidation: a new data version simply misses and the stale
+    entry ages out. Eviction is by least-recent use once either the entry
+    count or the estimated byte total is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        """Return the cached value for ``key``, calling ``build()`` and caching it on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # Build outside the lock; two sessions racing on one key just build twice
+        with span(f"build {key[0] if isinstance(key, tuple) else key}"):
+            value = build()
+        self.put(key, value)
+        return value
+
+    def get(self, key):
+        """``(found, value)`` for ``key``, without building anything on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def peek(self, key):
+        """Like ``get`` but not counted as a hit or miss, for bookkeeping lookups such as job results."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
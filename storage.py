@@ -0,0 +1,684 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import importlib.util
+
+import numpy as np
+
+from readings_store import ReadingsStore, to_epoch_ns
+
+logger = logging.getLogger(__name__)
+
+# pandas' parquet engine; checked without importing it, which is slow
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+DEFAULT_DATA_DIR = os.environ.get(
+    "DIABETCARE_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+
+# Readings older than this many days move from SQLite into monthly Parquet files
+COMPACT_AFTER_DAYS = 31
+# Don't bother rewriting Parquet for fewer rows than this
+COMPACT_MIN_ROWS = 5000
+
+# A deployment serves one tenant (clinic); sessions start as its default user until another is picked
+DEFAULT_TENANT = os.environ.get("DIABETCARE_TENANT", "local")
+DEFAULT_USER = "local"
+ROLES = ("patient", "clinician")
+
+# Connections per Storage. WAL lets them all read at once; writers queue on SQLite's
+# write lock for up to BUSY_TIMEOUT seconds.
+POOL_SIZE = 8
+BUSY_TIMEOUT = 30.0
+
+# Bumped with PRAGMA user_version whenever existing databases need migrating
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'patient',
+    version INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (tenant, name)
+);
+
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    type INTEGER NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_readings_user_ts ON readings (user_id, ts);
+
+CREATE TABLE IF NOT EXISTS meals (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    meal TEXT NOT NULL,
+    food TEXT NOT NULL,
+    portion TEXT NOT NULL,
+    carbs REAL NOT NULL,
+    logged_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_meals_user_ts ON meals (user_id, ts);
+
+CREATE TABLE IF NOT EXISTS doses (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    units REAL NOT NULL,
+    type INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_doses_user_ts ON doses (user_id, ts);
+
+CREATE TABLE IF NOT EXISTS profile (
+    user_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (user_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Single-user databases (schema 1) become the default user's partition
+_MIGRATE_FROM_1 = """
+ALTER TABLE readings ADD COLUMN user_id INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE meals ADD COLUMN user_id INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE doses ADD COLUMN user_id INTEGER NOT NULL DEFAULT 1;
+DROP INDEX IF EXISTS idx_readings_ts;
+DROP INDEX IF EXISTS idx_meals_ts;
+DROP INDEX IF EXISTS idx_doses_ts;
+ALTER TABLE profile RENAME TO profile_v1;
+"""
+
+_PARQUET_COLUMNS = ["id", "ts", "value", "type", "notes"]
+# Stored columns of each table, as ``iter_rows`` streams them
+ROW_COLUMNS = {
+    "readings": _PARQUET_COLUMNS,
+    "meals": ["id", "ts", "meal", "food", "portion", "carbs", "logged_at"],
+    "doses": ["id", "ts", "units", "type"],
+}
+# Users per query when reading a cohort, well under SQLite's bound-parameter limit
+_COHORT_BATCH = 500
+_EPOCH = datetime(1970, 1, 1)
+
+# ``version`` is the user's data version when the row was read
+User = namedtuple("User", ["id", "tenant", "name", "role", "version"])
+
+
+def window_bounds(days, now=None):
+    """Epoch-ns ``(start, end)`` covering the last ``days`` calendar days; ``None`` means all history."""
+    if days is None:
+        return None, None
+    now = now or datetime.now()
+    start = datetime.combine(now.date() - timedelta(days=days - 1), datetime.min.time())
+    return to_epoch_ns(start), None
+
+
+class ConnectionPool:
+    """Up to ``size`` SQLite connections, each lent to one thread at a time."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._available = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        self._available.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+        finally:
+            self._available.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Storage:
+    """Shared durable store for every user: WAL-mode SQLite for appends, monthly Parquet for history.
+
+    Each user's readings, meals, doses and profile form a partition: rows
+    carry ``user_id`` and are indexed on ``(user_id, ts)``, and compacted
+    Parquet lives under ``readings/<user_id>/``, so one user's queries
+    cost the same however many others are stored. Per-user reads and
+    writes go through ``user(user_id)``. Connections come from a pool, so
+    sessions read concurrently; each write is one short transaction.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, pool_size=POOL_SIZE):
+        self.data_dir = data_dir
+        self.parquet_dir = os.path.join(data_dir, "readings")
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        self._pool = ConnectionPool(os.path.join(data_dir, "diabetcare.db"), pool_size)
+        with self._pool.connection() as conn:
+            self._migrate(conn)
+
+    def close(self):
+        self._pool.close()
+
+    def _migrate(self, conn):
+        """Create the schema, upgrading a single-user database so its data becomes the default user's."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (schema_version,) = conn.execute("PRAGMA user_version").fetchone()
+            legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'readings'").fetchone()
+            if legacy and schema_version < 2:
+                _execute_script(conn, _MIGRATE_FROM_1)
+            _execute_script(conn, _SCHEMA)
+            default_id = _ensure_user(conn, DEFAULT_TENANT, DEFAULT_USER, "patient")
+            if legacy and schema_version < 2:
+                conn.execute("INSERT INTO profile SELECT ?, key, value FROM profile_v1", (default_id,))
+                conn.execute("DROP TABLE profile_v1")
+                row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+                conn.execute("UPDATE users SET version = ? WHERE id = ?", (row[0] if row else 0, default_id))
+                conn.execute("DELETE FROM meta WHERE key = 'data_version'")
+                # Archived months move into the default user's Parquet directory
+                user_dir = self._user_parquet_dir(default_id)
+                os.makedirs(user_dir, exist_ok=True)
+                for name in os.listdir(self.parquet_dir):
+                    if name.endswith(".parquet"):
+                        os.replace(os.path.join(self.parquet_dir, name), os.path.join(user_dir, name))
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _transaction(self, user_id=None, changes_data=True):
+        """Write transaction on a pooled connection; bumps ``user_id``'s data version unless ``changes_data`` is False."""
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                if changes_data and user_id is not None:
+                    conn.execute("UPDATE users SET version = version + 1 WHERE id = ?", (user_id,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def _snapshot(self):
+        """Read transaction, so queries spanning several statements see one consistent state."""
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.execute("COMMIT")
+
+    # Users
+
+    def add_user(self, name, role="patient", tenant=DEFAULT_TENANT):
+        """Create a user in ``tenant`` (or return the existing one with that name) and return its id."""
+        if role not in ROLES:
+            raise ValueError(f"Unknown role {role!r}; expected one of {', '.join(ROLES)}")
+        with self._transaction() as conn:
+            return _ensure_user(conn, tenant, name, role)
+
+    def users(self, tenant=DEFAULT_TENANT, role=None):
+        """Users of ``tenant`` (optionally only those with ``role``) in creation order."""
+        where, params = "WHERE tenant = ?", [tenant]
+        if role is not None:
+            where, params = where + " AND role = ?", params + [role]
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, tenant, name, role, version FROM users {where} ORDER BY id", params
+            ).fetchall()
+        return [User(*row) for row in rows]
+
+    def get_user(self, user_id):
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT id, tenant, name, role, version FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No user with id {user_id}")
+        return User(*row)
+
+    def default_user_id(self, tenant=DEFAULT_TENANT):
+        return self.add_user(DEFAULT_USER, tenant=tenant)
+
+    def user(self, user_id):
+        """Reads and writes scoped to one user's partition."""
+        return UserStorage(self, user_id)
+
+    def load_cohort_readings(self, user_ids, start=None, end=None):
+        """Readings of many users at once, as ``(user_ids, timestamps_ns, values)`` arrays sorted by user then time.
+
+        Users are read in batches of one indexed query each; only users with
+        archived months in the window fall back to their own ``load_readings``.
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        archived = {user_id for user_id in user_ids if any(self.user(user_id)._parquet_months(start, end))}
+        live = [user_id for user_id in user_ids if user_id not in archived]
+        parts = []
+        for first in range(0, len(live), _COHORT_BATCH):
+            batch = live[first:first + _COHORT_BATCH]
+            where, params = _ts_filter(start, end, f"user_id IN ({', '.join('?' * len(batch))})", params=batch)
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    f"SELECT user_id, ts, value FROM readings{where} ORDER BY user_id, ts", params
+                ).fetchall()
+            if rows:
+                owners, ts, values = zip(*rows)
+                parts.append((np.array(owners, dtype=np.int64), np.array(ts, dtype=np.int64),
+                              np.array(values, dtype=np.float64)))
+        for user_id in sorted(archived):
+            readings = self.user(user_id).load_readings(start, end)
+            parts.append((np.full(len(readings), user_id, dtype=np.int64), readings.timestamps.copy(),
+                          readings.values.astype(np.float64)))
+        if not parts:
+            return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64)
+        owners, ts, values = (np.concatenate(column) for column in zip(*parts))
+        order = np.lexsort((ts, owners))
+        return owners[order], ts[order], values[order]
+
+    def _user_parquet_dir(self, user_id):
+        return os.path.join(self.parquet_dir, str(int(user_id)))
+
+    def compact(self, older_than_days=COMPACT_AFTER_DAYS, min_rows=COMPACT_MIN_ROWS, now=None):
+        """Compact every user's old readings into Parquet; returns the total number of rows moved."""
+        with self._pool.connection() as conn:
+            user_ids = [user_id for (user_id,) in conn.execute("SELECT id FROM users ORDER BY id")]
+        return sum(self.user(user_id).compact(older_than_days, min_rows, now) for user_id in user_ids)
+
+
+class UserStorage:
+    """One user's partition of a shared ``Storage``; every query is bounded by ``user_id``."""
+
+    def __init__(self, storage, user_id):
+        self.storage = storage
+        self.user_id = int(user_id)
+        self.parquet_dir = storage._user_parquet_dir(self.user_id)
+
+    def _transaction(self, changes_data=True):
+        return self.storage._transaction(self.user_id, changes_data)
+
+    def data_version(self):
+        """Counter bumped by every committed change to this user's data, from any process sharing the database."""
+        with self.storage._pool.connection() as conn:
+            row = conn.execute("SELECT version FROM users WHERE id = ?", (self.user_id,)).fetchone()
+        return row[0] if row else 0
+
+    # Profile
+
+    def load_profile(self):
+        with self.storage._pool.connection() as conn:
+            rows = conn.execute("SELECT key, value FROM profile WHERE user_id = ?", (self.user_id,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save_profile(self, profile):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM profile WHERE user_id = ?", (self.user_id,))
+            conn.executemany(
+                "INSERT INTO profile (user_id, key, value) VALUES (?, ?, ?)",
+                [(self.user_id, key, json.dumps(value)) for key, value in profile.items()],
+            )
+
+    # Readings
+
+    def add_reading(self, timestamp, value, type_code, notes=""):
+        """Durably append one reading and return its id."""
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = to_epoch_ns(timestamp)
+        with self._transaction() as conn:
+            reading_id = _next_reading_id(conn)
+            conn.execute(
+                "INSERT INTO readings (id, user_id, ts, value, type, notes) VALUES (?, ?, ?, ?, ?, ?)",
+                (reading_id, self.user_id, int(timestamp), float(value), int(type_code), notes or ""),
+            )
+        return reading_id
+
+    def add_readings(self, timestamps, values, type_codes, notes=None):
+        """Append a batch of readings in one transaction; returns the assigned ids."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        n = timestamps.shape[0]
+        notes = notes or {}
+        with self._transaction() as conn:
+            first = _next_reading_id(conn, n)
+            ids = np.arange(first, first + n, dtype=np.int64)
+            conn.executemany(
+                "INSERT INTO readings (id, user_id, ts, value, type, notes) VALUES (?, ?, ?, ?, ?, ?)",
+                zip(ids.tolist(), [self.user_id] * n, timestamps.tolist(), np.asarray(values, dtype=float).tolist(),
+                    np.asarray(type_codes).tolist(), (notes.get(i, "") for i in range(n))),
+            )
+        return ids
+
+    def load_readings(self, start=None, end=None):
+        """Readings with ``start <= ts < end`` (epoch ns, either bound optional) as a ReadingsStore."""
+        where, params = self._filter(start, end)
+        notes_where, _ = self._filter(start, end, "notes != ''")
+        with self.storage._snapshot() as conn:
+            rows = conn.execute(
+                f"SELECT id, ts, value, type FROM readings{where} ORDER BY ts", params
+            ).fetchall()
+            notes = dict(conn.execute(
+                f"SELECT id, notes FROM readings{notes_where}", params
+            ).fetchall())
+
+        archived = self._read_parquet(start, end) if HAS_PARQUET else None
+        archived_rows = 0 if archived is None else len(archived)
+        store = ReadingsStore(capacity=len(rows) + archived_rows + 1024)
+        if archived_rows:
+            notes.update({i: n for i, n in zip(archived["id"].tolist(), archived["notes"]) if n})
+            store.extend(archived["ts"].to_numpy(), archived["value"].to_numpy(),
+                         archived["type"].to_numpy(), ids=archived["id"].to_numpy())
+        if rows:
+            ids, ts, values, types = (np.array(column) for column in zip(*rows))
+            if archived_rows:
+                fresh = ~np.isin(ids, archived["id"].to_numpy())
+                ids, ts, values, types = ids[fresh], ts[fresh], values[fresh], types[fresh]
+            store.extend(ts.astype(np.int64), values.astype(np.float32),
+                         types.astype(np.int8), ids=ids.astype(np.int64))
+        store.set_notes(notes)
+        return store
+
+    def _parquet_months(self, start, end):
+        if not os.path.isdir(self.parquet_dir):
+            return
+        for name in sorted(os.listdir(self.parquet_dir)):
+            if not name.endswith(".parquet"):
+                continue
+            month_start, month_end = _month_bounds(_archive_month(name))
+            if (start is None or month_end > start) and (end is None or month_start < end):
+                yield os.path.join(self.parquet_dir, name)
+
+    def _read_parquet(self, start, end):
+        import pandas as pd
+        filters = []
+        if start is not None:
+            filters.append(("ts", ">=", int(start)))
+        if end is not None:
+            filters.append(("ts", "<", int(end)))
+        frames = [
+            pd.read_parquet(path, columns=_PARQUET_COLUMNS, filters=filters or None)
+            for path in self._parquet_months(start, end)
+        ]
+        # Users with nothing archived in the window skip building an empty frame
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def span(self, table):
+        """``(first_ts, last_ts)`` of this user's rows in ``table`` (archived readings included), or None."""
+        with self.storage._pool.connection() as conn:
+            first, last = conn.execute(
+                f"SELECT MIN(ts), MAX(ts) FROM {table} WHERE user_id = ?", (self.user_id,)
+            ).fetchone()
+        if table == "readings" and HAS_PARQUET:
+            archived = list(self._parquet_months(None, None))
+            if archived:
+                # Month bounds are enough to plan which months to read
+                first = min(v for v in (first, _month_bounds(_archive_month(archived[0]))[0]) if v is not None)
+                last = max(v for v in (last, _month_bounds(_archive_month(archived[-1]))[1] - 1) if v is not None)
+        return None if first is None else (first, last)
+
+    def iter_rows(self, table, start=None, end=None):
+        """This user's ``table`` rows with ``start <= ts < end`` in time order, one DataFrame per calendar month.
+
+        Columns are ``ROW_COLUMNS[table]`` as stored. Readings merge each
+        month's Parquet archive with its SQLite rows, so any length of history
+        streams through in month-sized pieces.
+        """
+        import pandas as pd
+
+        span = self.span(table)
+        if span is None:
+            return
+        columns = ROW_COLUMNS[table]
+        first = span[0] if start is None else max(span[0], start)
+        last = span[1] if end is None else min(span[1], end - 1)
+        month = np.datetime64(int(first), "ns").astype("datetime64[M]")
+        while True:
+            month_start, month_end = _month_bounds(month)
+            if month_start > last:
+                return
+            month += 1
+            lo, hi = max(month_start, first), min(month_end, last + 1)
+            where, params = self._filter(lo, hi)
+            with self.storage._pool.connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY ts, id", params
+                ).fetchall()
+            frame = pd.DataFrame(rows, columns=columns)
+            if table == "readings" and HAS_PARQUET:
+                archived = self._read_parquet(lo, hi)
+                if archived is not None:
+                    # A reader racing compact() can see a row in both places
+                    fresh = frame[~frame["id"].isin(archived["id"])]
+                    frame = pd.concat([archived, fresh] if len(fresh) else [archived], ignore_index=True)
+                    frame = frame.sort_values(["ts", "id"], kind="stable", ignore_index=True)
+            if len(frame):
+                yield frame
+
+    def compact(self, older_than_days=COMPACT_AFTER_DAYS, min_rows=COMPACT_MIN_ROWS, now=None):
+        """Move this user's old readings from SQLite into monthly Parquet files.
+
+        Holds the SQLite write lock for the duration, so concurrent workers
+        compact one at a time. A reader racing the final DELETE may briefly see
+        a row in both places; ``load_readings`` drops such duplicates by id.
+        A crash after a month file is replaced but before the DELETE commits
+        leaves its rows in SQLite too; the next compaction merges them into
+        the file again and drops the copies by id. Returns the number of rows
+        moved.
+        """
+        if not HAS_PARQUET:
+            logger.warning("pyarrow is not installed; old readings stay in SQLite instead of the Parquet archive")
+            return 0
+        now = now or datetime.now()
+        first_of_month = datetime(now.year, now.month, 1)
+        cutoff = min(to_epoch_ns(now - timedelta(days=older_than_days)), to_epoch_ns(first_of_month))
+        with self.storage._pool.connection() as conn:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM readings WHERE user_id = ? AND ts < ?", (self.user_id, cutoff)
+            ).fetchone()
+        if count < min_rows:
+            return 0
+        import pandas as pd
+
+        # Rows only change location, so cached views stay valid
+        with self._transaction(changes_data=False) as conn:
+            old = pd.read_sql_query(
+                "SELECT id, ts, value, type, notes FROM readings WHERE user_id = ? AND ts < ? ORDER BY ts",
+                conn, params=(self.user_id, cutoff),
+            )
+            old = old.astype({"id": "int64", "ts": "int64", "value": "float32", "type": "int8"})
+            months = old["ts"].to_numpy().view("datetime64[ns]").astype("datetime64[M]")
+            os.makedirs(self.parquet_dir, exist_ok=True)
+            for month in np.unique(months):
+                path = os.path.join(self.parquet_dir, f"{month}.parquet")
+                chunk = old[months == month]
+                if os.path.exists(path):
+                    chunk = pd.concat([pd.read_parquet(path), chunk], ignore_index=True)
+                    chunk = chunk.drop_duplicates("id", keep="last").sort_values("ts", kind="stable")
+                tmp = path + ".tmp"
+                chunk.to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+            conn.execute("DELETE FROM readings WHERE user_id = ? AND ts < ?", (self.user_id, cutoff))
+        return len(old)
+
+    # Meals
+
+    def add_meal(self, entry):
+        """Durably append a meal log entry (the dict built by the Meal Logger) and return its id."""
+        meal_date = entry["date"]
+        logged_at = entry.get("timestamp") or datetime.now()
+        when = entry.get("datetime") or datetime.combine(meal_date, logged_at.time())
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "INSERT INTO meals (user_id, ts, date, meal, food, portion, carbs, logged_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.user_id, to_epoch_ns(when), meal_date.isoformat(), entry["meal"], entry["food"],
+                 entry["portion"], float(entry["carbs"]), to_epoch_ns(logged_at)),
+            )
+        return cur.lastrowid
+
+    def load_meals(self, start=None, end=None):
+        """Meal log entries with ``start <= ts < end`` in logging order, as the Meal Logger's dicts."""
+        where, params = self._filter(start, end)
+        with self.storage._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {_MEAL_FIELDS} FROM meals{where} ORDER BY ts, id",
+                params,
+            ).fetchall()
+        return [_meal_entry(row) for row in rows]
+
+    def meals_page(self, start=None, end=None, meals=None, food="", offset=0, limit=50):
+        """One page of meal log entries, newest first, and how many match: ``(entries, total)``.
+
+        ``meals`` restricts to some meals (Breakfast, Lunch, ...) and ``food``
+        matches food names case-insensitively. The (user_id, ts) index serves
+        the range and the order, so only the page's rows are read.
+        """
+        extra, extra_params = [], []
+        if meals is not None:
+            extra.append(f"meal IN ({', '.join('?' * len(meals))})" if meals else "0")
+            extra_params += list(meals)
+        if food:
+            extra.append("instr(lower(food), ?) > 0")
+            extra_params.append(food.lower())
+        where, params = self._filter(start, end)
+        where += "".join(f" AND {clause}" for clause in extra)
+        params += extra_params
+        with self.storage._pool.connection() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM meals{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {_MEAL_FIELDS} FROM meals{where} ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)],
+            ).fetchall()
+        return [_meal_entry(row) for row in rows], total
+
+    # Insulin doses
+
+    def add_dose(self, timestamp, units, type_code):
+        """Durably log an insulin dose (``type_code`` indexes ``iob.INSULIN_TYPES``) and return its id."""
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = to_epoch_ns(timestamp)
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "INSERT INTO doses (user_id, ts, units, type) VALUES (?, ?, ?, ?)",
+                (self.user_id, int(timestamp), float(units), int(type_code)),
+            )
+        return cur.lastrowid
+
+    def load_doses(self, start=None, end=None):
+        """Doses with ``start <= ts < end`` as ``(timestamps_ns, units, type_codes)`` arrays."""
+        where, params = self._filter(start, end)
+        with self.storage._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT ts, units, type FROM doses{where} ORDER BY ts", params
+            ).fetchall()
+        if not rows:
+            return np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int8)
+        ts, units, types = zip(*rows)
+        return np.array(ts, dtype=np.int64), np.array(units, dtype=np.float64), np.array(types, dtype=np.int8)
+
+    def _filter(self, start, end, *extra):
+        # user_id leads every filter so SQLite seeks the (user_id, ts) index
+        return _ts_filter(start, end, "user_id = ?", *extra, params=[self.user_id])
+
+
+def _execute_script(conn, script):
+    # executescript() would commit the surrounding transaction first
+    for statement in script.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _ensure_user(conn, tenant, name, role):
+    conn.execute(
+        "INSERT INTO users (tenant, name, role) VALUES (?, ?, ?) ON CONFLICT (tenant, name) DO NOTHING",
+        (tenant, name, role),
+    )
+    (user_id,) = conn.execute("SELECT id FROM users WHERE tenant = ? AND name = ?", (tenant, name)).fetchone()
+    return user_id
+
+
+def _next_reading_id(conn, count=1):
+    # Ids must stay unique after rows are compacted out of SQLite, so they
+    # come from a counter rather than the table's rowid.
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('next_reading_id', 0) ON CONFLICT (key) DO NOTHING"
+    )
+    (first,) = conn.execute(
+        "UPDATE meta SET value = value + ? WHERE key = 'next_reading_id' RETURNING value - ?",
+        (count, count),
+    ).fetchone()
+    return first
+
+
+_MEAL_FIELDS = "id, ts, date, meal, food, portion, carbs, logged_at"
+
+
+def _meal_entry(row):
+    meal_id, ts, meal_date, meal, food, portion, carbs, logged_at = row
+    return {
+        "id": meal_id,
+        "date": date.fromisoformat(meal_date),
+        "meal": meal,
+        "food": food,
+        "portion": portion,
+        "carbs": carbs,
+        "datetime": _from_epoch_ns(ts),
+        "timestamp": _from_epoch_ns(logged_at),
+    }
+
+
+def _ts_filter(start, end, *extra, params=None):
+    clauses, params = list(extra), list(params or [])
+    if start is not None:
+        clauses.append("ts >= ?")
+        params.append(int(start))
+    if end is not None:
+        clauses.append("ts < ?")
+        params.append(int(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _archive_month(path):
+    # Archive files are named after their month, e.g. 2024-05.parquet
+    return np.datetime64(os.path.basename(path)[:7], "M")
+
+
+def _month_bounds(month):
+    """Epoch-ns ``(start, end)`` of a ``datetime64[M]`` month."""
+    return (int(month.astype("datetime64[ns]").astype(np.int64)),
+            int((month + 1).astype("datetime64[ns]").astype(np.int64)))
+
+
+def _from_epoch_ns(ns):
+    return _EPOCH + timedelta(microseconds=ns // 1000)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics_engine import TARGET_HIGH, TARGET_LOW, GlucoseStats, day_number
+
+# Welford/Chan updates accumulate in a different order than pandas' two-pass sums
+RTOL = 1e-9
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+@pytest.fixture
+def readings():
+    """About 60 days of readings every 37 minutes, spanning a year boundary and an ISO week 53."""
+    rng = np.random.default_rng(7)
+    start = pd.Timestamp("2020-12-01").value
+    timestamps = start + np.arange(2_400, dtype=np.int64) * 37 * _NS_PER_MINUTE
+    values = rng.normal(140, 45, timestamps.shape[0]).clip(40, 400).round(1)
+    return pd.DataFrame({"datetime": pd.to_datetime(timestamps), "blood_sugar": values})
+
+
+def _stats(frame):
+    return GlucoseStats.from_arrays(frame["datetime"].astype("int64").to_numpy(), frame["blood_sugar"].to_numpy())
+
+
+def assert_matches_pandas(stats, frame, since=None):
+    """Compare GlucoseStats with the pandas computations the Analytics page used to do."""
+    since_day = None
+    if since is not None:
+        frame = frame[frame["datetime"] >= since]
+        since_day = day_number(since.value)
+    values = frame["blood_sugar"]
+
+    summary = stats.summary(since_day)
+    assert summary.count == len(values)
+    np.testing.assert_allclose(summary.mean, values.mean(), rtol=RTOL)
+    np.testing.assert_allclose(summary.std, values.std(), rtol=RTOL)
+    assert summary.below == (values < TARGET_LOW).sum()
+    assert summary.in_range == values.between(TARGET_LOW, TARGET_HIGH).sum()
+    assert summary.above == (values > TARGET_HIGH).sum()
+
+    daily = values.groupby(frame["datetime"].dt.date).mean()
+    expected_daily = stats.daily_means(since_day)
+    assert expected_daily.index.tolist() == daily.index.tolist()
+    np.testing.assert_allclose(expected_daily.to_numpy(), daily.to_numpy(), rtol=RTOL)
+
+    iso = frame["datetime"].dt.isocalendar()
+    weekly = values.groupby([iso["year"], iso["week"]]).mean()
+    expected_weekly = stats.weekly_means(since_day)
+    assert expected_weekly.index.tolist() == [(int(y), int(w)) for y, w in weekly.index]
+    np.testing.assert_allclose(expected_weekly.to_numpy(), weekly.to_numpy(), rtol=RTOL)
+
+
+def test_from_arrays_matches_pandas(readings):
+    stats = _stats(readings)
+    assert_matches_pandas(stats, readings)
+    assert_matches_pandas(stats, readings, since=pd.Timestamp("2020-12-28"))
+
+
+def test_incremental_adds_match_pandas(readings):
+    stats = GlucoseStats()
+    for ts, value in zip(readings["datetime"].astype("int64"), readings["blood_sugar"]):
+        stats.add(ts, value)
+    assert_matches_pandas(stats, readings)
+
+
+def test_extend_matches_pandas(readings):
+    stats = _stats(readings.iloc[:1_000])
+    rest = readings.iloc[1_000:]
+    stats.extend(rest["datetime"].astype("int64").to_numpy(), rest["blood_sugar"].to_numpy())
+    assert_matches_pandas(stats, readings)
+
+
+def test_remove_and_replace_match_pandas(readings):
+    stats = _stats(readings)
+    rng = np.random.default_rng(1)
+    frame = readings.copy()
+
+    removed = rng.choice(frame.index, 300, replace=False)
+    for row in frame.loc[removed].itertuples():
+        stats.remove(row.datetime.value, row.blood_sugar)
+    frame = frame.drop(removed)
+    assert_matches_pandas(stats, frame)
+
+    # Edits move readings across days and weeks as well as changing values
+    edited = rng.choice(frame.index, 300, replace=False)
+    shifts = pd.to_timedelta(rng.integers(-10, 10, edited.shape[0]), unit="D")
+    new_values = rng.normal(150, 50, edited.shape[0]).clip(40, 400).round(1)
+    for row, shift, value in zip(frame.loc[edited].itertuples(), shifts, new_values):
+        stats.replace(row.datetime.value, row.blood_sugar, (row.datetime + shift).value, value)
+    frame.loc[edited, "datetime"] = frame.loc[edited, "datetime"] + shifts
+    frame.loc[edited, "blood_sugar"] = new_values
+    assert_matches_pandas(stats, frame)
+    assert_matches_pandas(stats, frame, since=pd.Timestamp("2021-01-04"))
+
+
+def test_removing_every_reading_empties_the_stats(readings):
+    frame = readings.iloc[:50]
+    stats = _stats(frame)
+    for row in frame.itertuples():
+        stats.remove(row.datetime.value, row.blood_sugar)
+    summary = stats.summary()
+    assert summary.count == 0 and np.isnan(summary.mean) and np.isnan(summary.std)
+    assert stats.daily_means().empty and stats.weekly_means().empty
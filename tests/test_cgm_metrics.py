@@ -0,0 +1,18 @@
+import numpy as np
+
+from cgm_metrics import cgm_metrics, format_metric
+from cohort import cohort_metrics
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def test_one_reading_has_no_variability():
+    metrics = cgm_metrics(np.array([0], dtype=np.int64), [120.0])
+    assert metrics.mean == 120.0
+    assert np.isnan(metrics.sd) and np.isnan(metrics.cv)
+    assert format_metric(metrics.cv, ".1f", "%") == "—"
+
+    grouped = cohort_metrics(np.array([0, 1, 1]), np.array([0, 0, 5 * _NS_PER_MINUTE]),
+                             np.array([120.0, 100.0, 140.0]), 2)
+    assert np.isnan(grouped["sd"][0]) and np.isnan(grouped["cv"][0])
+    np.testing.assert_allclose(grouped["cv"][1], cgm_metrics([0, 5 * _NS_PER_MINUTE], [100.0, 140.0]).cv)
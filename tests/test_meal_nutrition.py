@@ -0,0 +1,40 @@
+import pytest
+
+from meal_nutrition import parse_quantity, servings
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 1/2 cups", (1.5, "cups")),
+    ("150g", (150.0, "g")),
+    ("half", (0.5, None)),
+    ("2 servings", (2.0, "serving")),
+    ("medium", (1.0, "medium")),
+    ("", (None, None)),
+    ("some", (None, None)),
+    # Word amounts only count as whole words
+    ("about 2 cups", (2.0, "cups")),
+    ("approx 150g", (150.0, "g")),
+    ("ate half a cup", (0.5, "cup")),
+    ("apple 2 slices", (2.0, "slices")),
+    ("an apple", (1.0, None)),
+    ("a cup", (1.0, "cup")),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
+
+
+@pytest.mark.parametrize("portion", ["1/0 cup", "0/0", "2 0/0 cups", "3/0"])
+def test_zero_denominator_is_unparsed(portion):
+    assert parse_quantity(portion) == (None, None)
+    assert servings(portion, "Brown Rice (1/2 cup)") == 1.0
+
+
+def test_servings_converts_to_the_food_serving():
+    assert servings("1 cup", "Brown Rice (1/2 cup)") == pytest.approx(2.0)
+    assert servings("2", "Brown Rice (1/2 cup)") == 2.0
+    assert servings("100g", "Apple (medium)") == 100.0
+
+
+def test_zero_sized_serving_is_not_converted():
+    assert servings("1 cup", "Rice (0/0 cup)") == 1.0
+    assert servings("1 cup", "Rice (0 cup)") == 1.0
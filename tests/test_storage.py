@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from readings_store import to_epoch_ns
+from storage import HAS_PARQUET, Storage
+
+pytestmark = pytest.mark.skipif(not HAS_PARQUET, reason="compaction needs pyarrow")
+
+NOW = datetime(2024, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def user(tmp_path):
+    storage = Storage(str(tmp_path))
+    yield storage.user(storage.default_user_id())
+    storage.close()
+
+
+def _archived(user):
+    return pd.concat([pd.read_parquet(path) for path in user._parquet_months(None, None)], ignore_index=True)
+
+
+def test_compaction_retried_after_a_crash_keeps_one_copy(user):
+    # 90 days of hourly readings, so several months are old enough to archive
+    start = to_epoch_ns(NOW - timedelta(days=90))
+    timestamps = start + np.arange(90 * 24, dtype=np.int64) * 3_600 * 1_000_000_000
+    user.add_readings(timestamps, np.linspace(60, 250, timestamps.shape[0]), np.zeros(timestamps.shape[0], np.int8),
+                      notes={5: "after a walk"})
+    before = user.load_readings()
+    moved = user.compact(min_rows=1, now=NOW)
+    assert moved > 0
+
+    # A crash between writing the month files and committing the DELETE leaves the rows in SQLite too
+    archived = _archived(user)
+    with user._transaction(changes_data=False) as conn:
+        conn.executemany(
+            "INSERT INTO readings (id, user_id, ts, value, type, notes) VALUES (?, ?, ?, ?, ?, ?)",
+            zip(archived["id"].tolist(), [user.user_id] * len(archived), archived["ts"].tolist(),
+                archived["value"].astype(float).tolist(), archived["type"].tolist(), archived["notes"].tolist()),
+        )
+    assert user.compact(min_rows=1, now=NOW) == moved
+
+    archived = _archived(user)
+    assert len(archived) == moved and archived["id"].is_unique
+    assert archived["ts"].is_monotonic_increasing
+    after = user.load_readings()
+    np.testing.assert_array_equal(after.ids, before.ids)
+    np.testing.assert_array_equal(after.values, before.values)
+    assert after.note(before.ids[5]) == "after a walk"
@@ -0,0 +1,23 @@
+"""Page modules behind the sidebar navigation.
+
+Each page lives in its own module exposing ``render()`` and is imported only
+when first selected, so pages that don't chart never pay for pandas or plotly.
+"""
+import importlib
+
+# Sidebar label -> module implementing that page, in menu order
+PAGES = {
+    "🏠 Home": "views.home",
+    "👤 User Profile": "views.profile",
+    "💉 Insulin Calculator": "views.insulin_calculator",
+    "🍎 Diet Planner": "views.diet_planner",
+    "📊 Blood Sugar Tracker": "views.blood_sugar_tracker",
+    "📈 Analytics": "views.analytics",
+    "🏥 Clinician Dashboard": "views.cohort",
+    "📚 Educational Resources": "views.education",
+}
+
+
+def load_page(label):
+    """Import (once per process) and return the module rendering page ``label``."""
+    return importlib.import_module(PAGES[label])
@@ -0,0 +1,180 @@
+"""Analytics page: CGM metrics, ambulatory glucose profile, distribution by reading type, meal responses, exports."""
+import os
+
+import plotly.express as px
+import streamlit as st
+
+from analytics_engine import day_number
+from cgm_metrics import format_metric
+from charts import agp_figure
+from export import EXPORT_FORMATS, REPORT_DAYS
+from instrumentation import span
+from storage import window_bounds
+from views.common import (
+    HISTORY_WINDOWS, current_user, data_version, get_food_index, get_food_table, get_glucose_stats,
+    get_render_cache, get_storage, job_progress, load_blood_sugar_log, start_export,
+)
+
+# How many foods the meal response table lists
+TOP_FOODS = 15
+# Export choices -> table exported
+_EXPORTS = {
+    f"Clinician report ({REPORT_DAYS} days, HTML)": "report",
+    "Blood sugar readings": "readings",
+    "Meal log": "meals",
+    "Insulin doses": "doses",
+}
+_MIME_TYPES = {"csv": "text/csv", "parquet": "application/octet-stream", "html": "text/html"}
+_RESPONSE_HEADERS = {
+    "meals": "Meals",
+    "mean_iauc": "Mean iAUC (mg/dL·min)",
+    "mean_peak_rise": "Mean Peak Rise (mg/dL)",
+    "median_time_to_peak": "Median Time to Peak (min)",
+}
+
+
+def render():
+    st.markdown('<h2 class="section-header">Health Analytics Dashboard</h2>', unsafe_allow_html=True)
+    version = data_version()
+    render_cache = get_render_cache()
+    
+    analytics_window = st.selectbox("Period", list(HISTORY_WINDOWS), index=2, key="analytics_window")
+    window_start = window_bounds(HISTORY_WINDOWS[analytics_window])[0]
+    since_day = None if window_start is None else day_number(window_start)
+    
+    # Metrics come from the incrementally maintained aggregates, not a rescan
+    glucose_stats = get_glucose_stats(version)
+    summary = glucose_stats.summary(since_day)
+    
+    if not summary.count:
+        st.info("No data available for this period. Please log some blood sugar readings first.")
+        st.stop()
+    
+    def build_cgm_metrics():
+        from cgm_metrics import cgm_metrics
+        readings = load_blood_sugar_log(HISTORY_WINDOWS[analytics_window], version)
+        return cgm_metrics(readings.timestamps, readings.values)
+    
+    # Consensus metrics, time-weighted by the gaps between readings
+    metrics = render_cache.get_or_build(("cgm_metrics", current_user(), version, since_day), build_cgm_metrics)
+    ranges = metrics.ranges
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Average BG", f"{summary.mean:.1f} mg/dL")
+    
+    with col2:
+        st.metric("Time in Range (70-180)", f"{ranges['in_range'] * 100:.1f}%")
+    
+    with col3:
+        st.metric("Glucose Variability", format_metric(summary.std, ".1f", " mg/dL"))
+    
+    with col4:
+        st.metric("Total Readings", f"{summary.count}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Time Below Range (<70)", f"{(ranges['low'] + ranges['very_low']) * 100:.1f}%",
+                f"{ranges['very_low'] * 100:.1f}% below 54", delta_color="off")
+    col2.metric("Time Above Range (>180)", f"{(ranges['high'] + ranges['very_high']) * 100:.1f}%",
+                f"{ranges['very_high'] * 100:.1f}% above 250", delta_color="off")
+    col3.metric("GMI", format_metric(metrics.gmi, ".1f", "%"))
+    col4.metric("Coefficient of Variation", format_metric(metrics.cv, ".1f", "%"))
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("MAGE", format_metric(metrics.mage, ".1f", " mg/dL"))
+    col2.metric("LBGI", format_metric(metrics.lbgi, ".1f"))
+    col3.metric("HBGI", format_metric(metrics.hbgi, ".1f"))
+    col4.metric("Data Coverage", f"{metrics.hours:,.0f} h")
+    if summary.count < 3:
+        st.caption("— not enough readings in this period: variability needs 2 and MAGE 3.")
+    
+    # Ambulatory glucose profile: every day folded onto one 24-hour clock
+    st.subheader("Ambulatory Glucose Profile")
+    
+    def build_agp_figure():
+        readings = load_blood_sugar_log(HISTORY_WINDOWS[analytics_window], version)
+        return agp_figure(readings)
+    
+    fig_agp = render_cache.get_or_build(("agp_chart", current_user(), version, since_day), build_agp_figure)
+    with span("send agp chart"):
+        st.plotly_chart(fig_agp, width="stretch")
+    
+    # Distribution by reading type
+    st.subheader("Blood Sugar by Reading Type")
+    
+    def build_type_box_figure():
+        df = load_blood_sugar_log(HISTORY_WINDOWS[analytics_window], version).frame()
+        fig_box = px.box(df, x='type', y='value', 
+                         title="Blood Sugar Distribution by Reading Type")
+        fig_box.update_yaxes(title="Blood Sugar (mg/dL)")
+        return fig_box
+    
+    fig_box = render_cache.get_or_build(("type_box_chart", current_user(), version, since_day),
+                                        build_type_box_figure)
+    with span("send type box chart"):
+        st.plotly_chart(fig_box, width="stretch")
+    
+    # Glucose response in the 3 hours after each meal
+    st.subheader("Meal Responses")
+    
+    def build_response_tables():
+        from meal_nutrition import nutrition_frame
+        from meal_response import aggregate_responses, response_frame
+        
+        meals = get_storage().load_meals(window_start)
+        if not meals:
+            return None
+        joined = nutrition_frame(meals, get_food_table(), get_food_index())
+        # Group typos and spellings of one food under its database match
+        joined["food"] = joined["matched_food"].fillna(joined["food"].str.strip().str.title())
+        responses = response_frame(joined, load_blood_sugar_log(HISTORY_WINDOWS[analytics_window], version))
+        by_meal = aggregate_responses(responses, "meal").round(1).rename(columns=_RESPONSE_HEADERS)
+        by_food = aggregate_responses(responses, "food").head(TOP_FOODS).round(1).rename(columns=_RESPONSE_HEADERS)
+        return by_meal, by_food
+    
+    response_tables = render_cache.get_or_build(("meal_response_tables", current_user(), version, since_day),
+                                                build_response_tables)
+    if response_tables is None or response_tables[0].empty:
+        st.info("Log meals alongside your readings to see how your glucose responds to them.")
+    else:
+        by_meal, by_food = response_tables
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### By Meal")
+            st.dataframe(by_meal, width="stretch")
+        with col2:
+            st.markdown("#### By Food")
+            st.dataframe(by_food, width="stretch")
+    
+    # Full history and the visit report, written in the background
+    st.subheader("Export & Clinician Report")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        export_choice = st.selectbox("Export", list(_EXPORTS), key="export_choice")
+    table = _EXPORTS[export_choice]
+    with col2:
+        export_format = "html" if table == "report" else st.selectbox("Format", EXPORT_FORMATS, key="export_format")
+    with col3:
+        st.write("")
+        if st.button("Prepare Export"):
+            st.session_state.export_job = start_export(table, export_format, version)
+    
+    export_job = st.session_state.get("export_job")
+    if export_job is not None:
+        if not export_job.done:
+            job_progress(export_job)
+        elif export_job.error:
+            st.error(f"❌ Export failed: {export_job.error}")
+        else:
+            path, rows = export_job.result
+            if not os.path.exists(path):
+                # A newer export of the same data replaced this file
+                st.session_state.export_job = None
+                st.info("This export was replaced by a newer one; prepare it again.")
+                return
+            with open(path, "rb") as exported:
+                st.download_button(f"⬇️ Download {os.path.basename(path)}", exported.read(),
+                                   file_name=os.path.basename(path), mime=_MIME_TYPES[path.rsplit(".", 1)[1]])
+            if rows is not None:
+                st.caption(f"{rows:,} rows")
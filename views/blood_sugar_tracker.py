@@ -0,0 +1,241 @@
+"""Blood Sugar Tracker page: reading log, bulk import, history chart and reading history."""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from downsample import downsample
+from events import PREDICTED_LOW, RULES
+from forecast import HORIZONS
+from importer import VENDOR_FORMATS
+from instrumentation import span
+from readings_store import MAX_MG_DL, MIN_MG_DL, READING_TYPES, to_epoch_ns
+from views.common import (
+    HISTORY_WINDOWS, current_user, data_version, date_range_filter, get_event_detector, get_forecaster,
+    get_render_cache, job_progress, load_blood_sugar_log, load_user_profile, log_reading, page_controls, start_import,
+)
+
+# Zoomed out past this the trend chart picks points by shape (LTTB), which reads as a line where
+# per-bucket min/max draws a dense band; both keep every bucket's lowest and highest reading
+LTTB_MIN_DAYS = 30
+_EVENT_LABELS = {"hypo": "Low", "hyper": "High", PREDICTED_LOW: "Predicted low"}
+_HYPO, _HYPER = RULES
+# Shown when a reading raises an alert, with the actions from the Emergency Info tab
+_ALERT_MESSAGES = {
+    "hypo": (st.error, "🚨 Low blood sugar episode: take 15g fast-acting carbs, wait 15 minutes and recheck."),
+    "hyper": (st.warning, "⚠️ High blood sugar episode: check ketones, drink water and take correction insulin if needed."),
+    PREDICTED_LOW: (st.warning, "⚠️ Blood sugar is falling fast and may drop below 70 mg/dL within 20 minutes."),
+    "hypo_end": (st.success, "✅ Back above 80 mg/dL: low episode over."),
+    "hyper_end": (st.success, "✅ Back below 240 mg/dL: high episode over."),
+}
+
+
+def events_table(events):
+    """Detected events as a display table, newest first."""
+    import pandas as pd
+
+    rows = []
+    for event in reversed(events):
+        start = pd.Timestamp(event.start)
+        ongoing = event.end is None
+        rows.append({
+            "Event": _EVENT_LABELS[event.kind],
+            "Start": start,
+            "Duration (min)": None if ongoing or event.kind == PREDICTED_LOW else round((event.end - event.start) / 60e9),
+            "Glucose (mg/dL)": round(event.extreme),
+            "Status": "Ongoing" if ongoing else "",
+        })
+    return pd.DataFrame(rows, columns=["Event", "Start", "Duration (min)", "Glucose (mg/dL)", "Status"])
+
+
+def render():
+    st.markdown('<h2 class="section-header">Blood Sugar Monitoring</h2>', unsafe_allow_html=True)
+    version = data_version()
+    render_cache = get_render_cache()
+    
+    tab1, tab2 = st.tabs(["📝 Log Reading", "📈 View History"])
+    
+    with tab1:
+        st.subheader("Log Blood Sugar Reading")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            reading_date = st.date_input("Date", value=date.today())
+            reading_time = st.time_input("Time", value=datetime.now().time())
+            blood_sugar = st.number_input("Blood Sugar (mg/dL)", min_value=MIN_MG_DL, max_value=MAX_MG_DL, value=100.0)
+            reading_type = st.selectbox("Reading Type", READING_TYPES)
+        
+        with col2:
+            notes = st.text_area("Notes (optional)", 
+                               placeholder="e.g., after exercise, feeling sick, missed medication")
+            
+            if st.button("Log Reading"):
+                # Built before the write so the reading is checked against the episode in progress
+                get_event_detector(version)
+                alerts = log_reading(datetime.combine(reading_date, reading_time), blood_sugar, reading_type,
+                                     notes, version)
+                st.success("✅ Blood sugar reading logged successfully!")
+                for alert in alerts:
+                    show, message = _ALERT_MESSAGES[alert.kind]
+                    show(message)
+                if not any(alert.kind in ("hypo", "hyper") for alert in alerts):
+                    # Single readings past the thresholds still warrant action before an episode is confirmed
+                    if blood_sugar < _HYPO.enter:
+                        st.error(_ALERT_MESSAGES["hypo"][1].replace("episode", "reading"))
+                    elif blood_sugar > _HYPER.enter:
+                        st.warning(_ALERT_MESSAGES["hyper"][1].replace("episode", "reading"))
+
+        # Bulk import from CGM/meter exports
+        with st.expander("📥 Import readings from a CSV export"):
+            uploaded_file = st.file_uploader("CGM or meter export (CSV)", type=["csv"])
+            import_format = st.selectbox("Export format", ["Detect automatically"] + sorted(VENDOR_FORMATS))
+
+            if uploaded_file is not None and st.button("Import Readings"):
+                vendor = None if import_format == "Detect automatically" else import_format
+                # Runs in the background; the data version moves with every chunk, so views reload when it's done
+                st.session_state.import_job = start_import(uploaded_file.getvalue(), vendor)
+
+            import_job = st.session_state.get("import_job")
+            if import_job is not None:
+                if not import_job.done:
+                    job_progress(import_job)
+                elif import_job.error:
+                    st.error(f"❌ {import_job.error}")
+                else:
+                    result = import_job.result
+                    st.success(f"✅ Imported {result.imported:,} readings ({result.rejected:,} rows skipped).")
+
+        # Display target ranges
+        st.markdown("""
+        <div class="info-box">
+            <h4>📊 Target Blood Sugar Ranges (mg/dL)</h4>
+            <ul>
+                <li><strong>Fasting:</strong> 80-130 mg/dL</li>
+                <li><strong>Before Meals:</strong> 80-130 mg/dL</li>
+                <li><strong>2 hours after meals:</strong> < 180 mg/dL</li>
+                <li><strong>Bedtime:</strong> 100-140 mg/dL</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with tab2:
+        st.subheader("Blood Sugar History")
+        history_window = st.selectbox("Show", list(HISTORY_WINDOWS), index=1, key="history_window")
+        blood_sugar_log = load_blood_sugar_log(HISTORY_WINDOWS[history_window], version)
+        
+        if blood_sugar_log:
+            # Columnar store exposes a cached DataFrame over its buffers
+            df = blood_sugar_log.frame()
+            window_key = st.session_state.blood_sugar_window
+            
+            # Zooming narrows the slice that gets downsampled, so detail comes back as the range shrinks
+            first_ts, last_ts = df['datetime'].iloc[0].to_pydatetime(), df['datetime'].iloc[-1].to_pydatetime()
+            zoom = (first_ts, last_ts)
+            if last_ts > first_ts:
+                zoom = st.slider("Zoom", min_value=first_ts, max_value=last_ts,
+                                 value=(first_ts, last_ts), step=timedelta(minutes=5),
+                                 format="YYYY-MM-DD HH:mm", key="history_zoom")
+            
+            # The forecast runs on the profile's ratios, so the chart changes with them too
+            profile = load_user_profile()
+            ratios = (profile['correction_factor'], profile['carb_ratio']) if profile else None
+            
+            def build_trend_figure():
+                timestamps = blood_sugar_log.timestamps
+                lo = np.searchsorted(timestamps, to_epoch_ns(zoom[0]), side='left')
+                hi = np.searchsorted(timestamps, to_epoch_ns(zoom[1]), side='right')
+                visible = df.iloc[lo:hi]
+                
+                # Only send the browser as many points as the chart can draw, keeping every low and high
+                method = 'lttb' if zoom[1] - zoom[0] > timedelta(days=LTTB_MIN_DAYS) else 'minmax'
+                shown = visible.iloc[downsample(visible['datetime'].to_numpy(), visible['value'].to_numpy(),
+                                                method=method)]
+                
+                # Create plot
+                fig = go.Figure()
+                
+                # Add blood sugar readings
+                fig.add_trace(go.Scatter(
+                    x=shown['datetime'],
+                    y=shown['value'],
+                    mode='markers+lines' if len(shown) == len(visible) else 'lines',
+                    name='Blood Sugar',
+                    text=shown['type'],
+                    hovertemplate='<b>%{text}</b><br>Value: %{y} mg/dL<br>Date: %{x}<extra></extra>'
+                ))
+                
+                # Forecast from the latest reading when the chart reaches it, from trend, carbs and insulin on board
+                if ratios and hi == len(timestamps):
+                    forecast_ts, forecast = get_forecaster(window_key[1]).predict(*ratios, max(HORIZONS))
+                    fig.add_trace(go.Scatter(
+                        x=forecast_ts.astype('datetime64[ns]'),
+                        y=forecast,
+                        mode='lines',
+                        line=dict(dash='dot'),
+                        name='Forecast',
+                        hovertemplate='Forecast: %{y:.0f} mg/dL<br>Date: %{x}<extra></extra>'
+                    ))
+                
+                # Add target range
+                fig.add_hline(y=130, line_dash="dash", line_color="orange", 
+                             annotation_text="Upper Target (130)")
+                fig.add_hline(y=80, line_dash="dash", line_color="orange", 
+                             annotation_text="Lower Target (80)")
+                fig.add_hrect(y0=80, y1=130, fillcolor="lightgreen", opacity=0.2, 
+                             annotation_text="Target Range")
+                
+                fig.update_layout(
+                    title="Blood Sugar Trends",
+                    xaxis_title="Date/Time",
+                    yaxis_title="Blood Sugar (mg/dL)",
+                    hovermode='closest'
+                )
+                return fig
+            
+            fig = render_cache.get_or_build(("trend_chart", current_user(), window_key, zoom, ratios),
+                                            build_trend_figure)
+            # Serializing the figure for the browser is a stage of its own
+            with span("send trend chart"):
+                st.plotly_chart(fig, width="stretch")
+            
+            # Reading history, filtered and paged through the store's indexes: only the page's rows are built
+            st.subheader("Readings")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                date_range = date_range_filter("Dates", first_ts.date(), last_ts.date(),
+                                               key=f"readings_dates_{history_window}")
+            with col2:
+                types = st.multiselect("Reading types", READING_TYPES, key="readings_types")
+            with col3:
+                notes_filter = st.text_input("Notes contain", key="readings_notes").strip()
+            filters = (date_range, tuple(types), notes_filter)
+            total = blood_sugar_log.index.page(*date_range, types or None, notes_filter, limit=0)[1]
+            offset, limit = page_controls(total, "readings")
+            
+            def build_readings_page():
+                rows, _ = blood_sugar_log.index.page(*date_range, types or None, notes_filter, offset, limit)
+                return blood_sugar_log.with_details(df.iloc[rows]).reset_index(drop=True)
+            
+            if total:
+                page_df = render_cache.get_or_build(
+                    ("readings_page", current_user(), window_key, filters, offset, limit), build_readings_page)
+                with span("send readings table"):
+                    st.dataframe(page_df, width="stretch", hide_index=True)
+            else:
+                st.caption("No readings match these filters.")
+            
+            # Hypo/hyper episodes and predicted lows that started in this window
+            st.subheader("Recent Events")
+            (window_start, _), window_version = window_key
+            events = get_event_detector(window_version).events.between(window_start)
+            if events:
+                events_df = render_cache.get_or_build(("recent_events", current_user(), window_key),
+                                                      lambda: events_table(events))
+                st.dataframe(events_df, width="stretch")
+            else:
+                st.caption("No low or high episodes in this period.")
+            
+        else:
+            st.info("No blood sugar readings in this period. Start by logging a reading!")
@@ -0,0 +1,84 @@
+"""Clinician Dashboard page: every patient of the clinic ranked by recent glucose metrics."""
+import streamlit as st
+
+from cohort import COHORT_DAYS
+from jobs import DONE
+from views.common import get_cohort_engine, get_job_queue, job_progress, signed_in_user, switch_user
+
+# Rank-by choice -> (column, ascending); the patients needing attention come first
+RANKINGS = {
+    "Time in Range (lowest first)": ("tir", True),
+    "Mean BG (highest first)": ("mean", False),
+    "Variability, CV (highest first)": ("cv", False),
+    "Hypo episodes (most first)": ("hypos", False),
+}
+# Consensus target: more than 70% of the time in range
+TIR_TARGET = 0.70
+_HEADERS = {
+    "name": "Patient",
+    "readings": "Readings",
+    "mean": "Mean BG (mg/dL)",
+    "tir": "TIR (%)",
+    "tbr": "TBR (%)",
+    "tar": "TAR (%)",
+    "cv": "CV (%)",
+    "gmi": "GMI (%)",
+    "hypos": "Hypo Episodes",
+}
+
+
+def render():
+    st.markdown('<h2 class="section-header">Clinician Dashboard</h2>', unsafe_allow_html=True)
+    # Gated on the signed-in account, so a clinician viewing a patient keeps the dashboard
+    if signed_in_user().role != "clinician":
+        st.info("The clinician dashboard is for clinician accounts. Start the app with DIABETCARE_ADMIN=1 "
+                "to add one and sign in as it.")
+        return
+
+    # Refreshed in the background; only patients whose data changed are recomputed, and
+    # until that finishes the page shows the metrics computed last time
+    engine = get_cohort_engine()
+    job = get_job_queue().submit(("cohort", engine.tenant, engine.state_key()),
+                                 lambda job: engine.refresh(progress=job.report),
+                                 label="Updating patient metrics")
+    if job.status == DONE:
+        cohort, recomputed = job.result
+    else:
+        if job.error:
+            st.error(f"❌ Updating patient metrics failed: {job.error}")
+        else:
+            job_progress(job)
+        cohort, recomputed = engine.snapshot(), None
+    if cohort.empty:
+        if job.done:
+            st.info("No patients in this clinic yet.")
+        return
+
+    with_data = cohort[cohort["readings"] > 0]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Patients", f"{len(cohort):,}")
+    with col2:
+        st.metric("Median TIR", f"{with_data['tir'].median() * 100:.1f}%" if len(with_data) else "–")
+    with col3:
+        st.metric("Below TIR Target", f"{int((with_data['tir'] <= TIR_TARGET).sum()):,}")
+    with col4:
+        st.metric("With Hypo Episodes", f"{int((cohort['hypos'] > 0).sum()):,}")
+
+    rank_by = st.selectbox("Rank by", list(RANKINGS), key="cohort_rank_by")
+    column, ascending = RANKINGS[rank_by]
+    ranked = cohort.sort_values(column, ascending=ascending, na_position="last")
+    table = ranked[list(_HEADERS)].copy()
+    for fraction in ("tir", "tbr", "tar"):
+        table[fraction] = (table[fraction] * 100).round(1)
+    table[["mean", "cv", "gmi"]] = table[["mean", "cv", "gmi"]].round(1)
+    st.dataframe(table.rename(columns=_HEADERS), hide_index=True, width="stretch")
+    if recomputed is not None:
+        st.caption(f"Last {COHORT_DAYS} days · {recomputed:,} patients updated since the last view")
+
+    # Open a patient's own pages, as that patient's session would show them
+    patient = st.selectbox("Open patient", ranked.index.tolist(), format_func=ranked["name"].get,
+                           index=None, placeholder="Choose a patient", key="cohort_open_patient")
+    if patient is not None and st.button("Open Patient"):
+        switch_user(patient)
+        st.rerun()
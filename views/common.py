@@ -0,0 +1,537 @@
+import hashlib
+import io
+import os
+import threading
+from datetime import datetime, time, timedelta
+
+import streamlit as st
+
+from instrumentation import profiler, span
+from readings_store import to_epoch_ns, type_code
+from render_cache import RenderCache
+from storage import DEFAULT_TENANT, ROLES, Storage, window_bounds
+
+# Selectable history windows in days; None loads everything
+HISTORY_WINDOWS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+# The Meal Logger only shows recent meals, so only that much is loaded
+MEAL_LOG_DAYS = 30
+# How often pages poll a running background job
+JOB_POLL_SECONDS = 1.0
+# Rows per page offered by the history tables
+PAGE_SIZES = (25, 50, 100)
+# Renders listed by the profiling panel
+DEBUG_RENDERS = 10
+# This is a local single-tenant demo, not access control: nobody authenticates, and the sidebar's
+# "Signed in as" picker stands in for a login. It, and creating clinician accounts, are only offered
+# when whoever starts the app opts in with DIABETCARE_ADMIN=1. Otherwise every session acts as the
+# tenant's default user.
+ADMIN_MODE = os.environ.get("DIABETCARE_ADMIN", "").lower() not in ("", "0", "false", "no")
+# Session state holding one user's loaded data, dropped when the session switches user
+_USER_SESSION_KEYS = ("blood_sugar_log", "blood_sugar_window", "meal_log", "meal_window", "user_profile",
+                      "history_zoom", "import_job", "export_job")
+
+
+@st.cache_resource
+def get_backend():
+    # One storage engine (and connection pool) per worker process, shared by every session and user
+    return Storage()
+
+
+def signed_in_user():
+    """The account the session acts as: the tenant's default user unless ``sign_in`` picked another."""
+    if 'signed_in_id' not in st.session_state:
+        st.session_state.signed_in_id = get_backend().default_user_id(DEFAULT_TENANT)
+    return get_backend().get_user(st.session_state.signed_in_id)
+
+
+def sign_in(user_id):
+    """Act as ``user_id`` from now on and show their data; only offered in ``ADMIN_MODE``."""
+    if not ADMIN_MODE:
+        raise PermissionError("Switching accounts needs DIABETCARE_ADMIN=1")
+    st.session_state.signed_in_id = user_id
+    switch_user(user_id)
+
+
+def may_view(user_id):
+    """Whether the signed-in account may open ``user_id``'s data: their own, or a patient's for a clinician."""
+    account = signed_in_user()
+    if user_id == account.id:
+        return True
+    return account.role == "clinician" and get_backend().get_user(user_id).role == "patient"
+
+
+def current_user():
+    """Id of the user whose data the session shows; the signed-in account until ``switch_user`` picks another."""
+    if 'user_id' not in st.session_state:
+        st.session_state.user_id = signed_in_user().id
+    return st.session_state.user_id
+
+
+def switch_user(user_id):
+    if not may_view(user_id):
+        raise PermissionError(f"Signed-in account may not open user {user_id}")
+    if user_id != st.session_state.get('user_id'):
+        for key in _USER_SESSION_KEYS:
+            st.session_state.pop(key, None)
+        st.session_state.user_id = user_id
+
+
+def get_storage():
+    """Storage scoped to the session user's partition."""
+    return get_backend().user(current_user())
+
+
+def render_user_picker():
+    """Sidebar account controls, gated by role; see ``ADMIN_MODE`` for why this isn't access control.
+
+    In admin mode any user can be signed in as and users of either role
+    added. A clinician can open and add patients; a patient only sees
+    their own data.
+    """
+    backend = get_backend()
+    account = signed_in_user()
+    if ADMIN_MODE:
+        users = backend.users(DEFAULT_TENANT)
+        labels = {user.id: f"{user.name} ({user.role})" for user in users}
+        st.session_state.account_picker = account.id
+        st.sidebar.selectbox("Signed in as (admin)", list(labels), format_func=labels.get, key="account_picker",
+                             on_change=lambda: sign_in(st.session_state.account_picker))
+    else:
+        st.sidebar.caption(f"Signed in as {account.name} ({account.role})")
+    if account.role == "clinician":
+        labels = {account.id: f"{account.name} (you)"}
+        labels.update((user.id, user.name) for user in backend.users(DEFAULT_TENANT, role="patient"))
+        # Follow switches made elsewhere (adding a patient, opening one) before the widget renders
+        st.session_state.user_picker = current_user()
+        st.sidebar.selectbox("Viewing", list(labels), format_func=labels.get, key="user_picker",
+                             on_change=lambda: switch_user(st.session_state.user_picker))
+
+    roles = ROLES if ADMIN_MODE else ("patient",) if account.role == "clinician" else ()
+    if not roles:
+        return
+    with st.sidebar.expander("➕ Add user" if len(roles) > 1 else "➕ Add patient"):
+        name = st.text_input("Name", key="new_user_name")
+        role = st.selectbox("Role", roles, key="new_user_role") if len(roles) > 1 else roles[0]
+        if st.button("Add User") and name.strip():
+            user_id = backend.add_user(name.strip(), role, DEFAULT_TENANT)
+            existing = backend.get_user(user_id)
+            if existing.role != role:
+                # add_user returns the existing user of that name, whatever their role
+                st.error(f"{existing.name} is already a {existing.role}.")
+                return
+            if ADMIN_MODE:
+                sign_in(user_id)
+            else:
+                switch_user(user_id)
+            st.rerun()
+
+
+def profiling_requested():
+    """Whether this rerun is profiled: for every session via DIABETCARE_PROFILE, or this one via ``?profile=1``."""
+    return profiler.enabled or st.query_params.get("profile") == "1"
+
+
+def render_debug_panel():
+    """Sidebar panel with the worker's last profiled renders and span totals, plus their exports."""
+    with st.sidebar.expander("⏱️ Render profile"):
+        renders = profiler.last_renders(DEBUG_RENDERS)
+        if not renders:
+            st.caption("No profiled renders yet; they appear from the next rerun.")
+            return
+        st.dataframe([{
+            "Page": render.page,
+            "Total (ms)": round(render.seconds * 1000, 1),
+            "Untracked (ms)": round(render.untracked * 1000, 1),
+            "Slowest stage": max(render.spans, key=lambda entry: entry[2])[0] if render.spans else "",
+            "Error": render.error or "",
+        } for render in renders], hide_index=True)
+        selected = st.selectbox("Stages of render", range(len(renders)), key="debug_render",
+                                format_func=lambda i: f"#{i + 1} {renders[i].page} ({renders[i].seconds * 1000:.0f} ms)")
+        st.dataframe([{"Stage": "  " * depth + name, "ms": round(seconds * 1000, 2)}
+                      for name, depth, seconds in renders[selected].spans], hide_index=True)
+        totals = sorted(profiler.span_totals().items(), key=lambda item: -item[1][1])
+        st.dataframe([{"Stage": name, "Runs": count, "Mean (ms)": round(seconds / count * 1000, 2),
+                       "Max (ms)": round(peak * 1000, 2)} for name, (count, seconds, peak) in totals],
+                     hide_index=True)
+        col1, col2 = st.columns(2)
+        col1.download_button("Metrics", profiler.prometheus(), file_name="diabetcare.prom", mime="text/plain")
+        col2.download_button("JSON", profiler.to_json(), file_name="diabetcare-profile.json",
+                             mime="application/json")
+
+
+@st.cache_resource
+def _food_db():
+    # Read-only reference data mapped from disk, so workers share its pages too
+    from foods import open_food_db
+    return open_food_db()
+
+
+def get_food_table():
+    return _food_db()[0]
+
+
+def get_food_index():
+    return _food_db()[1]
+
+
+@st.cache_resource
+def get_meal_planner():
+    from meal_planner import MealPlanner
+    return MealPlanner(get_food_table(), get_food_index())
+
+
+@st.cache_resource
+def get_cohort_engine():
+    # Per-patient metrics cached across clinician sessions of this worker
+    from cohort import CohortEngine
+    return CohortEngine(get_backend(), DEFAULT_TENANT)
+
+
+@st.cache_resource
+def get_render_cache():
+    # Built figures and tables, shared by every session of this worker
+    cache = RenderCache()
+    # Its hit rate and size join the profiler's metrics export
+    profiler.add_collector(lambda: _render_cache_metrics(cache))
+    return cache
+
+
+def _render_cache_metrics(cache):
+    # Lookups and evictions only ever grow, so they're exported as counters (``_total``)
+    return {f"render_cache_{name}{'_total' if name in ('hits', 'misses', 'evictions') else ''}": value
+            for name, value in cache.stats().items()}
+
+
+@st.cache_resource
+def get_job_queue():
+    # Background jobs of every session of this worker; finished results land in the render cache
+    from jobs import JobQueue
+    return JobQueue(get_render_cache())
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(job):
+    """Progress bar for a background job, polled until it finishes and then rerunning the page."""
+    if job.done:
+        st.rerun()
+    st.progress(job.progress, text=job.message or job.label or "Working...")
+
+
+def date_range_filter(label, first, last, key):
+    """Date range picker defaulting to ``first``..``last``; returns epoch-ns ``(start, end)``, ``end`` exclusive."""
+    picked = st.date_input(label, value=(first, last), key=key)
+    # Mid-selection only the start date is set
+    start = picked[0] if picked else first
+    end = picked[1] if len(picked) > 1 else start
+    return (to_epoch_ns(datetime.combine(start, time())),
+            to_epoch_ns(datetime.combine(end + timedelta(days=1), time())))
+
+
+def page_controls(total, key):
+    """Rows-per-page and page pickers for a table of ``total`` matches; returns ``(offset, limit)``."""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    limit = col1.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(-(-total // limit), 1)
+    # Narrower filters leave fewer pages than the one last shown
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col2.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    offset = (page - 1) * limit
+    if total:
+        col3.caption(f"Showing {offset + 1:,}-{min(offset + limit, total):,} of {total:,}")
+    return offset, limit
+
+
+def start_import(data, vendor):
+    """Queue a background import of CSV export bytes for the session user and return its job.
+
+    Importing the same file again returns the first job, so a double click
+    can't import it twice. Once the rows are in, the job also rebuilds the
+    user's full-history worker slots, so their next page view doesn't have to.
+    """
+    from importer import import_csv
+
+    backend, states, user_id = get_backend(), _worker_states(), current_user()
+
+    def run(job):
+        source = io.BytesIO(data)
+        storage = backend.user(user_id)
+        result = import_csv(
+            source, storage, vendor,
+            progress=lambda r: job.report(source.tell() / max(len(data), 1), f"Imported {r.imported:,} readings..."),
+        )
+        job.report(1.0, "Updating statistics...")
+        _rebuild_user_slots(states, storage)
+        return result
+
+    key = ("import", user_id, hashlib.sha1(data).hexdigest(), vendor)
+    return get_job_queue().submit(key, run, label="Importing readings")
+
+
+@st.cache_resource
+def _compaction_days():
+    # Day compaction was last queued for each user, so reruns don't resubmit it
+    return {}
+
+
+def schedule_compaction():
+    """Queue a background move of the session user's old readings into Parquet, once a day per worker.
+
+    Compaction holds the SQLite write lock while it runs, so it stays off
+    the script thread; a page reading at the same time sees every row once.
+    """
+    backend, user_id = get_backend(), current_user()
+    today = datetime.now().date().isoformat()
+    scheduled = _compaction_days()
+    if scheduled.get(user_id) == today:
+        return
+    scheduled[user_id] = today
+    key = ("compact", user_id, today)
+    get_job_queue().submit(key, lambda job: backend.user(user_id).compact(), label="Archiving old readings")
+
+
+def start_export(table, fmt, version):
+    """Queue a background export of the session user's ``table`` (or their clinician ``"report"``).
+
+    The job writes a file under the data directory and returns ``(path,
+    rows)``; it's keyed by data version, so asking again before anything
+    changes reuses the file.
+    """
+    from export import clinician_report, export_table
+
+    backend, user_id = get_backend(), current_user()
+    extension = "html" if table == "report" else fmt
+    folder = os.path.join(backend.data_dir, "exports", str(user_id))
+
+    def run(job):
+        os.makedirs(folder, exist_ok=True)
+        # Older exports of this table are superseded by this one
+        for name in os.listdir(folder):
+            if name.startswith(f"{table}-"):
+                os.remove(os.path.join(folder, name))
+        path = os.path.join(folder, f"{table}-v{version}.{extension}")
+        storage = backend.user(user_id)
+        if table == "report":
+            job.report(None, "Building report...")
+            with open(path, "w", encoding="utf-8") as out:
+                out.write(clinician_report(storage, patient=backend.get_user(user_id).name))
+            return path, None
+        rows = export_table(storage, table, path, fmt,
+                            progress=lambda fraction: job.report(fraction, f"Exported {fraction:.0%}..."))
+        return path, rows
+
+    key = ("export", user_id, table, extension, version)
+    return get_job_queue().submit(key, run, label=f"Exporting {table}")
+
+
+def data_version():
+    """The session user's data version; pages read it once per rerun and key everything on it."""
+    return get_storage().data_version()
+
+
+def own_write_version(before):
+    """Data version after this session's single write, or None if another writer also got in."""
+    after = get_storage().data_version()
+    return after if after == before + 1 else None
+
+
+@st.cache_resource
+def _worker_states():
+    # One slot per (user, derived structure), shared by every session of this worker
+    return {'lock': threading.Lock(), 'slots': {}}
+
+
+def _slot(name):
+    states = _worker_states()
+    key = (current_user(), name)
+    with states['lock']:
+        return states['slots'].setdefault(key, {'lock': threading.Lock(), 'version': None, 'value': None})
+
+
+def _versioned(name, version):
+    """Worker-wide value for ``name`` of the session user, rebuilt only when their data version moved."""
+    state = _slot(name)
+    with state['lock']:
+        if state['version'] != version:
+            with span(f"rebuild {name}"):
+                state['value'] = _SLOT_BUILDERS[name](get_storage())
+            state['version'] = version
+        return state['value']
+
+
+def _rebuild_user_slots(states, storage):
+    """Rebuild every slot ``storage``'s user has loaded at their current data version (off the script thread)."""
+    with states['lock']:
+        slots = [(name, state) for (owner, name), state in states['slots'].items() if owner == storage.user_id]
+    for name, state in slots:
+        with state['lock']:
+            version = storage.data_version()
+            if state['version'] != version:
+                state['value'] = _SLOT_BUILDERS[name](storage)
+                state['version'] = version
+
+
+def _apply_own_write(before, after, **updates):
+    """Carry every slot of the session user that was current before their write over to ``after``.
+
+    Slots named in ``updates`` are patched in place by their callable; the
+    rest are unaffected by this kind of write and just move to the new version.
+    A callable that returns False couldn't patch its value, which is then left
+    to be rebuilt on next use.
+    """
+    user_id = current_user()
+    states = _worker_states()
+    with states['lock']:
+        slots = [(name, state) for (owner, name), state in states['slots'].items() if owner == user_id]
+    for name, state in slots:
+        with state['lock']:
+            if state['version'] == before:
+                if name in updates and updates[name](state['value']) is False:
+                    continue
+                state['version'] = after
+
+
+def _build_glucose_stats(storage):
+    from analytics_engine import GlucoseStats
+    history = storage.load_readings()
+    return GlucoseStats.from_arrays(history.timestamps, history.values, history.derived["day"])
+
+
+def _build_iob_engine(storage):
+    from iob import IOBEngine
+    return IOBEngine.from_arrays(*storage.load_doses())
+
+
+def _build_event_detector(storage):
+    from events import EventDetector
+    history = storage.load_readings()
+    return EventDetector.from_history(history.timestamps, history.values)
+
+
+def _build_forecaster(storage):
+    from forecast import GlucoseForecaster
+    history = storage.load_readings()
+    meals = storage.load_meals()
+    return GlucoseForecaster.from_history(
+        history.timestamps, history.values, storage.load_doses(),
+        [to_epoch_ns(meal["datetime"]) for meal in meals], [meal["carbs"] for meal in meals],
+    )
+
+
+# Slot name -> build(user_storage), each over the user's full history
+_SLOT_BUILDERS = {
+    'glucose_stats': _build_glucose_stats,
+    'iob_engine': _build_iob_engine,
+    'event_detector': _build_event_detector,
+    'forecaster': _build_forecaster,
+}
+
+
+def get_glucose_stats(version):
+    """Analytics aggregates over full history."""
+    return _versioned('glucose_stats', version)
+
+
+def get_iob_engine(version):
+    """Insulin-on-board engine over the full dose history."""
+    return _versioned('iob_engine', version)
+
+
+def get_event_detector(version):
+    """Hypo/hyper event detector, replayed over full history and then fed live readings."""
+    return _versioned('event_detector', version)
+
+
+def get_forecaster(version):
+    """Glucose forecaster fitted over the full history of readings, doses and meals."""
+    return _versioned('forecaster', version)
+
+
+def _is_current(window, bounds, version):
+    # A window this session already advanced past its own write is newer than the rerun's version
+    return window is not None and window[0] == bounds and window[1] >= version
+
+
+def load_blood_sugar_log(days, version):
+    """Load the readings window a page displays, reusing the session's copy while it still matches."""
+    bounds = window_bounds(days)
+    if not _is_current(st.session_state.get('blood_sugar_window'), bounds, version):
+        with span("load readings"):
+            st.session_state.blood_sugar_log = get_storage().load_readings(*bounds)
+        st.session_state.blood_sugar_window = (bounds, version)
+    return st.session_state.blood_sugar_log
+
+
+def load_meal_log(version):
+    bounds = window_bounds(MEAL_LOG_DAYS)
+    if not _is_current(st.session_state.get('meal_window'), bounds, version):
+        with span("load meals"):
+            st.session_state.meal_log = get_storage().load_meals(*bounds)
+        st.session_state.meal_window = (bounds, version)
+    return st.session_state.meal_log
+
+
+def log_reading(when, value, reading_type, notes, version):
+    """Durably log a reading and bring this worker's loaded state up to date.
+
+    Returns the event alerts the reading raised, if it was the latest one.
+    """
+    reading_ts = to_epoch_ns(when)
+    reading_id = get_storage().add_reading(reading_ts, value, type_code(reading_type), notes)
+    new_version = own_write_version(version)
+    if new_version is None:
+        return []
+    alerts = []
+
+    def push_event(detector):
+        # A backfilled reading changes episodes already detected, so that needs a replay
+        if detector.last_ts is not None and reading_ts < detector.last_ts:
+            return False
+        alerts.extend(detector.push(reading_ts, value))
+
+    # Only our write happened, so update loaded state in place instead of reloading it
+    _apply_own_write(version, new_version, glucose_stats=lambda stats: stats.add(reading_ts, value),
+                     event_detector=push_event,
+                     forecaster=lambda forecaster: forecaster.add_reading(reading_ts, value))
+    window = st.session_state.get('blood_sugar_window')
+    if window is not None and window[1] == version:
+        (window_start, _), _ = window
+        if window_start is None or reading_ts >= window_start:
+            st.session_state.blood_sugar_log.append(
+                reading_ts, value, reading_type, notes, reading_id=reading_id
+            )
+        st.session_state.blood_sugar_window = (window[0], new_version)
+    return alerts
+
+
+def log_dose(when, units, insulin_type, version):
+    """Durably log an insulin dose and add it to this worker's IOB engine and forecaster."""
+    from iob import INSULIN_TYPES
+
+    dose_ts = to_epoch_ns(when)
+    get_storage().add_dose(dose_ts, units, INSULIN_TYPES.index(insulin_type))
+    new_version = own_write_version(version)
+    if new_version is not None:
+        _apply_own_write(version, new_version, iob_engine=lambda engine: engine.add(dose_ts, units, insulin_type),
+                         forecaster=lambda forecaster: forecaster.add_dose(dose_ts, units, insulin_type))
+
+
+def log_meal(meal_entry, version):
+    """Durably log a meal and append it to the session's meal log."""
+    meal_log = load_meal_log(version)
+    meal_entry["id"] = get_storage().add_meal(meal_entry)
+    new_version = own_write_version(version)
+    if new_version is not None:
+        # Only our write happened, so extend the loaded log instead of reloading it
+        meal_log.append(meal_entry)
+        meal_ts = to_epoch_ns(meal_entry["datetime"])
+        _apply_own_write(version, new_version,
+                         forecaster=lambda forecaster: forecaster.add_meal(meal_ts, meal_entry["carbs"]))
+        st.session_state.meal_window = (st.session_state.meal_window[0], new_version)
+
+
+def load_user_profile():
+    """The session's profile, loaded from storage on first use."""
+    if 'user_profile' not in st.session_state:
+        st.session_state.user_profile = get_storage().load_profile()
+    return st.session_state.user_profile
@@ -0,0 +1,167 @@
+"""Diet Planner page: meal plans, food database and meal logger."""
+from datetime import date, datetime
+
+import numpy as np
+import streamlit as st
+
+from meal_nutrition import match_food, nutrition_frame, nutrition_totals, servings
+from meal_planner import DAYS, PREFERENCES, describe
+from views.common import (
+    MEAL_LOG_DAYS, current_user, data_version, date_range_filter, get_food_index, get_food_table, get_meal_planner,
+    get_render_cache, get_storage, load_meal_log, load_user_profile, log_meal, page_controls,
+)
+
+# Above this many foods the Food Database tab only shows search results
+FOOD_TABLE_MAX_ROWS = 1000
+SEARCH_RESULTS = 20
+MEALS = ["Breakfast", "Lunch", "Dinner", "Snack"]
+
+def render():
+    st.markdown('<h2 class="section-header">Diabetic Diet Planner</h2>', unsafe_allow_html=True)
+    version = data_version()
+    
+    tab1, tab2, tab3 = st.tabs(["🥗 Meal Plans", "🍽️ Food Database", "📝 Meal Logger"])
+    
+    with tab1:
+        st.subheader("Recommended Meal Plans")
+        
+        calorie_target = st.selectbox("Daily Calorie Target", [1200, 1500, 1800, 2000, 2200, 2500])
+        meal_preference = st.selectbox("Dietary Preference", list(PREFERENCES))
+        plan_day = st.selectbox("Day", DAYS)
+        
+        # A week of plans per (target, preference, body weight), shared by every session
+        weight_kg = load_user_profile().get('weight')
+        week = get_render_cache().get_or_build(
+            ("meal_plan", calorie_target, meal_preference, weight_kg),
+            lambda: get_meal_planner().plan_week(calorie_target, meal_preference, weight_kg),
+        )
+        plan = week[DAYS.index(plan_day)]
+        foods = get_food_table()
+        
+        def show_meal(heading, meal):
+            st.markdown(f"#### {heading}")
+            for item in describe(foods, plan[meal]):
+                st.write(f"• {item}")
+            totals = plan[meal].totals
+            st.caption(f"{totals['calories']:.0f} kcal · {totals['carbs']:.0f}g carbs · "
+                       f"{totals['protein']:.0f}g protein · {totals['fat']:.0f}g fat · GI {totals['glycemic_index']:.0f}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            show_meal("🌅 Breakfast", "Breakfast")
+            show_meal("🌞 Lunch", "Lunch")
+        
+        with col2:
+            show_meal("🌙 Dinner", "Dinner")
+            show_meal("🍎 Snack", "Snack")
+        
+        day_totals = {name: sum(meal.totals[name] for meal in plan.values()) for name in ("calories", "carbs", "protein", "fat")}
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Calories", f"{day_totals['calories']:.0f}", f"{day_totals['calories'] - calorie_target:+.0f} vs target")
+        col2.metric("Carbs", f"{day_totals['carbs']:.0f}g")
+        col3.metric("Protein", f"{day_totals['protein']:.0f}g")
+        col4.metric("Fat", f"{day_totals['fat']:.0f}g")
+    
+    with tab2:
+        st.subheader("Food Nutritional Database")
+        
+        foods = get_food_table()
+        if len(foods) <= FOOD_TABLE_MAX_ROWS:
+            st.dataframe(foods.frame(), width="stretch")
+        else:
+            st.caption(f"{len(foods):,} foods — search to browse.")
+        
+        # Food search: ranked index lookup, tolerant of prefixes and typos
+        search_term = st.text_input("Search for a food item:")
+        if search_term:
+            rows, _ = get_food_index().search(search_term, k=SEARCH_RESULTS)
+            if rows.shape[0]:
+                st.dataframe(foods.frame(rows), width="stretch")
+            else:
+                st.info("No matching foods found.")
+    
+    with tab3:
+        st.subheader("Log Your Meals")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            meal_date = st.date_input("Date", value=date.today())
+            meal_time = st.selectbox("Meal", MEALS)
+            food_item = st.text_input("Food Item")
+            portion_size = st.text_input("Portion Size")
+            estimated_carbs = st.number_input("Estimated Carbs (g)", min_value=0.0, step=0.5)
+            
+            # Look the food up in the database so carbs can be left for us to estimate
+            matched_carbs = None
+            if food_item.strip():
+                foods = get_food_table()
+                row = match_food(get_food_index(), food_item)
+                if row >= 0:
+                    serving_count = servings(portion_size, foods.names[row])
+                    matched_carbs = round(float(foods.columns["carbs"][row]) * serving_count, 1)
+                    st.caption(f"Matched {serving_count:g} × {foods.names[row]}: ≈ {matched_carbs:g}g carbs, "
+                               f"{float(foods.columns['calories'][row]) * serving_count:.0f} kcal. "
+                               "Leave carbs at 0 to use this estimate.")
+                else:
+                    st.caption("No match in the food database; enter carbs by hand.")
+            
+            if st.button("Log Meal"):
+                logged_at = datetime.now()
+                meal_entry = {
+                    "date": meal_date,
+                    "meal": meal_time,
+                    "food": food_item,
+                    "portion": portion_size,
+                    "carbs": estimated_carbs or matched_carbs or 0.0,
+                    # Native timestamp of the meal itself, so nothing re-parses date strings later
+                    "datetime": datetime.combine(meal_date, logged_at.time()),
+                    "timestamp": logged_at
+                }
+                log_meal(meal_entry, version)
+                st.success("✅ Meal logged successfully!")
+        
+        with col2:
+            meal_log = load_meal_log(version)
+            if not meal_log:
+                st.info(f"No meals logged in the last {MEAL_LOG_DAYS} days.")
+            else:
+                st.subheader("Nutrition Totals")
+                period = st.radio("Period", ["Daily", "Weekly"], horizontal=True)
+                
+                def build_totals():
+                    joined = nutrition_frame(meal_log, get_food_table(), get_food_index())
+                    totals = nutrition_totals(joined, "D" if period == "Daily" else "W")
+                    totals.index = totals.index.date
+                    return totals.round(1).sort_index(ascending=False)
+                
+                # Keyed on the loaded window, which already reflects a meal logged in this run
+                totals = get_render_cache().get_or_build(
+                    ("meal_totals", current_user(), st.session_state.meal_window, period), build_totals
+                )
+                st.dataframe(totals, width="stretch")
+        
+        # Whole meal history, filtered and paged in the database: only the page's rows are read
+        st.subheader("Meal History")
+        storage = get_storage()
+        span = storage.span("meals")
+        if span is None:
+            st.info("No meals logged yet.")
+            return
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            first, last = (np.datetime64(ts, "ns").astype("datetime64[D]").item() for ts in span)
+            start, end = date_range_filter("Dates", first, last, key="meal_history_dates")
+        with col2:
+            meals = st.multiselect("Meals", MEALS, key="meal_history_meals")
+        with col3:
+            food_filter = st.text_input("Food contains", key="meal_history_food").strip()
+        total = storage.meals_page(start, end, meals or None, food_filter, limit=0)[1]
+        offset, limit = page_controls(total, "meal_history")
+        entries, _ = storage.meals_page(start, end, meals or None, food_filter, offset, limit)
+        if entries:
+            st.dataframe([{"Date": meal["date"], "Meal": meal["meal"], "Food": meal["food"], "Portion": meal["portion"],
+                           "Carbs (g)": meal["carbs"]} for meal in entries],
+                         width="stretch", hide_index=True)
+        else:
+            st.caption("No meals match these filters.")
@@ -0,0 +1,146 @@
+"""Educational Resources page: diabetes basics, insulin, nutrition and emergency info."""
+import streamlit as st
+
+
+def render():
+    st.markdown('<h2 class="section-header">Educational Resources</h2>', unsafe_allow_html=True)
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["🧠 Diabetes Basics", "💉 Insulin Guide", "🍎 Nutrition Tips", "⚠️ Emergency Info"])
+    
+    with tab1:
+        st.subheader("Understanding Diabetes")
+        
+        st.markdown("""
+        ### What is Diabetes?
+        Diabetes is a group of metabolic disorders characterized by high blood sugar levels over a prolonged period.
+        
+        ### Types of Diabetes:
+        - **Type 1 Diabetes**: Autoimmune condition where the pancreas produces little or no insulin
+        - **Type 2 Diabetes**: Body becomes resistant to insulin or doesn't produce enough insulin
+        - **Gestational Diabetes**: Develops during pregnancy
+        
+        ### Key Management Strategies:
+        1. **Blood Sugar Monitoring**: Regular checking helps track glucose levels
+        2. **Medication Adherence**: Taking prescribed medications as directed
+        3. **Healthy Diet**: Balanced nutrition with carbohydrate counting
+        4. **Regular Exercise**: Helps improve insulin sensitivity
+        5. **Stress Management**: Stress can affect blood sugar levels
+        """)
+    
+    with tab2:
+        st.subheader("Insulin Management Guide")
+        
+        st.markdown("""
+        ### Types of Insulin:
+        - **Rapid-acting**: Works within 15 minutes, peaks in 1 hour
+        - **Short-acting**: Works within 30 minutes, peaks in 2-3 hours
+        - **Intermediate-acting**: Works in 2-4 hours, peaks in 4-12 hours
+        - **Long-acting**: Works in several hours, lasts 24+ hours
+        
+        ### Injection Tips:
+        1. Rotate injection sites to prevent lipodystrophy
+        2. Use proper injection technique
+        3. Check expiration dates
+        4. Store insulin properly (refrigerate unopened, room temp when in use)
+        
+        ### Calculating Insulin Doses:
+        - **Carbohydrate Ratio**: Units of insulin per grams of carbs
+        - **Correction Factor**: How much 1 unit of insulin lowers blood sugar
+        - **Target Range**: Your ideal blood sugar range
+        """)
+    
+    with tab3:
+        st.subheader("Nutrition Guidelines")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("""
+            ### Carbohydrate Counting:
+            - 1 carb serving = 15 grams
+            - Read nutrition labels carefully
+            - Focus on complex carbohydrates
+            - Consider glycemic index
+            
+            ### Recommended Foods:
+            - Non-starchy vegetables
+            - Lean proteins
+            - Whole grains
+            - Healthy fats (nuts, avocado, olive oil)
+            - Low-fat dairy
+            """)
+        
+        with col2:
+            st.markdown("""
+            ### Foods to Limit:
+            - Sugary drinks and desserts
+            - Refined carbohydrates
+            - Processed foods high in sodium
+            - Trans fats
+            - Excessive alcohol
+            
+            ### Meal Planning Tips:
+            - Eat regular, balanced meals
+            - Control portion sizes
+            - Include protein with each meal
+            - Stay hydrated
+            - Plan ahead for special occasions
+            """)
+    
+    with tab4:
+        st.subheader("Emergency Information")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("""
+            <div class="warning-box">
+                <h4>🚨 Hypoglycemia (Low Blood Sugar)</h4>
+                <p><strong>Symptoms:</strong></p>
+                <ul>
+                    <li>Shaking, sweating</li>
+                    <li>Fast heartbeat</li>
+                    <li>Dizziness, confusion</li>
+                    <li>Hunger, irritability</li>
+                </ul>
+                <p><strong>Treatment (15-15 Rule):</strong></p>
+                <ol>
+                    <li>Take 15g fast-acting carbs</li>
+                    <li>Wait 15 minutes</li>
+                    <li>Recheck blood sugar</li>
+                    <li>Repeat if still low</li>
+                </ol>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("""
+            <div class="warning-box">
+                <h4>🚨 Hyperglycemia (High Blood Sugar)</h4>
+                <p><strong>Symptoms:</strong></p>
+                <ul>
+                    <li>Excessive thirst</li>
+                    <li>Frequent urination</li>
+                    <li>Fatigue, weakness</li>
+                    <li>Blurred vision</li>
+                </ul>
+                <p><strong>Actions:</strong></p>
+                <ol>
+                    <li>Check blood sugar</li>
+                    <li>Check ketones if over 250 mg/dL</li>
+                    <li>Take correction insulin if needed</li>
+                    <li>Drink water</li>
+                    <li>Call doctor if persistent</li>
+                </ol>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("""
+        <div style="background-color: #DC3545; color: white; padding: 1rem; border-radius: 10px; margin: 1rem 0; text-align: center;">
+            <h3>🚨 EMERGENCY CONTACTS</h3>
+            <p><strong>Emergency Services: 911</strong></p>
+            <p><strong>Poison Control: 1-800-222-1222</strong></p>
+            <p><strong>Your Doctor: _______________</strong></p>
+            <p><strong>Pharmacy: _______________</strong></p>
+        </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,40 @@
+"""Home page: feature overview and medical disclaimer."""
+import streamlit as st
+
+
+def render():
+    st.markdown('<h2 class="section-header">Welcome to DiabetCare</h2>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+        <div class="info-box">
+            <h3>💉 Insulin Calculator</h3>
+            <p>Calculate your insulin doses based on carb intake, blood sugar levels, and personal factors.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="info-box">
+            <h3>🍎 Diet Planner</h3>
+            <p>Get personalized meal plans and nutritional guidance for better diabetes management.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+        <div class="info-box">
+            <h3>📊 Blood Sugar Tracker</h3>
+            <p>Monitor and track your blood glucose levels with visual analytics.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h4>⚠️ Medical Disclaimer</h4>
+        <p>This application is for educational and tracking purposes only. Always consult with your healthcare provider 
+        before making any changes to your diabetes management plan. This tool does not replace professional medical advice.</p>
+    </div>
+    """, unsafe_allow_html=True)
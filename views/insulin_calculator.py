@@ -0,0 +1,100 @@
+"""Insulin Calculator page: bolus dose from carbs, current BG and profile settings."""
+from datetime import datetime
+
+import streamlit as st
+
+from forecast import HORIZONS, STEP_MINUTES
+from insulin import bolus
+from iob import BOLUS_TYPES, INSULIN_TYPES
+from readings_store import MAX_MG_DL, MIN_MG_DL, to_epoch_ns
+from views.common import data_version, get_forecaster, get_iob_engine, load_user_profile, log_dose
+
+# Forecasts are only shown from a reading at most this old
+FORECAST_MAX_AGE_MINUTES = 30
+# Largest single dose the log form accepts
+MAX_DOSE_UNITS = 100.0
+
+
+def render():
+    st.markdown('<h2 class="section-header">Insulin Dose Calculator</h2>', unsafe_allow_html=True)
+    
+    if not load_user_profile():
+        st.warning("⚠️ Please set up your user profile first to use the insulin calculator.")
+        st.stop()
+    
+    version = data_version()
+    # Rapid/short-acting insulin from earlier doses still lowers BG, so it offsets the correction
+    now = to_epoch_ns(datetime.now())
+    insulin_on_board = get_iob_engine(version).iob_at(now, BOLUS_TYPES)
+    # Where BG is heading from the latest reading, before this meal and bolus
+    forecaster = get_forecaster(version)
+    recent = forecaster.last_ts is not None and 0 <= now - forecaster.last_ts <= FORECAST_MAX_AGE_MINUTES * 60_000_000_000
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Current Readings")
+        current_bg = st.number_input("Current Blood Glucose (mg/dL)", min_value=MIN_MG_DL, max_value=MAX_MG_DL, value=120.0)
+        carbs_intake = st.number_input("Carbohydrates to consume (grams)", min_value=0.0, max_value=200.0, value=45.0)
+        meal_type = st.selectbox("Meal Type", ["Breakfast", "Lunch", "Dinner", "Snack"])
+        
+        st.subheader("Additional Factors")
+        exercise_planned = st.checkbox("Exercise planned within 2 hours")
+        illness = st.checkbox("Currently ill or stressed")
+        
+    with col2:
+        st.subheader("Calculation Results")
+        
+        # Get user profile data
+        profile = st.session_state.user_profile
+        
+        # Calculate insulin doses, adjusted for additional factors
+        bolus_for_carbs, correction_dose, adjustment_factor, total_bolus = bolus(
+            current_bg, carbs_intake, profile['carb_ratio'], profile['correction_factor'],
+            profile['target_bg'], exercise=exercise_planned, illness=illness,
+            insulin_on_board=insulin_on_board,
+        )
+        
+        st.metric("Insulin on Board", f"{insulin_on_board:.1f} units")
+        if recent:
+            _, forecast = forecaster.predict(profile['correction_factor'], profile['carb_ratio'], max(HORIZONS))
+            for horizon, column in zip(HORIZONS, st.columns(len(HORIZONS))):
+                column.metric(f"Forecast in {horizon} min", f"{forecast[horizon // STEP_MINUTES]:.0f} mg/dL")
+        st.metric("Bolus for Carbs", f"{bolus_for_carbs:.1f} units")
+        st.metric("Correction Dose", f"{correction_dose:.1f} units")
+        st.metric("**Total Recommended Bolus**", f"**{total_bolus:.1f} units**")
+        
+        # Display calculation breakdown
+        st.markdown("### Calculation Breakdown")
+        st.write(f"• Carb Coverage: {carbs_intake}g ÷ {profile['carb_ratio']} = {bolus_for_carbs:.1f} units")
+        st.write(f"• Correction: ({current_bg} - {profile['target_bg']}) ÷ {profile['correction_factor']} - {insulin_on_board:.1f} IOB = {correction_dose:.1f} units")
+        if adjustment_factor != 1.0:
+            st.write(f"• Adjustment Factor: {adjustment_factor:.1f}")
+    
+    st.subheader("Log Insulin Dose")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        # Prefilled with the recommendation, which extreme inputs can push past the form's limit
+        dose_units = st.number_input("Units", min_value=0.0, max_value=MAX_DOSE_UNITS,
+                                     value=min(round(float(total_bolus), 1), MAX_DOSE_UNITS), step=0.5)
+        insulin_type = st.selectbox("Insulin Type", INSULIN_TYPES)
+    with col2:
+        dose_date = st.date_input("Date", datetime.now().date(), key="dose_date")
+        dose_time = st.time_input("Time", datetime.now().time(), key="dose_time")
+    with col3:
+        st.write("")
+        if st.button("Log Dose") and dose_units > 0:
+            log_dose(datetime.combine(dose_date, dose_time), dose_units, insulin_type, version)
+            st.success(f"✅ Logged {dose_units:.1f} units of {insulin_type.lower()} insulin")
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h4>⚠️ Important Safety Notes</h4>
+        <ul>
+            <li>Always verify calculations with your healthcare provider</li>
+            <li>Consider timing of previous insulin doses</li>
+            <li>Monitor blood glucose levels regularly</li>
+            <li>Adjust doses based on your doctor's recommendations</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
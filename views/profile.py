@@ -0,0 +1,50 @@
+"""User Profile page: personal details and insulin settings."""
+import streamlit as st
+
+from views.common import get_storage, load_user_profile
+
+
+def render():
+    st.markdown('<h2 class="section-header">User Profile Setup</h2>', unsafe_allow_html=True)
+    load_user_profile()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Personal Information")
+        name = st.text_input("Full Name", value=st.session_state.user_profile.get('name', ''))
+        age = st.number_input("Age", min_value=1, max_value=120, value=st.session_state.user_profile.get('age', 30))
+        weight = st.number_input("Weight (kg)", min_value=30.0, max_value=300.0, value=st.session_state.user_profile.get('weight', 70.0))
+        height = st.number_input("Height (cm)", min_value=100.0, max_value=250.0, value=st.session_state.user_profile.get('height', 170.0))
+        diabetes_type = st.selectbox("Diabetes Type", ["Type 1", "Type 2", "Gestational"], 
+                                   index=["Type 1", "Type 2", "Gestational"].index(st.session_state.user_profile.get('diabetes_type', 'Type 1')))
+    
+    with col2:
+        st.subheader("Insulin Settings")
+        carb_ratio = st.number_input("Carbohydrate Ratio (1 unit per X grams)", 
+                                   min_value=5.0, max_value=50.0, step=0.5,
+                                   value=st.session_state.user_profile.get('carb_ratio', 15.0))
+        correction_factor = st.number_input("Correction Factor (1 unit lowers BG by X mg/dL)", 
+                                          min_value=10.0, max_value=100.0, step=1.0,
+                                          value=st.session_state.user_profile.get('correction_factor', 50.0))
+        target_bg = st.number_input("Target Blood Glucose (mg/dL)", 
+                                  min_value=80.0, max_value=150.0, step=1.0,
+                                  value=st.session_state.user_profile.get('target_bg', 100.0))
+        basal_rate = st.number_input("Basal Insulin Rate (units/hour)", 
+                                   min_value=0.1, max_value=5.0, step=0.1,
+                                   value=st.session_state.user_profile.get('basal_rate', 1.0))
+    
+    if st.button("Save Profile"):
+        st.session_state.user_profile = {
+            'name': name,
+            'age': age,
+            'weight': weight,
+            'height': height,
+            'diabetes_type': diabetes_type,
+            'carb_ratio': carb_ratio,
+            'correction_factor': correction_factor,
+            'target_bg': target_bg,
+            'basal_rate': basal_rate
+        }
+        get_storage().save_profile(st.session_state.user_profile)
+        st.success("✅ Profile saved successfully!")